@@ -5,6 +5,7 @@ import atexit
 import datetime as dt
 import fcntl
 import os
+from collections import Counter
 from pathlib import Path
 from typing import Iterable
 from zoneinfo import ZoneInfo
@@ -14,6 +15,8 @@ from telegram.constants import ParseMode
 from telegram.error import Conflict
 from telegram.ext import (
     Application,
+    BaseHandler,
+    CallbackQueryHandler,
     CommandHandler,
     ContextTypes,
     ConversationHandler,
@@ -29,6 +32,7 @@ from .handlers import (
     backup,
     controls,
     docker,
+    jobs,
     logs,
     monitoring,
     network,
@@ -38,31 +42,34 @@ from .handlers import (
 )
 from .menus import MAIN_MENU, wrap_failure, wrap_success
 from .services.backup_svc import perform_backup, should_run_backup
-from .services.metrics import (
-    HealthMonitor,
-    collect_metrics,
-    metrics_summary,
-    write_health_snapshot,
+from .services.cgroup import CgroupAccounting
+from .services.exporter import MetricsExporter, parse_listen
+from .services.anomaly import seed_anomaly
+from .services.history import MetricsHistory
+from .services.journaltop import JournalTop
+from .services.metrics import Alert, HealthMonitor, metrics_summary, write_health_snapshot
+from .services.sampler import MetricsSampler, current_metrics
+from .services.scheduler import (
+    CHEAP_READ,
+    HEAVY_IO,
+    NETWORK_HEAVY,
+    PRIORITY_LOW,
+    CommandScheduler,
+    JobCancelled,
 )
-from .services.sysctl import check_failed_services
+from .services.sysctl import ServiceStatus, list_services
+from .services.tsdb import MetricStore, seed_history
+from .services.unitwatch import UnitWatcher
 from .utils.format import human_datetime
 from .utils.logging import get_logger, log_action, setup_logging
+from .utils.perf import instrument
 
 logger = get_logger(__name__)
 _PROCESS_LOCK_FD: int | None = None
 
 
-async def health_check_job(context: ContextTypes.DEFAULT_TYPE) -> None:
-    settings: Settings = context.bot_data["settings"]
-    monitor: HealthMonitor = context.bot_data["health_monitor"]
-    disabled = context.bot_data.setdefault("alerts_disabled", {})
-
-    metrics = collect_metrics(settings)
-    failed_status = await check_failed_services(settings)
-    failed_services = [status.name for status in failed_status if not status.is_healthy()]
-
-    triggered, recovered = monitor.evaluate(metrics, failed_services)
-
+def _drop_disabled(bot_data: dict, alerts: list[Alert]) -> list[Alert]:
+    disabled = bot_data.setdefault("alerts_disabled", {})
     now = dt.datetime.now(dt.timezone.utc)
 
     def _is_disabled(code: str) -> bool:
@@ -79,16 +86,23 @@ async def health_check_job(context: ContextTypes.DEFAULT_TYPE) -> None:
             return False
         return True
 
-    triggered = [alert for alert in triggered if not _is_disabled(alert.code)]
+    return [alert for alert in alerts if not _is_disabled(alert.code)]
 
-    write_health_snapshot(metrics, settings.health_file)
+
+async def _announce(
+    context, settings: Settings, triggered: list[Alert], recovered: list[str], summary: str | None
+) -> None:
+    counters = context.bot_data.setdefault("counters", Counter())
+    counters["alerts_triggered"] += len(triggered)
+    counters["alerts_recovered"] += len(recovered)
 
     if triggered:
         text_lines = [
             "⚠️ Alert server!",
             *(f"• {alert.message}" for alert in triggered),
-            metrics_summary(metrics),
         ]
+        if summary:
+            text_lines.append(summary)
         await _broadcast(context, settings.admin_ids, "\n".join(text_lines))
         for alert in triggered:
             log_action(
@@ -105,14 +119,65 @@ async def health_check_job(context: ContextTypes.DEFAULT_TYPE) -> None:
             log_action("alert.recover", user_id=None, result="ok", detail=code)
 
 
+async def health_check_job(context: ContextTypes.DEFAULT_TYPE) -> None:
+    settings: Settings = context.bot_data["settings"]
+    monitor: HealthMonitor = context.bot_data["health_monitor"]
+    counters = context.bot_data.setdefault("counters", Counter())
+
+    metrics = await current_metrics(context.bot_data, settings)
+    watcher: UnitWatcher | None = context.bot_data.get("unit_watcher")
+    statuses = await watcher.current() if watcher is not None else await list_services(settings)
+    context.bot_data["service_statuses"] = statuses
+    journal_top: JournalTop | None = context.bot_data.get("journal_top")
+    if journal_top is not None:
+        journal_top.sync()
+    failed_services = [status.name for status in statuses if not status.is_healthy()]
+    accounting: CgroupAccounting | None = context.bot_data.get("cgroup_accounting")
+    usage = accounting.sample(statuses) if accounting is not None else []
+    context.bot_data["service_usage"] = usage
+
+    triggered, recovered = monitor.evaluate(metrics, failed_services, usage)
+    counters["health_checks"] += 1
+    triggered = _drop_disabled(context.bot_data, triggered)
+
+    write_health_snapshot(metrics, settings.health_file)
+    await _announce(context, settings, triggered, recovered, metrics_summary(metrics))
+
+
+async def _on_unit_change(
+    application: Application, status: ServiceStatus, old: ServiceStatus | None
+) -> None:
+    """Push ``svc_*`` alerts as soon as the unit watcher sees a crash or recovery."""
+    settings: Settings = application.bot_data["settings"]
+    monitor: HealthMonitor = application.bot_data["health_monitor"]
+    watcher: UnitWatcher = application.bot_data["unit_watcher"]
+    application.bot_data["service_statuses"] = watcher.statuses()
+    if status.active_state == "failed" or status.sub_state == "auto-restart":
+        healthy = False
+    elif status.is_healthy():
+        healthy = True
+    else:
+        return  # transitional (stopping/starting), the next tick decides
+    now = dt.datetime.now(dt.timezone.utc)
+    triggered, recovered = monitor.service_changed(status.name, healthy, now)
+    triggered = _drop_disabled(application.bot_data, triggered)
+    await _announce(application, settings, triggered, recovered, None)
+
+
 async def backup_job(context: ContextTypes.DEFAULT_TYPE) -> None:
     settings: Settings = context.bot_data["settings"]
     if not should_run_backup(settings):
         logger.info("Backup otomatis dilewati: snapshot terbaru masih valid")
         log_action("backup.auto", user_id=None, result="skip", detail="recent snapshot")
         return
+    scheduler: CommandScheduler | None = context.bot_data.get("scheduler")
     try:
-        report = await perform_backup(settings)
+        if scheduler is None:
+            report = await perform_backup(settings)
+        else:
+            report = await scheduler.run(
+                HEAVY_IO, "backup otomatis", lambda: perform_backup(settings), priority=PRIORITY_LOW
+            )
         message = wrap_success(
             f"Backup otomatis selesai ({report.snapshot.name})."
         )
@@ -123,6 +188,8 @@ async def backup_job(context: ContextTypes.DEFAULT_TYPE) -> None:
             result="ok",
             detail=report.snapshot.name,
         )
+    except JobCancelled:
+        log_action("backup.auto", user_id=None, result="cancel", detail="via /jobs")
     except Exception as exc:  # pragma: no cover - IO heavy
         error = wrap_failure(str(exc))
         await _broadcast(context, settings.admin_ids, error)
@@ -156,20 +223,100 @@ def _reschedule_backup_job(application: Application, time_str: str) -> None:
     existing = application.bot_data.get("backup_job")
     if existing:
         existing.schedule_removal()
-    job = application.job_queue.run_daily(backup_job, time=time_obj, name="backup-daily")
+    job = application.job_queue.run_daily(instrument("job:backup", backup_job), time=time_obj, name="backup-daily")
     application.bot_data["backup_job"] = job
     application.bot_data["backup_schedule"] = time_str
     logger.info("Backup job dijadwalkan ulang ke %s", time_str)
 
 
+async def _post_init(application: Application) -> None:
+    sampler: MetricsSampler = application.bot_data["metrics_sampler"]
+    sampler.start()
+    watcher: UnitWatcher | None = application.bot_data.get("unit_watcher")
+    if watcher is not None:
+        watcher.start()
+    journal_top: JournalTop | None = application.bot_data.get("journal_top")
+    if journal_top is not None:
+        journal_top.start()
+    exporter: MetricsExporter | None = application.bot_data.get("metrics_exporter")
+    if exporter is not None:
+        try:
+            await exporter.start()
+        except OSError as exc:
+            logger.error("Exporter metrics gagal listen di %s:%d: %s", exporter.host, exporter.port, exc)
+
+
+async def _post_shutdown(application: Application) -> None:
+    exporter: MetricsExporter | None = application.bot_data.get("metrics_exporter")
+    if exporter is not None:
+        await exporter.stop()
+    watcher: UnitWatcher | None = application.bot_data.get("unit_watcher")
+    if watcher is not None:
+        await watcher.stop()
+    journal_top: JournalTop | None = application.bot_data.get("journal_top")
+    if journal_top is not None:
+        await journal_top.stop()
+    sampler: MetricsSampler = application.bot_data["metrics_sampler"]
+    await sampler.stop()
+    store: MetricStore = application.bot_data["metrics_store"]
+    store.close()
+
+
 def build_application(settings: Settings) -> Application:
     tzinfo = ZoneInfo(settings.timezone)
     defaults = Defaults(parse_mode=ParseMode.HTML, tzinfo=tzinfo)
-    application = Application.builder().token(settings.bot_token).defaults(defaults).build()
+    application = (
+        Application.builder()
+        .token(settings.bot_token)
+        .defaults(defaults)
+        .post_init(_post_init)
+        .post_shutdown(_post_shutdown)
+        .build()
+    )
 
     application.bot_data["settings"] = settings
     application.bot_data["tzinfo"] = tzinfo
-    application.bot_data["health_monitor"] = HealthMonitor(settings.thresholds)
+    monitor = HealthMonitor(settings.thresholds)
+    application.bot_data["health_monitor"] = monitor
+    sampler = MetricsSampler(
+        settings, interval=settings.metrics_interval, fast_path=settings.metrics_fast_path
+    )
+    history = MetricsHistory(
+        raw_hours=settings.history_raw_hours, interval=settings.metrics_interval
+    )
+    store = MetricStore(
+        settings.data_dir / "metrics.tsdb", retention_days=settings.metrics_retention_days
+    )
+    store.open()
+    seeded = seed_history(history, store)
+    logger.info("Riwayat metrics dimuat ulang dari disk: %d sampel per menit", seeded)
+    seed_anomaly(monitor.anomaly, store)
+    history.add_rollup_listener("1m", store.append)
+    sampler.add_listener(history.record)
+    sampler.add_listener(monitor.observe)
+    application.bot_data["metrics_sampler"] = sampler
+    application.bot_data["metrics_history"] = history
+    application.bot_data["metrics_store"] = store
+    application.bot_data["counters"] = Counter()
+    application.bot_data["scheduler"] = CommandScheduler(settings.job_limits)
+    if settings.unit_watch:
+        application.bot_data["unit_watcher"] = UnitWatcher(
+            settings, lambda status, old: _on_unit_change(application, status, old)
+        )
+    accounting = CgroupAccounting()
+    if accounting.available():
+        application.bot_data["cgroup_accounting"] = accounting
+    else:
+        logger.info("cgroup v2 tidak tersedia, pemakaian resource per service dimatikan")
+    if settings.journal_top_hours:
+        application.bot_data["journal_top"] = JournalTop(settings, hours=settings.journal_top_hours)
+    try:
+        listen = parse_listen(settings.metrics_listen)
+    except ValueError:
+        logger.error("METRICS_LISTEN tidak valid: %s", settings.metrics_listen)
+        listen = None
+    if listen is not None:
+        application.bot_data["metrics_exporter"] = MetricsExporter(application.bot_data, *listen)
     application.bot_data["reschedule_backup_job"] = lambda value: _reschedule_backup_job(
         application, value
     )
@@ -177,6 +324,12 @@ def build_application(settings: Settings) -> Application:
 
     # Group -1: Pre-processing and authorization
     application.add_handler(MessageHandler(filters.ALL, auth.guard_all), group=-1)
+    application.add_handler(CallbackQueryHandler(auth.guard_all), group=-1)
+
+    # Heavy commands go through the scheduler and run as tasks so a queued one does not block updates
+    heavy_io = jobs.scheduled(HEAVY_IO)
+    network_heavy = jobs.scheduled(NETWORK_HEAVY)
+    cheap_read = jobs.scheduled(CHEAP_READ)
 
     # Group 0: Core commands
     application.add_handler(CommandHandler("start", start.start))
@@ -184,34 +337,41 @@ def build_application(settings: Settings) -> Application:
     application.add_handler(CommandHandler("status", start.status_command))
 
     application.add_handler(CommandHandler("svc", controls.service_command))
+    application.add_handler(CommandHandler("svc_bulk", controls.service_bulk))
     application.add_handler(CommandHandler("svc_list", controls.control_menu))
     application.add_handler(CommandHandler("services", controls.control_menu))
     application.add_handler(CommandHandler("log_runtime", logs.log_runtime))
     application.add_handler(CommandHandler("log_errors", logs.log_errors))
     application.add_handler(CommandHandler("log_file", logs.log_file))
     application.add_handler(CommandHandler("log_journal", logs.log_journal))
+    application.add_handler(CallbackQueryHandler(logs.journal_page, pattern=r"^journal:"))
+    application.add_handler(CommandHandler("journal_top", logs.journal_top))
 
-    application.add_handler(CommandHandler("backup_now", backup.backup_now))
+    application.add_handler(CommandHandler("backup_now", heavy_io(backup.backup_now), block=False))
     application.add_handler(CommandHandler("backup_list", backup.backup_list))
     application.add_handler(CommandHandler("backup_verify", backup.backup_verify))
 
     application.add_handler(CommandHandler("ping", network.ping_command))
-    application.add_handler(CommandHandler("speed", network.speed_command))
+    application.add_handler(CommandHandler("speed", network_heavy(network.speed_command), block=False))
     application.add_handler(CommandHandler("tailscale", network.tailscale_command))
 
-    application.add_handler(CommandHandler("apt_update", updates.apt_update))
-    application.add_handler(CommandHandler("pip_sync", updates.pip_sync))
-    application.add_handler(CommandHandler("git_pull", updates.git_pull))
+    application.add_handler(CommandHandler("apt_update", heavy_io(updates.apt_update), block=False))
+    application.add_handler(CommandHandler("pip_sync", network_heavy(updates.pip_sync), block=False))
+    application.add_handler(CommandHandler("git_pull", network_heavy(updates.git_pull), block=False))
 
     application.add_handler(CommandHandler("admins", admin.admins_list))
     application.add_handler(CommandHandler("set_backup", admin.set_backup_schedule))
     application.add_handler(CommandHandler("alerts", admin.alerts_status))
     application.add_handler(CommandHandler("alert_disable", admin.alert_disable))
     application.add_handler(CommandHandler("set_threshold", admin.set_threshold))
+    application.add_handler(CommandHandler("threshold_whatif", admin.threshold_whatif))
     application.add_handler(CommandHandler("svc_add", admin.service_add))
     application.add_handler(CommandHandler("svc_remove", admin.service_remove))
     application.add_handler(CommandHandler("uptime", monitoring.uptime_detail))
-    application.add_handler(CommandHandler("run", system.run_command))
+    application.add_handler(CommandHandler("history", monitoring.history_command))
+    application.add_handler(CommandHandler("jobs", jobs.jobs_command))
+    application.add_handler(CommandHandler("perf", monitoring.perf_command))
+    application.add_handler(CommandHandler("run", cheap_read(system.run_command), block=False))
 
     application.add_handler(MessageHandler(filters.Regex("^📊 Status$"), monitoring.show_status))
     application.add_handler(MessageHandler(filters.Regex("^🧰 Kontrol$"), controls.control_menu))
@@ -231,7 +391,7 @@ def build_application(settings: Settings) -> Application:
         states={
             docker.CONTAINER_NAME_STOP: [MessageHandler(filters.TEXT & ~filters.COMMAND, docker.stop_container)],
             docker.CONTAINER_NAME_RESTART: [MessageHandler(filters.TEXT & ~filters.COMMAND, docker.restart_container)],
-            docker.CONTAINER_NAME_LOGS: [MessageHandler(filters.TEXT & ~filters.COMMAND, docker.logs_container)],
+            docker.CONTAINER_NAME_LOGS: [MessageHandler(filters.TEXT & ~filters.COMMAND, cheap_read(docker.logs_container))],
         },
         fallbacks=[CommandHandler("cancel", docker.cancel)],
     )
@@ -242,12 +402,35 @@ def build_application(settings: Settings) -> Application:
 
     application.add_handler(MessageHandler(filters.COMMAND, unknown_command))
     application.add_error_handler(error_handler)
+    _instrument_handlers(application)
 
     schedule_health_jobs(application)
 
     return application
 
 
+def _instrument_handlers(application: Application) -> None:
+    """Time every registered handler callback for /perf."""
+
+    def _wrap(handler: BaseHandler) -> None:
+        if isinstance(handler, ConversationHandler):
+            for inner in [*handler.entry_points, *handler.fallbacks]:
+                _wrap(inner)
+            for state_handlers in handler.states.values():
+                for inner in state_handlers:
+                    _wrap(inner)
+            return
+        if isinstance(handler, CommandHandler):
+            name = f"/{min(handler.commands)}"
+        else:
+            name = getattr(handler.callback, "__name__", type(handler).__name__)
+        handler.callback = instrument(f"handler:{name}", handler.callback)
+
+    for handlers in application.handlers.values():
+        for handler in handlers:
+            _wrap(handler)
+
+
 async def unknown_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handles unknown commands with a touch of humor."""
     if update.message:
@@ -263,7 +446,7 @@ def schedule_health_jobs(application: Application) -> None:
         raise RuntimeError(
             "JobQueue tidak tersedia. Pastikan python-telegram-bot dipasang dengan ekstra 'job-queue'."
         )
-    application.job_queue.run_repeating(health_check_job, interval=60, first=10)
+    application.job_queue.run_repeating(instrument("job:health_check", health_check_job), interval=60, first=10)
     backup_time = application.bot_data.get("backup_schedule")
     if backup_time:
         _reschedule_backup_job(application, backup_time)
@@ -4,11 +4,19 @@ from __future__ import annotations
 import os
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Iterable, List, Optional, Sequence, Set
+from typing import Dict, Iterable, List, Optional, Sequence, Set
 
 from dotenv import dotenv_values
 
 
+@dataclass(slots=True)
+class ServiceLimit:
+    """Per-service cgroup limits; 0 disables the check."""
+
+    memory_bytes: int = 0
+    cpu_percent: float = 0.0
+
+
 @dataclass(slots=True)
 class Thresholds:
     """Configuration for resource alert thresholds."""
@@ -18,6 +26,18 @@ class Thresholds:
     disk_percent: float = 90.0
     temperature_c: float = 85.0
     hysteresis_minutes: int = 15
+    disk_await_ms: float = 200.0
+    net_errors_per_s: float = 10.0
+    disk_full_hours: float = 72.0
+    anomaly_z: float = 4.0
+    anomaly_seasonal: bool = True
+    # per-rule ``<agg>:<window>`` overrides keyed by alert code, e.g. {"cpu_high": "p95:10m"}
+    rules: Dict[str, str] = field(default_factory=dict)
+    # per-service memory/CPU limits keyed by whitelist name, "*" applies to every service
+    service_limits: Dict[str, ServiceLimit] = field(default_factory=dict)
+
+    def limit_for(self, service: str) -> ServiceLimit | None:
+        return self.service_limits.get(service) or self.service_limits.get("*")
 
 
 @dataclass(slots=True)
@@ -43,6 +63,20 @@ class Settings:
     timezone: str = "UTC"
     thresholds: Thresholds = field(default_factory=Thresholds)
     backup_extra_sources: List[Path] = field(default_factory=list)
+    metrics_interval: float = 5.0
+    history_raw_hours: float = 6.0
+    metrics_retention_days: float = 90.0
+    metrics_fast_path: bool = True
+    metrics_listen: str = ""
+    unit_watch: bool = True
+    status_cache_ttl: float = 5.0
+    journal_top_hours: int = 24
+    service_groups: Dict[str, List[str]] = field(default_factory=dict)
+    bulk_concurrency: int = 3
+    # per-category caps for the command scheduler, merged over its defaults
+    job_limits: Dict[str, int] = field(default_factory=dict)
+    # full output of truncated commands lands here (HDD) until it is sent as a document
+    spill_dir: Path | None = None
 
     def is_admin(self, user_id: Optional[int]) -> bool:
         return bool(user_id and user_id in self.admin_ids)
@@ -70,6 +104,27 @@ def _parse_services(raw: str | Iterable[str]) -> List[str]:
     return [item for item in items if item]
 
 
+def _parse_service_groups(raw: str) -> Dict[str, List[str]]:
+    groups: Dict[str, List[str]] = {}
+    for chunk in raw.split(";"):
+        name, _sep, members = chunk.partition("=")
+        services = _parse_services(members)
+        if name.strip() and services:
+            groups[name.strip()] = services
+    return groups
+
+
+def _parse_job_limits(raw: str) -> Dict[str, int]:
+    limits: Dict[str, int] = {}
+    for chunk in raw.split(","):
+        name, _sep, value = chunk.partition("=")
+        try:
+            limits[name.strip()] = max(1, int(value))
+        except ValueError:
+            continue
+    return limits
+
+
 def _parse_extra_paths(raw: str | Iterable[str], base: Path) -> List[Path]:
     if not raw:
         return []
@@ -98,6 +153,45 @@ def _load_raw_env(env_path: Path) -> dict[str, str]:
     return env
 
 
+def _parse_rule_overrides(raw_env: dict[str, str]) -> Dict[str, str]:
+    return {
+        key[len("RULE_") :].lower(): value.strip()
+        for key, value in raw_env.items()
+        if key.startswith("RULE_") and value.strip()
+    }
+
+
+_SIZE_UNITS = {"": 1, "K": 1 << 10, "M": 1 << 20, "G": 1 << 30, "T": 1 << 40}
+
+
+def _parse_size(raw: str) -> int:
+    raw = raw.strip().upper().removesuffix("B").removesuffix("I")
+    unit = raw[-1:] if raw[-1:] in _SIZE_UNITS else ""
+    return int(float(raw[: len(raw) - len(unit)]) * _SIZE_UNITS[unit])
+
+
+def _parse_service_limits(raw: str) -> Dict[str, ServiceLimit]:
+    """``rag-worker=mem:2G,cpu:80;*=mem:1G`` into limits per service."""
+    limits: Dict[str, ServiceLimit] = {}
+    for chunk in raw.split(";"):
+        service, _sep, spec = chunk.partition("=")
+        service = service.strip()
+        if not service or not spec.strip():
+            continue
+        limit = ServiceLimit()
+        for part in spec.split(","):
+            key, _sep, value = part.partition(":")
+            try:
+                if key.strip().lower() == "mem":
+                    limit.memory_bytes = _parse_size(value)
+                elif key.strip().lower() == "cpu":
+                    limit.cpu_percent = float(value)
+            except ValueError:
+                continue
+        limits[service] = limit
+    return limits
+
+
 def _normalize_schedule(raw: str | None, default: str = "02:30") -> str:
     if raw is None:
         return default
@@ -152,6 +246,20 @@ def load_settings(env_path: Path | None = None) -> Settings:
                 "THRESHOLD_HYSTERESIS_MIN", default_thresholds.hysteresis_minutes
             )
         ),
+        disk_await_ms=float(
+            raw_env.get("THRESHOLD_DISK_AWAIT_MS", default_thresholds.disk_await_ms)
+        ),
+        net_errors_per_s=float(
+            raw_env.get("THRESHOLD_NET_ERRORS", default_thresholds.net_errors_per_s)
+        ),
+        disk_full_hours=float(
+            raw_env.get("THRESHOLD_DISK_FULL_HOURS", default_thresholds.disk_full_hours)
+        ),
+        anomaly_z=float(raw_env.get("ANOMALY_Z", default_thresholds.anomaly_z)),
+        anomaly_seasonal=str(raw_env.get("ANOMALY_SEASONAL", "1")).strip().lower()
+        not in {"0", "false", "no", "off"},
+        rules=_parse_rule_overrides(raw_env),
+        service_limits=_parse_service_limits(raw_env.get("SERVICE_LIMITS", "")),
     )
 
     bot_token = raw_env.get("BOT_TOKEN", "").strip()
@@ -188,9 +296,23 @@ def load_settings(env_path: Path | None = None) -> Settings:
         timezone=raw_env.get("TIMEZONE", "Asia/Jakarta"),
         thresholds=thresholds,
         backup_extra_sources=backup_extra_sources,
+        metrics_interval=max(1.0, float(raw_env.get("METRICS_INTERVAL_SEC", 5.0))),
+        history_raw_hours=float(raw_env.get("HISTORY_RAW_HOURS", 6.0)),
+        metrics_retention_days=float(raw_env.get("METRICS_RETENTION_DAYS", 90.0)),
+        metrics_fast_path=str(raw_env.get("METRICS_FAST_PATH", "1")).strip().lower()
+        not in {"0", "false", "no", "off"},
+        metrics_listen=raw_env.get("METRICS_LISTEN", "").strip(),
+        unit_watch=str(raw_env.get("UNIT_WATCH", "1")).strip().lower()
+        not in {"0", "false", "no", "off"},
+        status_cache_ttl=max(0.0, float(raw_env.get("STATUS_CACHE_TTL_SEC", 5.0))),
+        journal_top_hours=max(0, int(raw_env.get("JOURNAL_TOP_HOURS", 24))),
+        service_groups=_parse_service_groups(raw_env.get("SERVICE_GROUPS", "")),
+        bulk_concurrency=max(1, int(raw_env.get("SVC_BULK_CONCURRENCY", 3))),
+        job_limits=_parse_job_limits(raw_env.get("JOB_LIMITS", "")),
+        spill_dir=data_dir / "spill",
     )
 
     return settings
 
 
-__all__ = ["Settings", "Thresholds", "load_settings"]
+__all__ = ["ServiceLimit", "Settings", "Thresholds", "load_settings"]
@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 import datetime as dt
+import time
 from html import escape
 
 from telegram import Update
@@ -9,7 +10,9 @@ from telegram.ext import ContextTypes
 
 from ..config import Settings
 from ..menus import MAIN_MENU, wrap_failure, wrap_success
-from ..services.metrics import HealthMonitor
+from ..services.backtest import current_threshold, render_what_if, what_if_many
+from ..services.history import parse_range
+from ..services.tsdb import MetricStore
 from ..utils.envfile import update_env_file
 from ..utils.logging import log_action
 from ..utils.shell import run_cmd
@@ -116,7 +119,7 @@ async def set_threshold(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
         return
     if len(context.args) < 2:
         await update.message.reply_text(
-            "Format: /set_threshold <cpu|ram|disk|temp|hysteresis> <nilai>."
+            "Format: /set_threshold <cpu|ram|disk|temp|await|neterr|fullh|hysteresis> <nilai>."
         )
         return
     metric = context.args[0].lower()
@@ -126,10 +129,13 @@ async def set_threshold(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
         "ram": ("THRESHOLD_RAM_MB", "ram_free_mb", float),
         "disk": ("THRESHOLD_DISK", "disk_percent", float),
         "temp": ("THRESHOLD_TEMP", "temperature_c", float),
+        "await": ("THRESHOLD_DISK_AWAIT_MS", "disk_await_ms", float),
+        "neterr": ("THRESHOLD_NET_ERRORS", "net_errors_per_s", float),
+        "fullh": ("THRESHOLD_DISK_FULL_HOURS", "disk_full_hours", float),
         "hysteresis": ("THRESHOLD_HYSTERESIS_MIN", "hysteresis_minutes", int),
     }
     if metric not in mapping:
-        await update.message.reply_text("Metric tidak dikenali. Pilih: cpu, ram, disk, temp, hysteresis.")
+        await update.message.reply_text("Metric tidak dikenali. Pilih: cpu, ram, disk, temp, await, neterr, fullh, hysteresis.")
         return
     env_key, attr, caster = mapping[metric]
     try:
@@ -139,11 +145,52 @@ async def set_threshold(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
         return
     setattr(settings.thresholds, attr, value)
     update_env_file(settings.env_file, {env_key: str(value)})
-    context.bot_data["health_monitor"] = HealthMonitor(settings.thresholds)
     await update.message.reply_text(wrap_success(f"Threshold {metric} diperbarui."))
     log_action("admin.threshold", user_id=user_id, result="ok", detail=f"{metric}={value}")
 
 
+async def threshold_whatif(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    settings: Settings = context.bot_data["settings"]
+    user_id = update.effective_user.id
+    if not settings.is_admin(user_id):
+        await update.message.reply_text("Simulasi threshold cuma buat admin ya.")
+        return
+    if len(context.args) < 3:
+        await update.message.reply_text(
+            "Format: /threshold_whatif &lt;cpu|ram|disk|hdd|temp&gt; &lt;nilai&gt; &lt;rentang&gt;. "
+            "Contoh: /threshold_whatif cpu 85 30d"
+        )
+        return
+    store: MetricStore | None = context.bot_data.get("metrics_store")
+    if store is None:
+        await update.message.reply_text("Penyimpanan metrics belum aktif.")
+        return
+    metric = context.args[0].lower()
+    try:
+        value = float(context.args[1])
+        seconds = parse_range(context.args[2])
+        end = time.time()
+        candidates = [value, current_threshold(metric, settings.thresholds)]
+        result, baseline = await what_if_many(
+            store, metric, candidates, end - seconds, end, settings.thresholds
+        )
+    except ValueError as exc:
+        await update.message.reply_text(wrap_failure(str(exc)))
+        return
+    if not result.samples:
+        await update.message.reply_text("Belum ada riwayat metrics untuk rentang itu.")
+        return
+    tzinfo = context.bot_data.get("tzinfo") or dt.timezone.utc
+    lines = render_what_if(result, baseline if baseline.threshold != value else None, tzinfo)
+    await update.message.reply_text(escape("\n".join(lines)))
+    log_action(
+        "admin.threshold_whatif",
+        user_id=user_id,
+        result="ok",
+        detail=f"{metric}={value} {context.args[2]} alerts={len(result.alerts)}",
+    )
+
+
 async def service_add(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     settings: Settings = context.bot_data["settings"]
     user_id = update.effective_user.id
@@ -216,6 +263,7 @@ __all__ = [
     "alerts_status",
     "alert_disable",
     "set_threshold",
+    "threshold_whatif",
     "service_add",
     "service_remove",
 ]
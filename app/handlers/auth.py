@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 import random
+from collections import Counter
 
 from telegram import Update
 from telegram.ext import ApplicationHandlerStop, ContextTypes
@@ -31,6 +32,9 @@ _REJECTIONS = [
 
 async def guard_all(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Blocks non-admin users from accessing handlers other than /start."""
+    counters = context.bot_data.setdefault("counters", Counter())
+    counters["updates"] += 1
+
     # Allow /start for everyone
     if update.message and update.message.text and update.message.text.startswith("/start"):
         return
@@ -42,10 +46,14 @@ async def guard_all(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     if user and settings.is_admin(user.id):
         return
 
+    counters["updates_rejected"] += 1
+
     # For non-admins, send rejection and stop further handlers
     rejection = random.choice(_REJECTIONS)
     if update.message:
         await update.message.reply_text(rejection)
+    elif update.callback_query:
+        await update.callback_query.answer("Tombol ini khusus admin.", show_alert=True)
 
     # Stop handling other commands in the same group and other groups.
     raise ApplicationHandlerStop
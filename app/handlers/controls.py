@@ -2,22 +2,30 @@
 from __future__ import annotations
 
 import asyncio
+import contextlib
 from html import escape
 
 from telegram import Update
+from telegram.error import BadRequest, RetryAfter, TelegramError
 from telegram.ext import ContextTypes
 
 from ..config import Settings
 from ..menus import MAIN_MENU, PROCESSING, wrap_failure, wrap_success
-from ..services.sysctl import control_service, list_services
-from ..utils.logging import log_action
+from ..services.bulk import UnitProgress, expand_targets, predecessors, render_progress, run_bulk
+from ..services.sysctl import control_service, list_services, service_dependencies
+from ..utils.logging import get_logger, log_action
 from ..utils.shell import ShellCommandError
+from .live import EDIT_INTERVAL
+
+logger = get_logger(__name__)
 
 
 async def control_menu(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     await update.message.reply_text(PROCESSING)
     settings: Settings = context.bot_data["settings"]
     statuses = await list_services(settings)
+    accounting = context.bot_data.get("cgroup_accounting")
+    usage = {item.name: item for item in accounting.sample(statuses)} if accounting else {}
     lines = ["Status layanan whitelist (yang aman buat diutak-atik):"]
     for status in statuses:
         indicator = "✅" if status.is_healthy() else "⚠️"
@@ -25,7 +33,12 @@ async def control_menu(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
         safe_state = escape(status.active_state)
         safe_sub = escape(status.sub_state)
         lines.append(f"{indicator} {safe_name} → {safe_state}/{safe_sub}")
+        if status.name in usage:
+            lines.append(f"   {usage[status.name].summary()}")
     lines.append("Butuh manual override? Pakai format: /svc &lt;start|stop|restart|status&gt; &lt;service&gt;.")
+    if settings.service_groups:
+        groups = ", ".join(escape(name) for name in settings.service_groups)
+        lines.append(f"Banyak sekaligus: /svc_bulk &lt;aksi&gt; &lt;unit...|grup&gt; (grup: {groups}).")
     await update.message.reply_text("\n".join(lines), reply_markup=MAIN_MENU)
     log_action("controls.menu", user_id=update.effective_user.id, result="ok", detail="menu")
 
@@ -93,6 +106,95 @@ async def service_command(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
     )
 
 
+async def service_bulk(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    settings: Settings = context.bot_data["settings"]
+    user_id = update.effective_user.id
+    if not settings.is_admin(user_id):
+        await update.message.reply_text("Fitur ini cuma buat admin ya. Minta akses dulu kalau perlu.")
+        log_action("controls.denied", user_id=user_id, result="deny", detail="not admin")
+        return
+    if len(context.args) < 2:
+        await update.message.reply_text(
+            "Formatnya: /svc_bulk &lt;start|stop|restart|reload&gt; &lt;unit...|grup&gt;. "
+            "Grup diatur lewat SERVICE_GROUPS di .env."
+        )
+        return
+
+    action = context.args[0].lower()
+    units = expand_targets(settings, context.args[1:])
+    problems = [unit for unit in units if unit not in settings.services_whitelist]
+    if action not in {"start", "stop", "restart", "reload"}:
+        problems.insert(0, f"aksi {action}")
+    if problems:
+        await update.message.reply_text(
+            wrap_failure(f"Tidak valid / belum di whitelist: {escape(', '.join(problems))}")
+        )
+        return
+    if settings.self_service in units and action in {"restart", "stop"}:
+        await update.message.reply_text(
+            wrap_failure(f"{escape(settings.self_service)} itu bot ini sendiri, pakai /svc {action} saja ya.")
+        )
+        return
+
+    pending = await update.message.reply_text(PROCESSING)
+    try:
+        dependencies = await service_dependencies(units)
+    except ShellCommandError as exc:
+        dependencies = {}
+        log_action("controls.bulk", user_id=user_id, result="warn", detail=f"deps: {exc.stderr}")
+    preds = predecessors(dependencies, units, action)
+    concurrency = settings.bulk_concurrency
+    latest = [UnitProgress(unit) for unit in units]
+    shown = ""
+
+    async def _push() -> float | None:
+        """Edit the message if the progress changed; on flood control, how long to back off."""
+        nonlocal shown
+        text = render_progress(action, latest, concurrency)
+        if text == shown:
+            return None
+        try:
+            await pending.edit_text(text)
+        except RetryAfter as exc:
+            return float(exc.retry_after)
+        except BadRequest:
+            pass  # "message is not modified"
+        except TelegramError as exc:
+            logger.warning("Edit progres bulk gagal: %s", exc)
+        shown = text
+        return None
+
+    async def _show(items: list[UnitProgress]) -> None:
+        nonlocal latest
+        latest = items  # picked up by the flusher; never raises into run_bulk
+
+    async def _flusher() -> None:
+        while True:
+            await asyncio.sleep(EDIT_INTERVAL)
+            await asyncio.sleep(await _push() or 0.0)
+
+    await _push()
+    flusher = asyncio.create_task(_flusher())
+    try:
+        results = await run_bulk(settings, units, action, preds, concurrency=concurrency, on_update=_show)
+    finally:
+        flusher.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await flusher
+    latest = results
+    delay = await _push()
+    if delay is not None:
+        await asyncio.sleep(delay)
+        await _push()
+    failed = [item.name for item in results if item.state != "ok"]
+    log_action(
+        "controls.bulk",
+        user_id=user_id,
+        result="fail" if failed else "ok",
+        detail=f"{action} {' '.join(units)}" + (f" gagal: {' '.join(failed)}" if failed else ""),
+    )
+
+
 async def _run_control_with_feedback(
     context: ContextTypes.DEFAULT_TYPE,
     settings: Settings,
@@ -175,4 +277,4 @@ async def _run_self_control(
         log_action(f"controls.{action}", user_id=user_id, result="fail", detail=str(exc))
 
 
-__all__ = ["control_menu", "service_command"]
+__all__ = ["control_menu", "service_bulk", "service_command"]
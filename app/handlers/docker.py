@@ -7,11 +7,15 @@ from telegram.ext import ContextTypes, ConversationHandler
 from ..config import Settings
 from ..menus import DOCKER_MENU, MAIN_MENU, wrap_failure, wrap_success
 from ..utils.logging import log_action
-from ..utils.shell import run_cmd
+from ..utils.shell import cached_cmd, invalidate_cached, run_cmd
+from .system import OUTPUT_BUDGET, send_spill
 
 # Conversation states
 CONTAINER_NAME_STOP, CONTAINER_NAME_RESTART, CONTAINER_NAME_LOGS = range(3)
 
+# stop/restart below drop the cached list right away
+DOCKER_PS_TTL = 5.0
+
 
 async def docker_menu(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Displays the Docker menu."""
@@ -32,7 +36,7 @@ async def list_containers(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         return
 
     log_action("docker.ps", user_id=user_id, result="start")
-    result = await run_cmd(["docker", "ps"], check=False)
+    result = await cached_cmd(["docker", "ps"], ttl=DOCKER_PS_TTL, check=False)
 
     if result.returncode == 0:
         output = result.stdout.strip()
@@ -40,6 +44,8 @@ async def list_containers(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
             message = "Sepi nih, nggak ada kontainer yang lagi jalan. 🤔"
         else:
             message = f"Ini dia daftar jagoan yang lagi aktif:\n<pre>{output}</pre>"
+        if result.cached_age is not None:
+            message += f"\n{result.cache_note()}"
         await update.message.reply_text(wrap_success(message))
         log_action("docker.ps", user_id=user_id, result="ok")
     else:
@@ -62,6 +68,7 @@ async def stop_container(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
     await update.message.reply_text(f"Oke, aku coba hentiin `{container}`. Bentar ya...")
     log_action("docker.stop", user_id=user_id, result="start", detail=container)
     result = await run_cmd(["docker", "stop", container], check=False)
+    invalidate_cached(("docker", "ps"))
 
     if result.returncode == 0:
         await update.message.reply_text(wrap_success(f"Kontainer `{container}` berhasil dihentikan. Tidur nyenyak ya, paus kecil. 😴"), reply_markup=DOCKER_MENU)
@@ -85,6 +92,7 @@ async def restart_container(update: Update, context: ContextTypes.DEFAULT_TYPE)
     await update.message.reply_text(f"Siap! Aku restart dulu si `{container}`. Biar semangat lagi! 🔥")
     log_action("docker.restart", user_id=user_id, result="start", detail=container)
     result = await run_cmd(["docker", "restart", container], check=False)
+    invalidate_cached(("docker", "ps"))
 
     if result.returncode == 0:
         await update.message.reply_text(wrap_success(f"Voila! Kontainer `{container}` udah fresh dan jalan lagi."), reply_markup=DOCKER_MENU)
@@ -107,16 +115,23 @@ async def logs_container(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
     user_id = update.effective_user.id
     await update.message.reply_text(f"Oke, aku cariin buku harian si `{container}`. Sebentar ya, lagi ngintip... 👀")
     log_action("docker.logs", user_id=user_id, result="start", detail=container)
-    result = await run_cmd(["docker", "logs", container], check=False)
+    settings: Settings = context.bot_data["settings"]
+    result = await run_cmd(
+        ["docker", "logs", container], check=False, max_output=OUTPUT_BUDGET, spill_dir=settings.spill_dir
+    )
 
-    if result.returncode == 0:
-        output = result.stdout or "(Kosong, nggak ada curhatan.)"
-        message = f"Ini dia isi hatinya si `{container}`:\n<pre>{output}</pre>"
-        await update.message.reply_text(wrap_success(message), reply_markup=DOCKER_MENU)
-        log_action("docker.logs", user_id=user_id, result="ok", detail=container)
-    else:
-        await update.message.reply_text(wrap_failure(f"Waduh, nggak nemu buku hariannya. Kayaknya dia pemalu. 😥\n<pre>{result.stderr or 'Unknown error'}</pre>"), reply_markup=DOCKER_MENU)
-        log_action("docker.logs", user_id=user_id, result="fail", detail=result.stderr)
+    try:
+        if result.returncode == 0:
+            output = result.stdout or "(Kosong, nggak ada curhatan.)"
+            message = f"Ini dia isi hatinya si `{container}`:\n<pre>{output}</pre>"
+            await update.message.reply_text(wrap_success(message), reply_markup=DOCKER_MENU)
+            log_action("docker.logs", user_id=user_id, result="ok", detail=container)
+        else:
+            await update.message.reply_text(wrap_failure(f"Waduh, nggak nemu buku hariannya. Kayaknya dia pemalu. 😥\n<pre>{result.stderr or 'Unknown error'}</pre>"), reply_markup=DOCKER_MENU)
+            log_action("docker.logs", user_id=user_id, result="fail", detail=result.stderr)
+    finally:
+        # the spill file exists whenever output was cut, whichever branch ran
+        await send_spill(update.message, result)
     return ConversationHandler.END
 
 
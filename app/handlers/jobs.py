@@ -0,0 +1,109 @@
+"""Queue heavy commands through the scheduler and show them with /jobs."""
+from __future__ import annotations
+
+import functools
+from html import escape
+from typing import Awaitable, Callable, TypeVar
+
+from telegram import Update
+from telegram.error import TelegramError
+from telegram.ext import ContextTypes
+
+from ..services.scheduler import PRIORITY_NORMAL, CommandScheduler, Job, JobCancelled
+from ..utils.logging import get_logger, log_action
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+Handler = Callable[[Update, ContextTypes.DEFAULT_TYPE], Awaitable[T]]
+
+
+def scheduled(category: str, *, priority: int = PRIORITY_NORMAL) -> Callable[[Handler], Handler]:
+    """Run the whole handler inside a scheduler slot of ``category``.
+
+    When it has to wait the user gets the queue position and the cancel
+    command. Register the result with ``block=False`` so a queued handler does
+    not hold up other updates.
+    """
+
+    def decorator(handler: Handler) -> Handler:
+        @functools.wraps(handler)
+        async def wrapper(update: Update, context: ContextTypes.DEFAULT_TYPE):
+            scheduler: CommandScheduler | None = context.bot_data.get("scheduler")
+            if scheduler is None:
+                return await handler(update, context)
+            message = update.effective_message
+            label = ((message.text if message else None) or handler.__name__)[:60]
+
+            async def _queued(job: Job, position: int) -> None:
+                try:
+                    await message.reply_text(
+                        f"🕒 {escape(label)} antri di posisi {position} ({category}). "
+                        f"Batalin pakai /jobs cancel {job.id}"
+                    )
+                except TelegramError as exc:
+                    logger.warning("Gagal kirim posisi antrian: %s", exc)
+
+            try:
+                return await scheduler.run(
+                    category,
+                    label,
+                    lambda: handler(update, context),
+                    priority=priority,
+                    user_id=update.effective_user.id if update.effective_user else None,
+                    on_queued=_queued if message else None,
+                )
+            except JobCancelled as exc:
+                if message:
+                    await message.reply_text(f"🚫 {escape(label)} dibatalin.")
+                log_action("jobs.run", user_id=None, result="cancel", detail=str(exc))
+                return None
+
+        return wrapper
+
+    return decorator
+
+
+def _describe(job: Job, scheduler: CommandScheduler, now: float) -> str:
+    if job.state == "running":
+        status = f"🔄 jalan {int(now - (job.started_at or now))} dtk"
+    else:
+        status = f"🕒 antri #{scheduler.position(job)}, {int(now - job.queued_at)} dtk"
+    owner = f" · user {job.user_id}" if job.user_id else ""
+    return f"#{job.id} [{job.category}] {escape(job.label)} — {status}{owner}"
+
+
+async def jobs_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """List running/queued jobs; ``/jobs cancel <id>`` cancels one."""
+    scheduler: CommandScheduler | None = context.bot_data.get("scheduler")
+    user_id = update.effective_user.id
+    if scheduler is None:
+        await update.message.reply_text("Scheduler job belum aktif.")
+        return
+    args = context.args or []
+    if args and args[0] == "cancel":
+        if len(args) < 2 or not args[1].lstrip("#").isdigit():
+            await update.message.reply_text("Format: /jobs cancel &lt;id&gt;")
+            return
+        job = scheduler.cancel(int(args[1].lstrip("#")))
+        if job is None:
+            await update.message.reply_text("Job itu nggak ada (mungkin sudah selesai).")
+            return
+        await update.message.reply_text(f"Job #{job.id} ({escape(job.label)}) dibatalin.")
+        log_action("jobs.cancel", user_id=user_id, result="ok", detail=f"#{job.id} {job.label}")
+        return
+
+    now = scheduler.clock()
+    caps = ", ".join(f"{name} {scheduler.active(name)}/{limit}" for name, limit in scheduler.limits.items())
+    jobs = scheduler.jobs()
+    lines = [f"Slot: {caps}"]
+    if jobs:
+        lines += [_describe(job, scheduler, now) for job in jobs]
+        lines.append("Batalin pakai /jobs cancel &lt;id&gt;")
+    else:
+        lines.append("Nggak ada job yang jalan atau antri.")
+    await update.message.reply_text("\n".join(lines))
+    log_action("jobs.list", user_id=user_id, result="ok", detail=f"{len(jobs)} job")
+
+
+__all__ = ["jobs_command", "scheduled"]
@@ -0,0 +1,100 @@
+"""Mirror a running command's output into one Telegram message."""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import time
+from collections import deque
+from html import escape
+from typing import Callable, Deque
+
+from telegram import Message
+from telegram.error import BadRequest, RetryAfter, TelegramError
+
+from ..utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+LIVE_LINES = 15
+LINE_WIDTH = 200
+# Telegram starts answering 429 well before one edit per second on one chat
+EDIT_INTERVAL = 2.0
+HEARTBEAT = 10.0
+
+
+class LiveOutput:
+    """Keep the last ``lines`` output lines visible in ``message`` while a command runs.
+
+    ``push`` only touches the window; a background task edits the message at
+    most once per ``interval`` and only when something changed, or every
+    ``heartbeat`` seconds so a quiet command still shows it is alive. Memory is
+    bounded by the window, whatever the command prints.
+    """
+
+    def __init__(
+        self,
+        message: Message,
+        title: str,
+        *,
+        lines: int = LIVE_LINES,
+        interval: float = EDIT_INTERVAL,
+        heartbeat: float = HEARTBEAT,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.message = message
+        self.title = title
+        self.interval = interval
+        self.heartbeat = heartbeat
+        self.clock = clock
+        self.window: Deque[str] = deque(maxlen=lines)
+        self.edits = 0
+        self._dirty = False
+        self._started = clock()
+        self._last_edit = self._started
+        self._task: asyncio.Task | None = None
+
+    def push(self, line: str) -> None:
+        line = line.rstrip()
+        if line:
+            self.window.append(line[:LINE_WIDTH])
+            self._dirty = True
+
+    def render(self) -> str:
+        elapsed = int(self.clock() - self._started)
+        body = f"\n<pre>{escape(chr(10).join(self.window))}</pre>" if self.window else ""
+        return f"⏳ {escape(self.title)} — {elapsed} dtk{body}"
+
+    async def flush(self) -> None:
+        self._dirty = False
+        self._last_edit = self.clock()
+        try:
+            await self.message.edit_text(self.render())
+            self.edits += 1
+        except RetryAfter as exc:
+            self._dirty = True
+            self._last_edit += float(exc.retry_after)
+        except BadRequest as exc:  # "message is not modified" and friends
+            logger.debug("Edit live output dilewati: %s", exc)
+        except TelegramError as exc:
+            logger.warning("Edit live output gagal: %s", exc)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            since = self.clock() - self._last_edit
+            if (self._dirty and since >= self.interval) or since >= self.heartbeat:
+                await self.flush()
+
+    async def __aenter__(self) -> "LiveOutput":
+        self._task = asyncio.create_task(self._run())
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+
+__all__ = ["LiveOutput", "LIVE_LINES", "EDIT_INTERVAL"]
@@ -2,23 +2,35 @@
 from __future__ import annotations
 
 import asyncio
+import secrets
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from html import escape
 from pathlib import Path
 
-from telegram import Update
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Update
 from telegram.ext import ContextTypes
 
 from ..config import Settings
 from ..menus import MAIN_MENU, PROCESSING, wrap_failure, wrap_success
-from ..services.sysctl import tail_journal
+from ..services.history import parse_range
+from ..services.journal import JournalPage, JournalQuery, parse_priority, read_journal, render_entries
+from ..services.journaltop import JournalTop
 from ..utils.logging import log_action
+from ..utils.shell import ShellCommandError
+
+_MAX_VIEWS = 100
+_TAIL_BLOCK = 8192
 
 
 async def logs_menu(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     text = (
         "Menu log siap bantu debugging cepat:\n"
         "• /log_runtime → tail realtime\n"
-        "• /log_journal &lt;service&gt; → ambil journalctl\n"
+        "• /log_journal &lt;service&gt; [prioritas] [rentang] → journalctl, lanjut dari terakhir dicek\n"
         "• /log_errors → cari kata `error`\n"
+        "• /journal_top [rentang] → service paling berisik (warning ke atas)\n"
         "Kalau butuh file full-nya, kirim /log_file."
     )
     await update.message.reply_text(text, reply_markup=MAIN_MENU)
@@ -54,29 +66,182 @@ async def log_file(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     log_action("logs.file", user_id=update.effective_user.id, result="ok", detail="runtime.log")
 
 
+@dataclass(slots=True)
+class _JournalView:
+    """Paging state behind one journal message's inline buttons."""
+
+    query: JournalQuery
+    oldest: str | None
+    newest: str | None
+
+
+def _journal_query(service: str, args: list[str]) -> JournalQuery:
+    query = JournalQuery(service=service)
+    for arg in args:
+        if arg[-1:].lower() in "mhdw" and arg[:-1].isdigit():
+            query.since = time.time() - parse_range(arg)
+        else:
+            query.priority = parse_priority(arg)
+    return query
+
+
+def _journal_keyboard(token: str) -> InlineKeyboardMarkup:
+    return InlineKeyboardMarkup(
+        [
+            [
+                InlineKeyboardButton("⬅️ Lebih lama", callback_data=f"journal:{token}:older"),
+                InlineKeyboardButton("Lebih baru ➡️", callback_data=f"journal:{token}:newer"),
+            ]
+        ]
+    )
+
+
+def _remember(context: ContextTypes.DEFAULT_TYPE, chat_id: int, view: _JournalView, page: JournalPage) -> None:
+    """Keep the newest cursor this chat has seen so the next call starts after it."""
+    if not page.entries:
+        return
+    newest = page.entries[-1]
+    cursors = context.bot_data.setdefault("journal_cursors", {})
+    key = (chat_id, view.query.service)
+    seen = cursors.get(key)
+    if seen is None or newest.timestamp > seen[1]:
+        cursors[key] = (newest.cursor, newest.timestamp)
+
+
 async def log_journal(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    settings: Settings = context.bot_data["settings"]
     if not context.args:
-        await update.message.reply_text("Gunakan /log_journal &lt;service&gt;.")
+        await update.message.reply_text(
+            "Gunakan /log_journal &lt;service&gt; [prioritas] [rentang]. Contoh: /log_journal nginx err 6h"
+        )
         return
     service = context.args[0]
+    try:
+        query = _journal_query(service, context.args[1:])
+    except ValueError as exc:
+        await update.message.reply_text(wrap_failure(str(exc)))
+        return
+    chat_id = update.effective_chat.id
+    seen = context.bot_data.setdefault("journal_cursors", {}).get((chat_id, service))
     pending = await update.message.reply_text(PROCESSING)
-    content = await tail_journal(service)
-    await pending.edit_text(wrap_success(content))
+    try:
+        if seen:
+            page = await read_journal(query, after_cursor=seen[0])
+        else:
+            page = await read_journal(query, older=True)
+    except ShellCommandError as exc:
+        await pending.edit_text(wrap_failure(escape(exc.stderr.strip() or str(exc))))
+        log_action("logs.journal", user_id=update.effective_user.id, result="fail", detail=service)
+        return
+
+    entries = page.entries
+    view = _JournalView(
+        query=query,
+        oldest=entries[0].cursor if entries else None,
+        newest=entries[-1].cursor if entries else (seen[0] if seen else None),
+    )
+    _remember(context, chat_id, view, page)
+    if not seen:
+        header = f"Journal {escape(service)} terbaru:"
+    elif entries:
+        more = " (masih ada lagi, tekan Lebih baru)" if page.more else ""
+        header = f"Journal {escape(service)}: {len(entries)} baris baru sejak terakhir dicek{more}:"
+    else:
+        header = f"Belum ada baris baru di {escape(service)} sejak terakhir dicek."
+    if not entries and not seen:
+        header = f"Journal {escape(service)} kosong untuk filter ini."
+
+    views: OrderedDict = context.bot_data.setdefault("journal_views", OrderedDict())
+    token = secrets.token_hex(4)
+    views[token] = view
+    while len(views) > _MAX_VIEWS:
+        views.popitem(last=False)
+    body = render_entries(entries, context.bot_data.get("tzinfo"))
+    text = f"{header}\n{body}" if body else header
+    await pending.edit_text(text, reply_markup=_journal_keyboard(token))
     log_action("logs.journal", user_id=update.effective_user.id, result="ok", detail=service)
 
 
+async def journal_page(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Inline button handler: page older/newer from the cursors of the shown page."""
+    callback = update.callback_query
+    _prefix, token, direction = callback.data.split(":", 2)
+    view: _JournalView | None = context.bot_data.get("journal_views", {}).get(token)
+    if view is None:
+        await callback.answer("Sesi log sudah kedaluwarsa, kirim /log_journal lagi.")
+        return
+    older = direction == "older"
+    cursor = view.oldest if older else view.newest
+    try:
+        if cursor is None:
+            page = await read_journal(view.query, older=True)
+        else:
+            page = await read_journal(view.query, after_cursor=cursor, older=older)
+    except ShellCommandError as exc:
+        await callback.answer(f"journalctl gagal: {exc.stderr.strip()[:150]}")
+        return
+    if not page.entries:
+        await callback.answer("Tidak ada baris yang lebih lama." if older else "Belum ada baris baru.")
+        return
+    view.oldest, view.newest = page.entries[0].cursor, page.entries[-1].cursor
+    _remember(context, update.effective_chat.id, view, page)
+    await callback.answer()
+    header = f"Journal {escape(view.query.service)} ({'lebih lama' if older else 'lebih baru'}):"
+    body = render_entries(page.entries, context.bot_data.get("tzinfo"))
+    await callback.edit_message_text(f"{header}\n{body}", reply_markup=_journal_keyboard(token))
+
+
+async def journal_top(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    tracker: JournalTop | None = context.bot_data.get("journal_top")
+    if tracker is None:
+        await update.message.reply_text("Agregasi journal lagi mati (JOURNAL_TOP_HOURS=0).")
+        return
+    try:
+        seconds = parse_range(context.args[0]) if context.args else 3600
+    except ValueError as exc:
+        await update.message.reply_text(wrap_failure(str(exc)))
+        return
+    hours = min(tracker.hours, max(1, -(-seconds // 3600)))
+    noisy = tracker.top(hours=hours)
+    if not noisy:
+        await update.message.reply_text(f"Tidak ada warning/error di journal {hours} jam terakhir. Adem 😌")
+    else:
+        lines = [f"Top warning/error journal {hours} jam terakhir:"]
+        for item in noisy:
+            lines.append(f"\n<b>{escape(item.service)}</b> — {item.total} pesan")
+            lines += [f"  {count}× <code>{escape(text)}</code>" for text, count in item.top]
+        await update.message.reply_text("\n".join(lines))
+    log_action("logs.journal_top", user_id=update.effective_user.id, result="ok", detail=f"{hours}h")
+
+
 async def _tail_file(path: Path, lines: int) -> str:
     loop = asyncio.get_running_loop()
     return await loop.run_in_executor(None, _read_tail, path, lines)
 
 
-def _read_tail(path: Path, lines: int) -> str:
+def _read_tail(path: Path, lines: int, block_size: int = _TAIL_BLOCK) -> str:
+    """Last ``lines`` lines, read backwards in blocks so the cost follows ``lines``, not file size."""
     if not path.exists():
         return "File belum ada."
-    with path.open("r", encoding="utf-8", errors="ignore") as handle:
-        data = handle.readlines()[-lines:]
-    return "".join(data)
+    if lines <= 0:
+        return ""
+    with path.open("rb") as handle:
+        position = handle.seek(0, 2)
+        blocks: list[bytes] = []
+        newlines = 0
+        while position > 0:
+            step = min(block_size, position)
+            position -= step
+            handle.seek(position)
+            block = handle.read(step)
+            if not blocks and block.endswith(b"\n"):
+                newlines -= 1  # the final newline ends the last line, it does not start a new one
+            blocks.append(block)
+            newlines += block.count(b"\n")
+            if newlines >= lines:
+                break
+    data = b"".join(reversed(blocks))
+    tail = data.splitlines(keepends=True)[-lines:]
+    return b"".join(tail).decode("utf-8", errors="ignore")
 
 
 async def _grep_file(path: Path, keyword: str) -> list[str]:
@@ -96,4 +261,4 @@ def _grep_sync(path: Path, keyword: str) -> list[str]:
     return matched
 
 
-__all__ = ["logs_menu", "log_runtime", "log_errors", "log_file", "log_journal"]
+__all__ = ["logs_menu", "log_runtime", "log_errors", "log_file", "log_journal", "journal_page", "journal_top"]
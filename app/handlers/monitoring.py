@@ -1,6 +1,7 @@
 """Monitoring related handlers."""
 from __future__ import annotations
 
+import time
 from html import escape
 
 from telegram import Update
@@ -8,16 +9,20 @@ from telegram.error import TelegramError
 from telegram.ext import ContextTypes
 
 from ..config import Settings
-from ..menus import MAIN_MENU, PROCESSING, wrap_success
-from ..services.metrics import collect_metrics, metrics_summary
+from ..menus import MAIN_MENU, PROCESSING, wrap_failure, wrap_success
+from ..services.forecast import format_eta
+from ..services.history import MetricsHistory, parse_range, sparkline
+from ..services.metrics import HealthMonitor, metrics_summary
+from ..services.sampler import current_metrics
 from ..utils.format import human_bytes, human_duration, render_table
 from ..utils.logging import log_action
+from ..utils.perf import PERF
 
 
 async def show_status(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     settings: Settings = context.bot_data["settings"]
     pending = await update.message.reply_text(PROCESSING)
-    metrics = collect_metrics(settings)
+    metrics = await current_metrics(context.bot_data, settings)
 
     rows = [
         ("CPU", f"{metrics.cpu_percent:.1f}%"),
@@ -48,6 +53,31 @@ async def show_status(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Non
     if metrics.temperatures:
         top = max(metrics.temperatures, key=lambda temp: temp.current)
         rows.append(("Suhu", f"{top.label} {top.current:.0f}°C"))
+    if metrics.cpu_per_core:
+        rows.append(("Per core", " ".join(f"{value:.0f}%" for value in metrics.cpu_per_core)))
+    for disk in metrics.disk_io:
+        rows.append(
+            (
+                f"IO {disk.name}",
+                f"R {human_bytes(disk.read_bps)}/s W {human_bytes(disk.write_bps)}/s "
+                f"{disk.read_iops + disk.write_iops:.0f} IOPS {disk.await_ms:.1f} ms",
+            )
+        )
+    for nic in metrics.net_io:
+        rows.append(
+            (
+                f"Net {nic.name}",
+                f"↓ {human_bytes(nic.rx_bps)}/s ↑ {human_bytes(nic.tx_bps)}/s err {nic.errors_per_s:.1f}/s",
+            )
+        )
+    monitor: HealthMonitor | None = context.bot_data.get("health_monitor")
+    for forecast in monitor.forecast.forecasts() if monitor else ():
+        if forecast.seconds_to_full is None:
+            eta = "stabil"
+        else:
+            growth = human_bytes(forecast.bytes_per_second * 86400)
+            eta = f"~{format_eta(forecast.seconds_to_full)} (+{growth}/hari)"
+        rows.append((f"Penuh {forecast.label}", eta))
 
     summary = metrics_summary(metrics)
     detail = render_table([(name, value) for name, value in rows])
@@ -66,7 +96,7 @@ async def show_status(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Non
 
 async def uptime_detail(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     settings: Settings = context.bot_data["settings"]
-    metrics = collect_metrics(settings)
+    metrics = await current_metrics(context.bot_data, settings)
     uptime = human_duration(metrics.uptime_seconds)
     if metrics.temperatures:
         temps_lines = "\n".join(
@@ -81,4 +111,85 @@ async def uptime_detail(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
     log_action("monitoring.uptime", user_id=update.effective_user.id, result="ok", detail=text)
 
 
-__all__ = ["show_status", "uptime_detail"]
+async def history_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    history: MetricsHistory | None = context.bot_data.get("metrics_history")
+    if len(context.args) < 2:
+        await update.message.reply_text(
+            "Format: /history &lt;cpu|ram|swap|disk|hdd|temp|load&gt; &lt;rentang&gt;. Contoh: /history cpu 6h"
+        )
+        return
+    if history is None:
+        await update.message.reply_text("Riwayat metrics belum aktif.")
+        return
+    try:
+        seconds = parse_range(context.args[1])
+        result = history.query(context.args[0], seconds, now=time.time())
+    except ValueError as exc:
+        await update.message.reply_text(wrap_failure(str(exc)))
+        return
+
+    summary = result.summary()
+    if summary is None:
+        await update.message.reply_text("Belum ada data untuk rentang itu. Tunggu sampler jalan sebentar ya.")
+        return
+    low, avg, high = summary
+    fmt = _metric_formatter(result.metric)
+    text = (
+        f"Riwayat {escape(result.metric)} {escape(context.args[1])} (resolusi {result.resolution}):\n"
+        f"<code>{sparkline([point[2] for point in result.points])}</code>\n"
+        f"min {fmt(low)} | rata-rata {fmt(avg)} | max {fmt(high)}"
+    )
+    await update.message.reply_text(text, reply_markup=MAIN_MENU)
+    log_action(
+        "monitoring.history",
+        user_id=update.effective_user.id,
+        result="ok",
+        detail=f"{result.metric} {context.args[1]}",
+    )
+
+
+def _ms(value: float) -> str:
+    return f"{value / 1000:.1f}s" if value >= 1000 else f"{value:.0f}ms"
+
+
+async def perf_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Slowest handlers/commands/jobs by p95; ``/perf reset`` starts over."""
+    settings: Settings = context.bot_data["settings"]
+    user_id = update.effective_user.id
+    if not settings.is_admin(user_id):
+        await update.message.reply_text("Laporan performa khusus admin ya.")
+        return
+    if context.args and context.args[0] == "reset":
+        PERF.reset()
+        await update.message.reply_text(wrap_success("Statistik performa direset."))
+        log_action("monitoring.perf", user_id=user_id, result="ok", detail="reset")
+        return
+    limit = int(context.args[0]) if context.args and context.args[0].isdigit() else 15
+    summaries = PERF.summaries()[:limit]
+    if not summaries:
+        await update.message.reply_text("Belum ada data performa yang tercatat.")
+        return
+    rows = [("path", "n", "p50", "p95", "p99", "max")]
+    rows += [
+        (item.name[:28], str(item.count), _ms(item.p50_ms), _ms(item.p95_ms), _ms(item.p99_ms), _ms(item.max_ms))
+        for item in summaries
+    ]
+    since = human_duration(time.time() - PERF.since)
+    text = f"Path paling lambat (p95) selama {since} terakhir:\n<pre>{escape(render_table(rows))}</pre>"
+    await update.message.reply_text(text + "\nReset: /perf reset")
+    log_action("monitoring.perf", user_id=user_id, result="ok", detail=f"{len(summaries)} path")
+
+
+def _metric_formatter(metric: str):
+    if metric.endswith(("_free", "_total", "_available")):
+        return human_bytes
+    if metric == "uptime_seconds":
+        return human_duration
+    if metric.startswith("temp"):
+        return lambda value: f"{value:.0f}°C"
+    if metric.endswith("_percent"):
+        return lambda value: f"{value:.1f}%"
+    return lambda value: f"{value:.2f}"
+
+
+__all__ = ["show_status", "uptime_detail", "history_command", "perf_command"]
@@ -10,7 +10,19 @@ from ..config import Settings
 from ..menus import MAIN_MENU, PROCESSING, wrap_failure, wrap_success
 from ..services.net import IPInterface, ip_info, ping, speed_quick, tailscale_status
 from ..utils.logging import log_action
-from ..utils.shell import run_cmd
+from ..utils.shell import cached_cmd
+from .live import LiveOutput
+
+PING_TTL = 30.0
+SPEEDTEST_TTL = 600.0
+# "/speed fresh", "/tailscale fresh", "/ping fresh" skip the cached result
+FRESH_ARG = "fresh"
+
+
+def _wants_fresh(context: ContextTypes.DEFAULT_TYPE) -> tuple[bool, list[str]]:
+    args = list(context.args or [])
+    fresh = FRESH_ARG in args
+    return fresh, [arg for arg in args if arg != FRESH_ARG]
 
 
 async def network_menu(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -35,10 +47,14 @@ def _format_interface_rows(interfaces: list[IPInterface]) -> list[str]:
 
 async def ping_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     settings: Settings = context.bot_data["settings"]
-    host = context.args[0] if context.args else settings.ping_host
+    fresh, args = _wants_fresh(context)
+    host = args[0] if args else settings.ping_host
     pending = await update.message.reply_text(PROCESSING)
-    result = await ping(host)
+    # only the default host is pinged from the menu over and over
+    result = await ping(host, ttl=PING_TTL if host == settings.ping_host else 0.0, fresh=fresh)
     text = result.stdout or result.stderr or "Ping tidak memberikan output."
+    if result.cached_age is not None:
+        text = f"{text}\n{result.cache_note()}"
     payload = f"Hasil ping ke {escape(host)}:\n{text}" if text else f"Hasil ping ke {escape(host)} tidak ada respons."
     await pending.edit_text(wrap_success(payload[:3500]))
     log_action("network.ping", user_id=update.effective_user.id, result="ok", detail=host)
@@ -47,13 +63,18 @@ async def ping_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
 async def speed_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Runs a speed test with real-time feedback."""
     user_id = update.effective_user.id
+    fresh, _args = _wants_fresh(context)
 
     pending = await update.message.reply_text("Oke, mulai tes kecepatan... 💨 Sabar ya, ini butuh waktu sekitar satu menit.")
     log_action("network.speed", user_id=user_id, result="start")
 
     try:
         # Menjalankan speedtest-cli dengan output JSON
-        result = await run_cmd(["speedtest-cli", "--json"], check=True, timeout=120)
+        # JSON only arrives at the end, so the live message is just an elapsed-time heartbeat
+        async with LiveOutput(pending, "speedtest-cli"):
+            result = await cached_cmd(
+                ["speedtest-cli", "--json"], ttl=SPEEDTEST_TTL, check=True, timeout=120, fresh=fresh
+            )
 
         # Mengurai output JSON
         import json
@@ -70,6 +91,8 @@ async def speed_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
             f"<b>Download:</b> {download_speed:.2f} Mbps\n"
             f"<b>Upload:</b> {upload_speed:.2f} Mbps"
         )
+        if result.cached_age is not None:
+            final_message += f"\n{result.cache_note()} — /speed fresh buat tes ulang"
 
         await pending.edit_text(wrap_success(final_message))
         log_action("network.speed", user_id=user_id, result="ok", detail=result.stdout)
@@ -82,7 +105,8 @@ async def speed_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
 
 async def tailscale_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     pending = await update.message.reply_text(PROCESSING)
-    text = await tailscale_status()
+    fresh, _args = _wants_fresh(context)
+    text = await tailscale_status(fresh=fresh)
     await pending.edit_text(wrap_success(f"Status Tailscale:\n{text}"[:3500]))
     log_action("network.tailscale", user_id=update.effective_user.id, result="ok", detail=text[:200])
 
@@ -6,7 +6,8 @@ from telegram.ext import ContextTypes
 
 from ..config import Settings
 from ..menus import MAIN_MENU, wrap_success
-from ..services.metrics import collect_metrics, metrics_summary
+from ..services.metrics import metrics_summary
+from ..services.sampler import current_metrics
 from ..utils.logging import log_action
 
 
@@ -38,7 +39,7 @@ async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
 
 async def status_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     settings: Settings = context.bot_data["settings"]
-    metrics = collect_metrics(settings)
+    metrics = await current_metrics(context.bot_data, settings)
     summary = metrics_summary(metrics)
     await update.message.reply_text(wrap_success(summary), reply_markup=MAIN_MENU)
     log_action("status", user_id=update.effective_user.id, result="ok", detail=summary)
@@ -1,13 +1,35 @@
 """System command handlers."""
 from __future__ import annotations
 
-from telegram import Update
+from telegram import Message, Update
 from telegram.ext import ContextTypes
 
 from ..config import Settings
 from ..menus import wrap_failure, wrap_success
-from ..utils.logging import log_action
-from ..utils.shell import run_cmd
+from ..utils.format import human_bytes
+from ..utils.logging import get_logger, log_action
+from ..utils.shell import CommandResult, run_cmd
+from .live import LiveOutput
+
+logger = get_logger(__name__)
+
+# what a Telegram message can show anyway; the rest goes to a spill file
+OUTPUT_BUDGET = 3000
+
+
+async def send_spill(message: Message, result: CommandResult) -> None:
+    """Send the full output of a truncated command as a document, then delete it."""
+    if result.spill_path is None:
+        return
+    try:
+        await message.reply_document(
+            document=result.spill_path,
+            caption=f"Output lengkap ({human_bytes(result.dropped_bytes)} dipotong dari pesan).",
+        )
+    except Exception as exc:  # pragma: no cover - network dependent
+        logger.warning("Gagal kirim output lengkap %s: %s", result.spill_path, exc)
+    finally:
+        result.spill_path.unlink(missing_ok=True)
 
 
 async def run_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -23,17 +45,24 @@ async def run_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Non
         return
 
     command = context.args
-    log_action("system.run", user_id=user_id, result="start", detail=" ".join(command))
-    result = await run_cmd(command, check=False)
-
     command_str = " ".join(command)
-    if result.returncode == 0:
-        output = result.stdout or "(no output)"
-        message = f"<code>$ {command_str}</code>\n\n<pre>{output}</pre>"
-        await update.message.reply_text(wrap_success(message))
-        log_action("system.run", user_id=user_id, result="ok", detail=command_str)
-    else:
-        output = result.stderr or "(no error message)"
-        message = f"<code>$ {command_str}</code>\n\n<pre>{output}</pre>"
-        await update.message.reply_text(wrap_failure(message))
-        log_action("system.run", user_id=user_id, result="fail", detail=command_str)
+    log_action("system.run", user_id=user_id, result="start", detail=command_str)
+    pending = await update.message.reply_text(f"⏳ $ {command_str}")
+    async with LiveOutput(pending, f"$ {command_str}") as live:
+        result = await run_cmd(
+            command, check=False, max_output=OUTPUT_BUDGET, spill_dir=settings.spill_dir, on_line=live.push
+        )
+
+    try:
+        if result.returncode == 0:
+            output = result.stdout or "(no output)"
+            message = f"<code>$ {command_str}</code>\n\n<pre>{output}</pre>"
+            await pending.edit_text(wrap_success(message))
+            log_action("system.run", user_id=user_id, result="ok", detail=command_str)
+        else:
+            output = result.stderr or "(no error message)"
+            message = f"<code>$ {command_str}</code>\n\n<pre>{output}</pre>"
+            await pending.edit_text(wrap_failure(message))
+            log_action("system.run", user_id=user_id, result="fail", detail=command_str)
+    finally:
+        await send_spill(update.message, result)
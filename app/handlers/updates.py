@@ -10,6 +10,8 @@ from ..config import Settings
 from ..menus import MAIN_MENU, PROCESSING, wrap_failure, wrap_success
 from ..utils.logging import log_action
 from ..utils.shell import run_cmd
+from .live import LiveOutput
+from .system import OUTPUT_BUDGET
 
 
 async def update_menu(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -38,14 +40,18 @@ async def apt_update(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None
         await pending.edit_text(wrap_failure(hint))
         log_action("updates.apt", user_id=user_id, result="deny", detail=sudo_check.stderr)
         return
-    result = await run_cmd(
-        (
-            "bash",
-            "-lc",
-            "sudo apt update && sudo apt upgrade -y",
-        ),
-        check=False,
-    )
+    async with LiveOutput(pending, "apt update + upgrade") as live:
+        result = await run_cmd(
+            (
+                "bash",
+                "-lc",
+                "sudo apt update && sudo apt upgrade -y",
+            ),
+            check=False,
+            timeout=1800,
+            max_output=OUTPUT_BUDGET,
+            on_line=live.push,
+        )
     if result.returncode == 0:
         await pending.edit_text(wrap_success("APT update sukses."))
         log_action("updates.apt", user_id=user_id, result="ok", detail=result.stdout)
@@ -72,7 +78,10 @@ async def pip_sync(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         )
         return
     command = (str(pip_path), "install", "-r", str(requirements))
-    result = await run_cmd(command, check=False)
+    async with LiveOutput(pending, "pip install") as live:
+        result = await run_cmd(
+            command, check=False, timeout=900, max_output=OUTPUT_BUDGET, on_line=live.push
+        )
     if result.returncode == 0:
         await pending.edit_text(wrap_success("Pip sinkron sukses."))
         log_action("updates.pip", user_id=user_id, result="ok", detail=result.stdout)
@@ -88,15 +97,18 @@ async def git_pull(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         await update.message.reply_text("Akses ini khusus admin ya, minta izin dulu kalau perlu.")
         return
     pending = await update.message.reply_text(PROCESSING)
-    result = await run_cmd(
-        (
-            "git",
-            "-C",
-            str(settings.data_dir / "app"),
-            "pull",
-        ),
-        check=False,
-    )
+    async with LiveOutput(pending, "git pull") as live:
+        result = await run_cmd(
+            (
+                "git",
+                "-C",
+                str(settings.data_dir / "app"),
+                "pull",
+            ),
+            check=False,
+            max_output=OUTPUT_BUDGET,
+            on_line=live.push,
+        )
     if result.returncode == 0:
         await pending.edit_text(wrap_success(result.stdout or "Git up to date."))
         log_action("updates.git", user_id=user_id, result="ok", detail=result.stdout)
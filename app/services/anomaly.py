@@ -0,0 +1,178 @@
+"""EWMA / z-score anomaly detection with optional hour-of-week baselines."""
+from __future__ import annotations
+
+import datetime as dt
+import math
+import time
+from array import array
+from typing import TYPE_CHECKING, Dict, Iterator, Mapping, Tuple
+
+from ..config import Thresholds
+from ..utils.logging import get_logger
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .metrics import SystemMetrics
+
+logger = get_logger(__name__)
+
+SLOTS = 168  # hours in a week
+_WEEK = 7 * 86400
+
+# metric column -> (label, unit, minimum standard deviation)
+ANOMALY_METRICS: Dict[str, Tuple[str, str, float]] = {
+    "cpu_percent": ("CPU", "%", 3.0),
+    "mem_percent": ("RAM", "%", 1.0),
+    "swap_percent": ("Swap", "%", 1.0),
+    "load_1": ("Load", "", 0.25),
+    "temp_max": ("Suhu", "°C", 1.0),
+}
+
+
+def _alpha(half_life: float) -> float:
+    """Smoothing factor whose weight halves after ``half_life`` updates."""
+    return 1.0 - 0.5 ** (1.0 / max(half_life, 1.0))
+
+
+class Baseline:
+    """Exponentially weighted mean/variance, globally and per hour of week.
+
+    Memory is fixed per metric: three floats for the global estimate plus three
+    ``array('d')`` columns of 168 slots for the seasonal one.
+    """
+
+    __slots__ = ("alpha", "seasonal_alpha", "mean", "var", "count", "_means", "_vars", "_counts")
+
+    def __init__(self, alpha: float, seasonal_alpha: float):
+        self.alpha = alpha
+        self.seasonal_alpha = seasonal_alpha
+        self.mean = 0.0
+        self.var = 0.0
+        self.count = 0
+        self._means = array("d", [0.0]) * SLOTS
+        self._vars = array("d", [0.0]) * SLOTS
+        self._counts = array("L", [0]) * SLOTS
+
+    @staticmethod
+    def _step(mean: float, var: float, count: int, value: float, alpha: float) -> Tuple[float, float]:
+        if count == 0:
+            return value, 0.0
+        delta = value - mean
+        mean += alpha * delta
+        var = (1 - alpha) * (var + alpha * delta * delta)
+        return mean, var
+
+    def expected(self, slot: int, seasonal_warmup: int | None) -> Tuple[float, float]:
+        """``(mean, variance)`` of the baseline to score against."""
+        if seasonal_warmup is not None and self._counts[slot] >= seasonal_warmup:
+            return self._means[slot], self._vars[slot]
+        return self.mean, self.var
+
+    def update(self, slot: int, value: float) -> None:
+        self.mean, self.var = self._step(self.mean, self.var, self.count, value, self.alpha)
+        self.count += 1
+        self._means[slot], self._vars[slot] = self._step(
+            self._means[slot], self._vars[slot], self._counts[slot], value, self.seasonal_alpha
+        )
+        self._counts[slot] += 1
+
+
+def hour_of_week(timestamp: float) -> int:
+    # the epoch was a Thursday; shift so slot 0 is Monday 00:00 UTC
+    return int((timestamp + 3 * 86400) % _WEEK // 3600)
+
+
+def anomaly_values(metrics: "SystemMetrics") -> Dict[str, float]:
+    temps = [temp.current for temp in metrics.temperatures]
+    return {
+        "cpu_percent": metrics.cpu_percent,
+        "mem_percent": metrics.mem_percent,
+        "swap_percent": metrics.swap_percent,
+        "load_1": metrics.load_avg[0] if metrics.load_avg else math.nan,
+        "temp_max": max(temps) if temps else math.nan,
+    }
+
+
+class AnomalyDetector:
+    """Score each health-job sample against its baseline and flag high z-scores.
+
+    Only upward deviations count: a metric is anomalous when it sits at least
+    ``thresholds.anomaly_z`` standard deviations above its expected value for
+    this hour of the week (or the global EWMA while the hour is still warming
+    up). Conditions are yielded as ``anomaly_<metric>`` codes for
+    :meth:`HealthMonitor._process_condition`.
+    """
+
+    WARMUP = 60  # samples before the global baseline is trusted
+    SEASONAL_WARMUP = 30  # samples in one hour-of-week slot (≈ half an hour of data)
+    DELAY = dt.timedelta(minutes=5)
+
+    def __init__(
+        self,
+        thresholds: Thresholds,
+        *,
+        half_life: float = 360.0,
+        seasonal_half_life: float = 240.0,
+    ):
+        self.thresholds = thresholds
+        alpha, seasonal_alpha = _alpha(half_life), _alpha(seasonal_half_life)
+        self.baselines = {name: Baseline(alpha, seasonal_alpha) for name in ANOMALY_METRICS}
+        self._observed_at: float | None = None
+        self._last: list[Tuple[bool, str, str, dt.timedelta]] = []
+
+    def observe(self, timestamp: float, values: Mapping[str, float]) -> None:
+        """Update baselines without scoring (used to seed from stored history)."""
+        if self._observed_at is not None and timestamp <= self._observed_at:
+            return
+        self._observed_at = timestamp
+        slot = hour_of_week(timestamp)
+        for name, baseline in self.baselines.items():
+            value = values.get(name, math.nan)
+            if value == value:
+                baseline.update(slot, value)
+
+    def evaluate(self, metrics: "SystemMetrics") -> Iterator[Tuple[bool, str, str, dt.timedelta]]:
+        timestamp = metrics.timestamp.timestamp()
+        if self._observed_at is not None and timestamp <= self._observed_at:
+            yield from self._last  # same snapshot again, keep the previous verdict
+            return
+        self._last = []
+        values = anomaly_values(metrics)
+        limit = self.thresholds.anomaly_z
+        seasonal_warmup = self.SEASONAL_WARMUP if self.thresholds.anomaly_seasonal else None
+        slot = hour_of_week(timestamp)
+        for name, baseline in self.baselines.items():
+            value = values[name]
+            if value != value:
+                continue
+            label, unit, min_std = ANOMALY_METRICS[name]
+            mean, var = baseline.expected(slot, seasonal_warmup)
+            std = max(math.sqrt(var), min_std)
+            score = (value - mean) / std
+            condition = limit > 0 and baseline.count >= self.WARMUP and score >= limit
+            message = (
+                f"Anomali {label} {value:.1f}{unit} (normal ~{mean:.1f}{unit} ±{std:.1f}, z={score:.1f})"
+            )
+            self._last.append((condition, f"anomaly_{name}", message, self.DELAY))
+        self.observe(timestamp, values)
+        yield from self._last
+
+
+def seed_anomaly(detector: AnomalyDetector, store, *, days: float = 28.0) -> int:
+    """Warm the baselines up from a :class:`~app.services.tsdb.MetricStore`."""
+    now = time.time()
+    positions = {name: store.columns.index(name) for name in ANOMALY_METRICS if name in store.columns}
+    count = 0
+    for stamp, values in store.records(now - days * 86400, now):
+        detector.observe(float(stamp), {name: values[index] for name, index in positions.items()})
+        count += 1
+    return count
+
+
+__all__ = [
+    "ANOMALY_METRICS",
+    "AnomalyDetector",
+    "Baseline",
+    "anomaly_values",
+    "hour_of_week",
+    "seed_anomaly",
+]
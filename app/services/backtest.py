@@ -0,0 +1,229 @@
+"""Replay recorded per-minute metrics against a candidate alert threshold."""
+from __future__ import annotations
+
+import asyncio
+import datetime as dt
+import math
+import operator
+import re
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from itertools import accumulate, repeat
+from typing import Dict, List, Sequence, Tuple
+
+from ..config import Thresholds
+from ..utils.format import human_duration
+from .rules import Rule, build_rules
+from .tsdb import MetricStore
+
+STEP_SECONDS = 60  # MetricStore records are 1 minute rollups
+
+# user-facing name -> (rule code, stored column, scale applied to the column)
+WHATIF_METRICS: Dict[str, Tuple[str, str, float]] = {
+    "cpu": ("cpu_high", "cpu_percent", 1.0),
+    "ram": ("ram_low", "mem_available", 1 / (1024 * 1024)),
+    "disk": ("disk_root", "disk_root_percent", 1.0),
+    "hdd": ("disk_hdd", "disk_hdd_percent", 1.0),
+    "temp": ("temp_high", "temp_max", 1.0),
+}
+
+_RUN_RE = re.compile(rb"\x01+")
+
+
+@dataclass(slots=True)
+class WhatIfAlert:
+    fired_at: int
+    recovered_at: int | None
+
+
+@dataclass(slots=True)
+class WhatIfResult:
+    metric: str
+    threshold: float
+    rule: Rule
+    samples: int
+    breach_samples: int
+    alerts: List[WhatIfAlert] = field(default_factory=list)
+
+    @property
+    def breach_seconds(self) -> int:
+        return self.breach_samples * STEP_SECONDS
+
+
+def breach_mask(values: Sequence[float], rule: Rule, threshold: float) -> bytes:
+    """One byte per sample: 1 where the rule's trailing window breaches ``threshold``.
+
+    Every aggregate reduces to windowed prefix-sum differences computed with
+    C-level ``map``/``accumulate``: ``avg`` compares window sums against
+    ``threshold * k``; ``min``/``max``/``p95`` count the breaching samples in
+    the window (e.g. ``max >= t`` iff at least one sample ``>= t``). Missing
+    samples (NaN) never breach.
+    """
+    n = len(values)
+    compare = operator.le if rule.below else operator.ge
+    k = max(1, round(rule.window / STEP_SECONDS)) if rule.aggregate != "last" else 1
+    if k <= 1:
+        return bytes(map(compare, values, repeat(threshold)))
+    if n < k:
+        return bytes(n)
+    if rule.aggregate == "avg":
+        missing = bytes(map(operator.ne, values, values))
+        has_missing = 1 in missing
+        if has_missing:
+            values = [0.0 if gap else value for value, gap in zip(values, missing)]
+        totals = list(accumulate(values, initial=0.0))
+        sums = map(operator.sub, totals[k:], totals[:-k])
+        window = bytes(map(compare, sums, repeat(threshold * k)))
+        if has_missing:
+            counts = list(accumulate(missing, initial=0))
+            gaps = map(operator.sub, counts[k:], counts[:-k])
+            window = bytes(hit and not gap for hit, gap in zip(window, gaps))
+        return bytes(k - 1) + window
+    if rule.aggregate not in ("min", "max", "p95"):
+        raise ValueError(f"Agregasi {rule.aggregate} tidak dikenal")
+    counts = list(accumulate(map(compare, values, repeat(threshold)), initial=0))
+    inside = map(operator.sub, counts[k:], counts[:-k])
+    tail = int(k * 0.05)  # RollingWindow's p95 skips this many top samples
+    if rule.below:
+        required = {"min": 1, "max": k, "p95": k - tail}[rule.aggregate]
+    else:
+        required = {"max": 1, "min": k, "p95": tail + 1}[rule.aggregate]
+    return bytes(k - 1) + bytes(map(operator.ge, inside, repeat(required)))
+
+
+def replay(
+    stamps: Sequence[int],
+    values: Sequence[float],
+    rule: Rule,
+    threshold: float,
+    hysteresis_minutes: int,
+) -> Tuple[int, List[WhatIfAlert]]:
+    """Run ``HealthMonitor._process_condition`` semantics over whole arrays.
+
+    Only contiguous breach runs of the mask are looped over in Python, never
+    individual samples. Returns ``(breach_samples, alerts)``.
+    """
+    n = len(stamps)
+    mask = breach_mask(values, rule, threshold)
+
+    delay = rule.delay.total_seconds()
+    hysteresis = hysteresis_minutes * 60
+    cooldown_until = -math.inf
+    alerts: List[WhatIfAlert] = []
+    for run in _RUN_RE.finditer(mask):
+        first, end = run.span()
+        # the first breached evaluation only records when the breach started
+        fire = max(
+            first + 1,
+            bisect_left(stamps, stamps[first] + delay, first, end),
+            bisect_left(stamps, cooldown_until, first, end),
+        )
+        if fire >= end:
+            continue
+        cooldown_until = stamps[fire] + hysteresis
+        alerts.append(WhatIfAlert(stamps[fire], stamps[end] if end < n else None))
+    return mask.count(1), alerts
+
+
+def _check_metric(metric: str) -> str:
+    metric = metric.strip().lower()
+    if metric not in WHATIF_METRICS:
+        raise ValueError(f"Metric tidak didukung. Pilih: {', '.join(WHATIF_METRICS)}.")
+    return metric
+
+
+def _series(store: MetricStore, metric: str, start: float, end: float, thresholds: Thresholds):
+    metric = _check_metric(metric)
+    code, column, scale = WHATIF_METRICS[metric]
+    rule = next(rule for rule in build_rules(thresholds.rules) if rule.code == code)
+    stamps, values = store.column(column, start, end)
+    return metric, rule, scale, stamps, values
+
+
+def _replay_all(series, candidates: Sequence[float], thresholds: Thresholds) -> List[WhatIfResult]:
+    metric, rule, scale, stamps, values = series
+    if scale != 1.0:
+        values = array("d", map(operator.mul, values, repeat(scale)))
+    results = []
+    for threshold in candidates:
+        breach_samples, alerts = replay(stamps, values, rule, threshold, thresholds.hysteresis_minutes)
+        results.append(WhatIfResult(metric, threshold, rule, len(stamps), breach_samples, alerts))
+    return results
+
+
+def what_if(
+    store: MetricStore,
+    metric: str,
+    threshold: float,
+    start: float,
+    end: float,
+    thresholds: Thresholds,
+) -> WhatIfResult:
+    """Backtest ``threshold`` for ``metric`` (cpu/ram/disk/hdd/temp) over ``[start, end]``."""
+    return _replay_all(_series(store, metric, start, end, thresholds), [threshold], thresholds)[0]
+
+
+async def what_if_many(
+    store: MetricStore,
+    metric: str,
+    candidates: Sequence[float],
+    start: float,
+    end: float,
+    thresholds: Thresholds,
+) -> List[WhatIfResult]:
+    """:func:`what_if` for several thresholds without stalling the event loop.
+
+    The column is copied out of the store on the loop, where appends happen,
+    so a remap never races a reader; scaling and replays run in the executor.
+    """
+    series = _series(store, metric, start, end, thresholds)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, _replay_all, series, list(candidates), thresholds)
+
+
+def current_threshold(metric: str, thresholds: Thresholds) -> float:
+    code = WHATIF_METRICS[_check_metric(metric)][0]
+    rule = next(rule for rule in build_rules(thresholds.rules) if rule.code == code)
+    return float(getattr(thresholds, rule.threshold_attr))
+
+
+def render_what_if(
+    result: WhatIfResult,
+    baseline: WhatIfResult | None,
+    tzinfo: dt.tzinfo,
+    *,
+    limit: int = 5,
+) -> List[str]:
+    """Plain-text report lines shared by the bot command and the CLI."""
+    sign = "≤" if result.rule.below else "≥"
+    lines = [
+        f"Simulasi {result.metric} {sign} {result.threshold:g}{result.rule.describe()}, "
+        f"{result.samples} sampel per menit:",
+        f"• {len(result.alerts)} alert, total breach {human_duration(result.breach_seconds)}",
+    ]
+    if baseline is not None:
+        lines.append(f"• Threshold sekarang {baseline.threshold:g}: {len(baseline.alerts)} alert")
+    if result.alerts:
+        lines.append(f"Alert terakhir (maks {limit}):")
+    for alert in result.alerts[-limit:]:
+        fired = dt.datetime.fromtimestamp(alert.fired_at, tzinfo)
+        if alert.recovered_at is None:
+            lines.append(f"• {fired:%d/%m %H:%M} → masih aktif")
+        else:
+            recovered = dt.datetime.fromtimestamp(alert.recovered_at, tzinfo)
+            lines.append(f"• {fired:%d/%m %H:%M} → pulih {recovered:%d/%m %H:%M}")
+    return lines
+
+
+__all__ = [
+    "WHATIF_METRICS",
+    "WhatIfAlert",
+    "WhatIfResult",
+    "breach_mask",
+    "current_threshold",
+    "render_what_if",
+    "replay",
+    "what_if",
+    "what_if_many",
+]
@@ -17,6 +17,8 @@ from ..utils.shell import run_cmd
 
 logger = get_logger(__name__)
 
+_RSYNC_OUTPUT_BUDGET = 64 * 1024
+
 
 @dataclass(slots=True)
 class BackupReport:
@@ -66,7 +68,7 @@ async def perform_backup(settings: Settings, *, label: str | None = None) -> Bac
                 str(source) + "/",
                 str(destination),
             )
-            result = await run_cmd(command, check=False)
+            result = await run_cmd(command, check=False, max_output=_RSYNC_OUTPUT_BUDGET)
             if result.stdout:
                 rsync_logs.append(result.stdout)
             if result.stderr:
@@ -0,0 +1,122 @@
+"""Apply one systemctl action to several units concurrently, in dependency order."""
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from html import escape
+from typing import Awaitable, Callable, Dict, List, Mapping, Sequence, Set
+
+from ..config import Settings
+from ..utils.logging import get_logger
+from ..utils.shell import ShellCommandError
+from .sysctl import control_service
+
+logger = get_logger(__name__)
+
+STATE_ICONS = {"pending": "⏳", "running": "🔄", "ok": "✅", "fail": "❌", "skip": "⏭️"}
+
+ProgressCallback = Callable[[List["UnitProgress"]], Awaitable[None]]
+
+
+@dataclass(slots=True)
+class UnitProgress:
+    name: str
+    state: str = "pending"
+    detail: str = ""
+
+
+def expand_targets(settings: Settings, targets: Sequence[str]) -> List[str]:
+    """Group names from SERVICE_GROUPS become their units; order kept, duplicates dropped."""
+    units: List[str] = []
+    for target in targets:
+        for unit in settings.service_groups.get(target, [target]):
+            if unit not in units:
+                units.append(unit)
+    return units
+
+
+def predecessors(dependencies: Mapping[str, Set[str]], units: Sequence[str], action: str) -> Dict[str, Set[str]]:
+    """Units that must finish before each unit starts.
+
+    ``stop`` runs the graph backwards so dependents go down first. Edges on a
+    cycle are dropped, leaving those units unordered relative to each other.
+    """
+    preds: Dict[str, Set[str]] = {unit: set() for unit in units}
+    for unit in units:
+        for dependency in dependencies.get(unit, ()):
+            if dependency not in preds:
+                continue
+            if action == "stop":
+                preds[dependency].add(unit)
+            else:
+                preds[unit].add(dependency)
+
+    def _ancestors(unit: str) -> Set[str]:
+        seen: Set[str] = set()
+        stack = list(preds[unit])
+        while stack:
+            current = stack.pop()
+            if current not in seen:
+                seen.add(current)
+                stack.extend(preds[current])
+        return seen
+
+    cyclic = {unit: {dep for dep in preds[unit] if unit in _ancestors(dep)} for unit in units}
+    if any(cyclic.values()):
+        looped = sorted(unit for unit, edges in cyclic.items() if edges)
+        logger.warning("Dependensi melingkar di %s, urutan antar unit itu diabaikan", looped)
+        for unit, edges in cyclic.items():
+            preds[unit] -= edges
+    return preds
+
+
+async def run_bulk(
+    settings: Settings,
+    units: Sequence[str],
+    action: str,
+    preds: Mapping[str, Set[str]],
+    *,
+    concurrency: int,
+    on_update: ProgressCallback,
+) -> List[UnitProgress]:
+    """Run ``action`` on every unit; a unit whose predecessor failed is skipped."""
+    progress = {unit: UnitProgress(unit) for unit in units}
+    finished = {unit: asyncio.Event() for unit in units}
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def _one(unit: str) -> None:
+        item = progress[unit]
+        try:
+            for dependency in preds.get(unit, ()):
+                await finished[dependency].wait()
+            blocked = sorted(dep for dep in preds.get(unit, ()) if progress[dep].state != "ok")
+            if blocked:
+                item.state, item.detail = "skip", f"menunggu {', '.join(blocked)} yang gagal"
+            else:
+                async with semaphore:
+                    item.state = "running"
+                    await on_update(list(progress.values()))
+                    try:
+                        await control_service(settings, unit, action)
+                        item.state = "ok"
+                    except ShellCommandError as exc:
+                        item.state, item.detail = "fail", (exc.stderr or exc.stdout or str(exc)).strip()
+                    except ValueError as exc:
+                        item.state, item.detail = "fail", str(exc)
+            await on_update(list(progress.values()))
+        finally:
+            finished[unit].set()
+
+    await asyncio.gather(*(_one(unit) for unit in units))
+    return list(progress.values())
+
+
+def render_progress(action: str, items: Sequence[UnitProgress], concurrency: int) -> str:
+    lines = [f"Bulk {escape(action)} {len(items)} unit (maks {concurrency} paralel):"]
+    for item in items:
+        detail = f" — {escape(item.detail[:200])}" if item.detail else ""
+        lines.append(f"{STATE_ICONS[item.state]} {escape(item.name)}{detail}")
+    return "\n".join(lines)
+
+
+__all__ = ["UnitProgress", "expand_targets", "predecessors", "render_progress", "run_bulk"]
@@ -0,0 +1,159 @@
+"""cgroup v2 resource accounting for whitelisted services."""
+from __future__ import annotations
+
+import datetime as dt
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+from ..config import Thresholds
+from ..utils.format import human_bytes
+from ..utils.logging import get_logger
+from .journal import unit_name
+from .sysctl import ServiceStatus
+
+logger = get_logger(__name__)
+
+CGROUP_ROOT = Path("/sys/fs/cgroup")
+LIMIT_DELAY = dt.timedelta(minutes=2)
+
+
+@dataclass(slots=True)
+class ServiceUsage:
+    name: str
+    memory_bytes: int = 0
+    cpu_percent: float = 0.0  # share of the whole machine, like SystemMetrics.cpu_percent
+    read_bps: float = 0.0
+    write_bps: float = 0.0
+    pids: int = 0
+
+    def summary(self) -> str:
+        return (
+            f"RAM {human_bytes(self.memory_bytes)} · CPU {self.cpu_percent:.1f}% · "
+            f"IO R {human_bytes(self.read_bps)}/s W {human_bytes(self.write_bps)}/s · {self.pids} pid"
+        )
+
+
+def cgroup_dir(status: ServiceStatus, root: Path = CGROUP_ROOT) -> Path:
+    """Directory of the unit's cgroup; guessed from the name if systemd did not report it."""
+    if status.control_group:
+        return root / status.control_group.lstrip("/")
+    unit = unit_name(status.name)
+    if "@" in unit:  # templates live in system-<prefix>.slice
+        prefix = unit.split("@", 1)[0].replace("-", "\\x2d")
+        return root / "system.slice" / f"system-{prefix}.slice" / unit
+    return root / "system.slice" / unit
+
+
+def _read(path: Path) -> bytes | None:
+    try:
+        with open(path, "rb") as handle:
+            return handle.read()
+    except OSError:
+        return None
+
+
+def _cpu_usage_usec(data: bytes | None) -> int:
+    for line in (data or b"").splitlines():
+        if line.startswith(b"usage_usec "):
+            return int(line[11:])
+    return 0
+
+
+def _io_bytes(data: bytes | None) -> Tuple[int, int]:
+    """Sum ``rbytes``/``wbytes`` over every device line of ``io.stat``."""
+    read = write = 0
+    for line in (data or b"").splitlines():
+        for field in line.split()[1:]:
+            if field.startswith(b"rbytes="):
+                read += int(field[7:])
+            elif field.startswith(b"wbytes="):
+                write += int(field[7:])
+    return read, write
+
+
+class CgroupAccounting:
+    """Read memory, CPU, I/O and pid counters straight from each unit's cgroup.
+
+    CPU% and I/O rates are deltas against the previous read; reads closer
+    together than ``min_interval`` reuse the last rates instead of producing
+    noisy ones.
+    """
+
+    def __init__(self, root: Path = CGROUP_ROOT, *, cpu_count: int | None = None, min_interval: float = 1.0):
+        self.root = root
+        self.cpu_count = cpu_count or os.cpu_count() or 1
+        self.min_interval = min_interval
+        self._previous: Dict[str, Tuple[float, int, int, int]] = {}
+        self._usage: Dict[str, ServiceUsage] = {}
+
+    def available(self) -> bool:
+        return (self.root / "cgroup.controllers").exists()
+
+    def sample(self, statuses: Sequence[ServiceStatus], now: float | None = None) -> List[ServiceUsage]:
+        """Usage of every running unit in ``statuses``; units without a cgroup are skipped."""
+        now = time.monotonic() if now is None else now
+        result: List[ServiceUsage] = []
+        for status in statuses:
+            directory = cgroup_dir(status, self.root)
+            memory = _read(directory / "memory.current")
+            if memory is None:
+                self._previous.pop(status.name, None)
+                self._usage.pop(status.name, None)
+                continue
+            try:
+                cpu_usec = _cpu_usage_usec(_read(directory / "cpu.stat"))
+                read_bytes, write_bytes = _io_bytes(_read(directory / "io.stat"))
+                pids = int(_read(directory / "pids.current") or 0)
+                memory_bytes = int(memory)
+            except ValueError as exc:
+                logger.debug("cgroup %s tidak terbaca: %s", directory, exc)
+                continue
+            usage = self._usage.setdefault(status.name, ServiceUsage(status.name))
+            usage.memory_bytes = memory_bytes
+            usage.pids = pids
+            previous = self._previous.get(status.name)
+            elapsed = now - previous[0] if previous else 0.0
+            if previous is None or elapsed >= self.min_interval:
+                if previous is not None:
+                    # counters restart with the unit; a negative delta just reads as idle
+                    usage.cpu_percent = max(0, cpu_usec - previous[1]) / (elapsed * 1e6 * self.cpu_count) * 100
+                    usage.read_bps = max(0, read_bytes - previous[2]) / elapsed
+                    usage.write_bps = max(0, write_bytes - previous[3]) / elapsed
+                self._previous[status.name] = (now, cpu_usec, read_bytes, write_bytes)
+            result.append(usage)
+        seen = {status.name for status in statuses}
+        for name in [name for name in self._usage if name not in seen]:
+            self._usage.pop(name, None)
+            self._previous.pop(name, None)
+        return result
+
+
+def limit_conditions(
+    usages: Sequence[ServiceUsage], thresholds: Thresholds
+) -> Iterator[Tuple[bool, str, str, dt.timedelta]]:
+    """``(condition, code, message, delay)`` per configured service limit."""
+    for usage in usages:
+        limit = thresholds.limit_for(usage.name)
+        if limit is None:
+            continue
+        if limit.memory_bytes > 0:
+            yield (
+                usage.memory_bytes > limit.memory_bytes,
+                f"svcmem_{usage.name}",
+                f"RAM {usage.name} {human_bytes(usage.memory_bytes)} melewati batas "
+                f"{human_bytes(limit.memory_bytes)}",
+                LIMIT_DELAY,
+            )
+        if limit.cpu_percent > 0:
+            yield (
+                usage.cpu_percent > limit.cpu_percent,
+                f"svccpu_{usage.name}",
+                f"CPU {usage.name} {usage.cpu_percent:.1f}% melewati batas {limit.cpu_percent:.0f}%",
+                LIMIT_DELAY,
+            )
+
+
+__all__ = ["CGROUP_ROOT", "CgroupAccounting", "ServiceUsage", "cgroup_dir", "limit_conditions"]
@@ -0,0 +1,267 @@
+"""OpenMetrics ``/metrics`` endpoint rendered from the in-memory snapshots."""
+from __future__ import annotations
+
+import asyncio
+import datetime as dt
+from typing import TYPE_CHECKING, Iterable, List, Mapping, MutableMapping, Sequence, Tuple
+
+from ..utils.logging import get_logger
+from .metrics import SystemMetrics
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .forecast import DiskForecast
+    from .sysctl import ServiceStatus
+
+logger = get_logger(__name__)
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+PREFIX = "potion"
+
+Sample = Tuple[str, Mapping[str, str], float]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    if value != value:
+        return "NaN"
+    if value in (float("inf"), float("-inf")):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(value)
+
+
+def _family(name: str, kind: str, help_text: str, samples: Iterable[Sample]) -> List[str]:
+    lines = [f"# TYPE {PREFIX}_{name} {kind}", f"# HELP {PREFIX}_{name} {help_text}"]
+    for suffix, labels, value in samples:
+        label_text = ",".join(f'{key}="{_escape(str(val))}"' for key, val in labels.items())
+        label_text = f"{{{label_text}}}" if label_text else ""
+        lines.append(f"{PREFIX}_{name}{suffix}{label_text} {_number(value)}")
+    return lines
+
+
+def _gauge(name: str, help_text: str, value: float | None) -> List[str]:
+    if value is None:
+        return []
+    return _family(name, "gauge", help_text, [("", {}, float(value))])
+
+
+def render_system(metrics: SystemMetrics) -> str:
+    """Every :class:`SystemMetrics` field as OpenMetrics gauges."""
+    lines: List[str] = []
+    timestamp = metrics.timestamp.timestamp()
+    lines += _gauge("metrics_timestamp_seconds", "Waktu sampel metrics terakhir.", timestamp)
+    lines += _gauge("cpu_percent", "Pemakaian CPU total.", metrics.cpu_percent)
+    lines += _family(
+        "load_average",
+        "gauge",
+        "Load average sistem.",
+        [
+            ("", {"window": window}, float(value))
+            for window, value in zip(("1m", "5m", "15m"), metrics.load_avg)
+        ],
+    )
+    lines += _gauge("memory_total_bytes", "Total RAM.", metrics.mem_total)
+    lines += _gauge("memory_available_bytes", "RAM tersedia.", metrics.mem_available)
+    lines += _gauge("memory_percent", "Pemakaian RAM.", metrics.mem_percent)
+    lines += _gauge("swap_percent", "Pemakaian swap.", metrics.swap_percent)
+    lines += _family(
+        "disk_percent",
+        "gauge",
+        "Pemakaian disk per mount.",
+        [
+            ("", {"mount": mount}, float(value))
+            for mount, value in (("root", metrics.disk_root_percent), ("hdd", metrics.disk_hdd_percent))
+            if value is not None
+        ],
+    )
+    lines += _family(
+        "disk_free_bytes",
+        "gauge",
+        "Ruang kosong per mount.",
+        [
+            ("", {"mount": mount}, float(value))
+            for mount, value in (("root", metrics.disk_root_free), ("hdd", metrics.disk_hdd_free))
+            if value is not None
+        ],
+    )
+    lines += _family(
+        "disk_total_bytes",
+        "gauge",
+        "Kapasitas per mount.",
+        [
+            ("", {"mount": mount}, float(value))
+            for mount, value in (("root", metrics.disk_root_total), ("hdd", metrics.disk_hdd_total))
+            if value is not None
+        ],
+    )
+    lines += _gauge("uptime_seconds", "Uptime host.", metrics.uptime_seconds)
+    lines += _family(
+        "temperature_celsius",
+        "gauge",
+        "Suhu sensor.",
+        [("", {"sensor": temp.label}, float(temp.current)) for temp in metrics.temperatures],
+    )
+    lines += _family(
+        "cpu_core_percent",
+        "gauge",
+        "Pemakaian CPU per core.",
+        [
+            ("", {"core": str(index)}, float(value))
+            for index, value in enumerate(metrics.cpu_per_core)
+        ],
+    )
+    for field, help_text in (
+        ("read_bps", "Throughput baca disk (byte/detik)."),
+        ("write_bps", "Throughput tulis disk (byte/detik)."),
+        ("read_iops", "Operasi baca disk per detik."),
+        ("write_iops", "Operasi tulis disk per detik."),
+        ("await_ms", "Rata-rata await disk (ms)."),
+    ):
+        lines += _family(
+            f"disk_io_{field}",
+            "gauge",
+            help_text,
+            [("", {"disk": disk.name}, float(getattr(disk, field))) for disk in metrics.disk_io],
+        )
+    for field, help_text in (
+        ("rx_bps", "Throughput terima (byte/detik)."),
+        ("tx_bps", "Throughput kirim (byte/detik)."),
+        ("errors_per_s", "Error jaringan per detik."),
+        ("drops_per_s", "Paket drop per detik."),
+    ):
+        lines += _family(
+            f"net_{field}",
+            "gauge",
+            help_text,
+            [("", {"nic": nic.name}, float(getattr(nic, field))) for nic in metrics.net_io],
+        )
+    return "\n".join(lines) + "\n"
+
+
+def render_state(
+    services: Sequence["ServiceStatus"],
+    alerts: Mapping[str, dt.datetime],
+    forecasts: Sequence["DiskForecast"],
+    counters: Mapping[str, int],
+) -> str:
+    lines: List[str] = []
+    lines += _family(
+        "service_healthy",
+        "gauge",
+        "1 bila service active/running.",
+        [("", {"service": status.name}, float(status.is_healthy())) for status in services],
+    )
+    lines += _family(
+        "service_info",
+        "gauge",
+        "State systemd per service.",
+        [
+            ("", {"service": s.name, "active_state": s.active_state, "sub_state": s.sub_state}, 1.0)
+            for s in services
+        ],
+    )
+    lines += _family(
+        "alert_active_since_seconds",
+        "gauge",
+        "Alert yang sedang aktif dan kapan dipicu.",
+        [("", {"code": code}, since.timestamp()) for code, since in sorted(alerts.items())],
+    )
+    lines += _family(
+        "disk_full_eta_seconds",
+        "gauge",
+        "Perkiraan detik sampai disk penuh.",
+        [
+            ("", {"mount": item.mount}, float(item.seconds_to_full))
+            for item in forecasts
+            if item.seconds_to_full is not None
+        ],
+    )
+    for name, value in sorted(counters.items()):
+        lines += _family(
+            f"bot_{name}", "counter", f"Counter internal bot: {name}.", [("_total", {}, float(value))]
+        )
+    return "\n".join(lines) + "\n"
+
+
+class MetricsExporter:
+    """Tiny HTTP/1.1 server answering ``GET /metrics`` from ``bot_data``.
+
+    Nothing is collected per scrape: the system section is rendered once per
+    sampler snapshot and reused until the next one, the rest comes from the
+    service list, alert table and counters the jobs already maintain.
+    """
+
+    def __init__(self, bot_data: MutableMapping, host: str, port: int):
+        self.bot_data = bot_data
+        self.host = host
+        self.port = port
+        self._server: asyncio.AbstractServer | None = None
+        self._system_for: SystemMetrics | None = None
+        self._system_text = ""
+
+    def render(self) -> bytes:
+        sampler = self.bot_data.get("metrics_sampler")
+        metrics = sampler.latest() if sampler is not None else None
+        if metrics is not None and metrics is not self._system_for:
+            self._system_text = render_system(metrics)
+            self._system_for = metrics
+        monitor = self.bot_data.get("health_monitor")
+        counters = dict(self.bot_data.get("counters", {}))
+        if sampler is not None:
+            counters["metrics_samples"] = sampler.samples
+            counters["metrics_sample_failures"] = sampler.failures
+        state = render_state(
+            self.bot_data.get("service_statuses", []),
+            monitor.active_alerts() if monitor else {},
+            monitor.forecast.forecasts() if monitor else [],
+            counters,
+        )
+        return f"{self._system_text}{state}# EOF\n".encode()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), timeout=5)
+            method, path, *_rest = request.split(b"\r\n", 1)[0].decode("latin-1").split(" ")
+            if method != "GET" or path.split("?", 1)[0] != "/metrics":
+                status, content_type, body = "404 Not Found", "text/plain", b"not found\n"
+            else:
+                status, content_type, body = "200 OK", CONTENT_TYPE, self.render()
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode()
+                + body
+            )
+            await writer.drain()
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            pass
+        except (ConnectionError, ValueError):
+            pass  # client went away or sent garbage
+        finally:
+            writer.close()
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        logger.info("Exporter metrics aktif di http://%s:%d/metrics", self.host, self.port)
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+
+def parse_listen(raw: str) -> Tuple[str, int] | None:
+    """``host:port`` (or just ``port``) from METRICS_LISTEN; empty disables."""
+    raw = raw.strip()
+    if not raw:
+        return None
+    host, _sep, port = raw.rpartition(":")
+    number = int(port)
+    if not 0 <= number <= 65535:
+        raise ValueError(f"Port di luar rentang 0-65535: {number}")
+    return (host.strip("[]") or "127.0.0.1", number)
+
+
+__all__ = ["CONTENT_TYPE", "MetricsExporter", "parse_listen", "render_state", "render_system"]
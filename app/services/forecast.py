@@ -0,0 +1,148 @@
+"""Disk-full forecasting from an incrementally fitted growth trend."""
+from __future__ import annotations
+
+import datetime as dt
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, Iterator, List, Tuple
+
+from ..config import Thresholds
+from ..utils.logging import get_logger
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .metrics import SystemMetrics
+
+logger = get_logger(__name__)
+
+# mount key -> (label, SystemMetrics free attr, SystemMetrics total attr)
+MOUNTS: Dict[str, Tuple[str, str, str]] = {
+    "root": ("/", "disk_root_free", "disk_root_total"),
+    "hdd": ("HDD", "disk_hdd_free", "disk_hdd_total"),
+}
+
+
+@dataclass(slots=True)
+class DiskForecast:
+    mount: str
+    label: str
+    used: float
+    total: float
+    bytes_per_second: float
+    seconds_to_full: float | None
+
+
+def format_eta(seconds: float) -> str:
+    """Coarse "~N jam/hari" for forecasts; minute precision would be noise."""
+    if seconds < 2 * 3600:
+        return f"{max(seconds, 0) / 60:.0f} menit"
+    if seconds < 2 * 86400:
+        return f"{seconds / 3600:.0f} jam"
+    if seconds < 365 * 86400:
+        return f"{seconds / 86400:.0f} hari"
+    return "lebih dari setahun"
+
+
+class GrowthFit:
+    """Exponentially weighted least-squares line of used bytes over time.
+
+    The x origin is moved to the newest sample on every update, so the state is
+    just five weighted sums and each update is O(1). Old samples fade with
+    ``half_life`` seconds; a sharp drop in usage (cleanup, backup rotation)
+    starts a fresh fit instead of dragging the slope negative.
+    """
+
+    __slots__ = (
+        "half_life", "reset_drop", "s0", "sx", "sxx", "sy", "sxy", "last_time", "last_used", "started"
+    )
+
+    def __init__(self, half_life: float = 3 * 86400.0, reset_drop: float = 0.01):
+        self.half_life = half_life
+        self.reset_drop = reset_drop
+        self.reset()
+
+    def reset(self) -> None:
+        self.s0 = self.sx = self.sxx = self.sy = self.sxy = 0.0
+        self.last_time: float | None = None
+        self.last_used = 0.0
+        self.started = 0.0
+
+    def update(self, timestamp: float, used: float, total: float) -> None:
+        if self.last_time is not None and self.last_used - used > total * self.reset_drop:
+            logger.info("Pemakaian disk turun tajam, fit tren diulang")
+            self.reset()
+        if self.last_time is None:
+            self.started = timestamp
+        else:
+            shift = timestamp - self.last_time
+            if shift <= 0:
+                return
+            decay = 0.5 ** (shift / self.half_life)
+            s0, sx, sy = self.s0 * decay, self.sx * decay, self.sy * decay
+            sxx, sxy = self.sxx * decay, self.sxy * decay
+            # move x origin to the new sample: x' = x - shift
+            self.sxx = sxx - 2 * shift * sx + shift * shift * s0
+            self.sxy = sxy - shift * sy
+            self.sx = sx - shift * s0
+            self.s0, self.sy = s0, sy
+        self.s0 += 1.0
+        self.sy += used
+        self.last_time = timestamp
+        self.last_used = used
+
+    def span(self) -> float:
+        return 0.0 if self.last_time is None else self.last_time - self.started
+
+    def line(self) -> Tuple[float, float] | None:
+        """``(slope bytes/s, fitted used bytes now)`` or ``None`` if underdetermined."""
+        denominator = self.s0 * self.sxx - self.sx * self.sx
+        if self.s0 < 3 or denominator <= 0:
+            return None
+        slope = (self.s0 * self.sxy - self.sx * self.sy) / denominator
+        return slope, (self.sy - slope * self.sx) / self.s0
+
+
+class DiskForecaster:
+    """Track one :class:`GrowthFit` per mount and flag mounts filling up soon."""
+
+    MIN_SPAN = 3600.0  # need an hour of trend before forecasting
+    DELAY = dt.timedelta(minutes=10)
+
+    def __init__(self, thresholds: Thresholds, *, half_life: float = 3 * 86400.0):
+        self.thresholds = thresholds
+        self._fits = {mount: GrowthFit(half_life) for mount in MOUNTS}
+        self._totals: Dict[str, float] = {}
+
+    def observe(self, metrics: "SystemMetrics") -> None:
+        timestamp = metrics.timestamp.timestamp()
+        for mount, (_label, free_attr, total_attr) in MOUNTS.items():
+            free, total = getattr(metrics, free_attr), getattr(metrics, total_attr)
+            if free is None or not total:
+                continue
+            self._totals[mount] = float(total)
+            self._fits[mount].update(timestamp, float(total - free), float(total))
+
+    def forecasts(self) -> List[DiskForecast]:
+        results = []
+        for mount, fit in self._fits.items():
+            total = self._totals.get(mount)
+            line = fit.line()
+            if total is None or line is None or fit.span() < self.MIN_SPAN:
+                continue
+            slope, used = line
+            eta = (total - used) / slope if slope > 0 else None
+            results.append(DiskForecast(mount, MOUNTS[mount][0], used, total, slope, eta))
+        return results
+
+    def evaluate(self) -> Iterator[Tuple[bool, str, str, dt.timedelta]]:
+        horizon = self.thresholds.disk_full_hours * 3600
+        for forecast in self.forecasts():
+            eta = forecast.seconds_to_full
+            condition = horizon > 0 and eta is not None and eta <= horizon
+            message = (
+                f"Disk {forecast.label} diprediksi penuh dalam ~{format_eta(eta)}"
+                if eta is not None
+                else ""
+            )
+            yield condition, f"disk_{forecast.mount}_forecast", message, self.DELAY
+
+
+__all__ = ["DiskForecast", "DiskForecaster", "GrowthFit", "MOUNTS", "format_eta"]
@@ -0,0 +1,298 @@
+"""Bounded in-memory metrics history with min/avg/max rollups."""
+from __future__ import annotations
+
+import math
+import re
+from array import array
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Sequence, Tuple
+
+from .metrics import SystemMetrics
+
+# One typed column per numeric SystemMetrics field. ``f`` keeps percentages and
+# temperatures compact; byte counters and uptime need the range of ``d``.
+METRIC_COLUMNS: Dict[str, str] = {
+    "cpu_percent": "f",
+    "load_1": "f",
+    "load_5": "f",
+    "load_15": "f",
+    "mem_total": "d",
+    "mem_available": "d",
+    "mem_percent": "f",
+    "swap_percent": "f",
+    "disk_root_percent": "f",
+    "disk_root_free": "d",
+    "disk_root_total": "d",
+    "disk_hdd_percent": "f",
+    "disk_hdd_free": "d",
+    "disk_hdd_total": "d",
+    "uptime_seconds": "d",
+    "temp_max": "f",
+}
+METRIC_NAMES: Tuple[str, ...] = tuple(METRIC_COLUMNS)
+
+METRIC_ALIASES: Dict[str, str] = {
+    "cpu": "cpu_percent",
+    "load": "load_1",
+    "ram": "mem_percent",
+    "mem": "mem_percent",
+    "swap": "swap_percent",
+    "disk": "disk_root_percent",
+    "hdd": "disk_hdd_percent",
+    "temp": "temp_max",
+}
+
+_NAN = float("nan")
+_RANGE_RE = re.compile(r"^(\d+)([mhdw])$")
+_RANGE_UNITS = {"m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+RollupListener = Callable[[float, Tuple[float, ...]], None]
+
+
+def metric_row(metrics: SystemMetrics) -> Tuple[float, ...]:
+    """Flatten a snapshot into values ordered like :data:`METRIC_NAMES`."""
+    load = tuple(metrics.load_avg) + (_NAN, _NAN, _NAN)
+    temp_max = max((temp.current for temp in metrics.temperatures), default=_NAN)
+
+    def _opt(value: float | None) -> float:
+        return _NAN if value is None else float(value)
+
+    return (
+        float(metrics.cpu_percent),
+        float(load[0]),
+        float(load[1]),
+        float(load[2]),
+        float(metrics.mem_total),
+        float(metrics.mem_available),
+        float(metrics.mem_percent),
+        float(metrics.swap_percent),
+        float(metrics.disk_root_percent),
+        float(metrics.disk_root_free),
+        float(metrics.disk_root_total),
+        _opt(metrics.disk_hdd_percent),
+        _opt(metrics.disk_hdd_free),
+        _opt(metrics.disk_hdd_total),
+        float(metrics.uptime_seconds),
+        float(temp_max),
+    )
+
+
+def resolve_metric(name: str) -> str:
+    name = name.strip().lower()
+    name = METRIC_ALIASES.get(name, name)
+    if name not in METRIC_COLUMNS:
+        raise ValueError(f"Metric {name} tidak dikenal.")
+    return name
+
+
+def parse_range(raw: str) -> int:
+    """Parse ``30m``/``6h``/``7d``/``2w`` into seconds."""
+    match = _RANGE_RE.match(raw.strip().lower())
+    if not match or int(match.group(1)) <= 0:
+        raise ValueError("Format rentang salah. Contoh: 30m, 6h, 7d, 2w.")
+    return int(match.group(1)) * _RANGE_UNITS[match.group(2)]
+
+
+class ColumnRing:
+    """Fixed-capacity ring of timestamps plus one typed array per column."""
+
+    def __init__(self, capacity: int, columns: Dict[str, str]):
+        self.capacity = max(1, capacity)
+        self.timestamps = array("d", [0.0]) * self.capacity
+        self.columns = {
+            name: array(typecode, [_NAN]) * self.capacity for name, typecode in columns.items()
+        }
+        self._arrays = list(self.columns.values())
+        self._next = 0
+        self.size = 0
+
+    def append(self, timestamp: float, values: Sequence[float]) -> None:
+        index = self._next
+        self.timestamps[index] = timestamp
+        for column, value in zip(self._arrays, values):
+            column[index] = value
+        self._next = (index + 1) % self.capacity
+        if self.size < self.capacity:
+            self.size += 1
+
+    def newest_first(self, since: float) -> Iterator[int]:
+        """Yield slot indices from newest to oldest, stopping before ``since``."""
+        index = self._next
+        for _ in range(self.size):
+            index = (index - 1) % self.capacity
+            if self.timestamps[index] < since:
+                return
+            yield index
+
+
+class RollupLevel:
+    """Min/avg/max per ``step`` seconds, fed incrementally from raw samples."""
+
+    def __init__(self, label: str, step: int, capacity: int):
+        self.label = label
+        self.step = step
+        columns: Dict[str, str] = {}
+        for name in METRIC_NAMES:
+            for agg in ("min", "avg", "max"):
+                columns[f"{name}:{agg}"] = "d"
+        self.ring = ColumnRing(capacity, columns)
+        width = len(METRIC_NAMES)
+        self._min = array("d", [math.inf]) * width
+        self._max = array("d", [-math.inf]) * width
+        self._sum = array("d", [0.0]) * width
+        self._count = array("L", [0]) * width
+        self._bucket: float | None = None
+        self.listeners: List[RollupListener] = []
+
+    @property
+    def span(self) -> int:
+        return self.step * self.ring.capacity
+
+    def add(self, timestamp: float, values: Sequence[float]) -> None:
+        bucket = timestamp - timestamp % self.step
+        if self._bucket is not None and bucket != self._bucket:
+            self._flush()
+        self._bucket = bucket
+        for index, value in enumerate(values):
+            if value != value:  # NaN: field not available
+                continue
+            if value < self._min[index]:
+                self._min[index] = value
+            if value > self._max[index]:
+                self._max[index] = value
+            self._sum[index] += value
+            self._count[index] += 1
+
+    def _flush(self) -> None:
+        row: List[float] = []
+        averages: List[float] = []
+        for index in range(len(METRIC_NAMES)):
+            count = self._count[index]
+            if count:
+                avg = self._sum[index] / count
+                row.extend((self._min[index], avg, self._max[index]))
+            else:
+                avg = _NAN
+                row.extend((_NAN, _NAN, _NAN))
+            averages.append(avg)
+            self._min[index] = math.inf
+            self._max[index] = -math.inf
+            self._sum[index] = 0.0
+            self._count[index] = 0
+        self.ring.append(self._bucket or 0.0, row)
+        closed = tuple(averages)
+        for listener in self.listeners:
+            listener(self._bucket or 0.0, closed)
+
+    def buckets(self, metric: str, since: float) -> List[Tuple[float, float, float, float]]:
+        """Return ``(bucket_start, min, avg, max)`` oldest first, open bucket included."""
+        ring = self.ring
+        col_min = ring.columns[f"{metric}:min"]
+        col_avg = ring.columns[f"{metric}:avg"]
+        col_max = ring.columns[f"{metric}:max"]
+        points = [
+            (ring.timestamps[i], col_min[i], col_avg[i], col_max[i])
+            for i in ring.newest_first(since)
+        ]
+        points.reverse()
+        index = METRIC_NAMES.index(metric)
+        if self._bucket is not None and self._bucket >= since and self._count[index]:
+            count = self._count[index]
+            points.append(
+                (self._bucket, self._min[index], self._sum[index] / count, self._max[index])
+            )
+        return [point for point in points if point[2] == point[2]]
+
+
+@dataclass(slots=True)
+class HistoryResult:
+    metric: str
+    resolution: str
+    points: List[Tuple[float, float, float, float]]
+
+    def summary(self) -> Tuple[float, float, float] | None:
+        if not self.points:
+            return None
+        low = min(point[1] for point in self.points)
+        high = max(point[3] for point in self.points)
+        avg = sum(point[2] for point in self.points) / len(self.points)
+        return low, avg, high
+
+
+class MetricsHistory:
+    """Raw samples for the last few hours plus 1-minute/1-hour/1-day rollups.
+
+    Every buffer is preallocated, so memory stays constant however long the bot
+    runs. Register :meth:`record` as a sampler listener.
+    """
+
+    MAX_BUCKETS = 360
+
+    def __init__(self, *, raw_hours: float = 6.0, interval: float = 5.0):
+        self.raw = ColumnRing(int(raw_hours * 3600 / max(interval, 1.0)), METRIC_COLUMNS)
+        self.levels = (
+            RollupLevel("1m", 60, 24 * 60),
+            RollupLevel("1h", 3600, 24 * 90),
+            RollupLevel("1d", 86400, 730),
+        )
+
+    def record(self, metrics: SystemMetrics) -> None:
+        timestamp = metrics.timestamp.timestamp()
+        values = metric_row(metrics)
+        self.raw.append(timestamp, values)
+        for level in self.levels:
+            level.add(timestamp, values)
+
+    def replay(self, timestamp: float, values: Sequence[float]) -> None:
+        """Feed an already-aggregated sample into the rollups only (startup reload)."""
+        for level in self.levels:
+            level.add(timestamp, values)
+
+    def add_rollup_listener(self, label: str, listener: RollupListener) -> None:
+        """Call ``listener(bucket_start, averages)`` whenever a ``label`` bucket closes."""
+        level = next(item for item in self.levels if item.label == label)
+        level.listeners.append(listener)
+
+    def query(self, metric: str, seconds: int, *, now: float) -> HistoryResult:
+        metric = resolve_metric(metric)
+        since = now - seconds
+        level = next(
+            (
+                item
+                for item in self.levels
+                if seconds / item.step <= self.MAX_BUCKETS and item.span >= seconds
+            ),
+            self.levels[-1],
+        )
+        return HistoryResult(metric=metric, resolution=level.label, points=level.buckets(metric, since))
+
+
+_SPARK = "▁▂▃▄▅▆▇█"
+
+
+def sparkline(values: Sequence[float], width: int = 24) -> str:
+    if not values:
+        return ""
+    if len(values) > width:
+        size = len(values) / width
+        values = [
+            sum(chunk) / len(chunk)
+            for chunk in (values[int(i * size) : int((i + 1) * size)] for i in range(width))
+            if chunk
+        ]
+    low, high = min(values), max(values)
+    spread = (high - low) or 1.0
+    return "".join(_SPARK[int((value - low) / spread * (len(_SPARK) - 1))] for value in values)
+
+
+__all__ = [
+    "METRIC_COLUMNS",
+    "METRIC_NAMES",
+    "MetricsHistory",
+    "HistoryResult",
+    "ColumnRing",
+    "metric_row",
+    "resolve_metric",
+    "parse_range",
+    "sparkline",
+]
@@ -0,0 +1,117 @@
+"""Cached hwmon temperature sensor discovery."""
+from __future__ import annotations
+
+import os
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+from ..utils.logging import get_logger
+from .metrics import Temperature, read_temperatures
+from .procfs import PinnedFile
+
+logger = get_logger(__name__)
+
+
+class SensorRegistry:
+    """Discover ``temp*_input`` files once and read them directly afterwards.
+
+    The hwmon tree is only walked again every ``refresh_interval`` seconds, or
+    sooner when the list of ``hwmonN`` chips changes (checked every
+    ``hotplug_interval`` seconds with a single ``listdir``). Each sensor keeps
+    one :class:`Temperature` whose ``current`` is updated in place.
+    """
+
+    def __init__(
+        self,
+        root: Path = Path("/sys/class/hwmon"),
+        *,
+        refresh_interval: float = 900.0,
+        hotplug_interval: float = 30.0,
+    ):
+        self.root = root
+        self.refresh_interval = refresh_interval
+        self.hotplug_interval = hotplug_interval
+        self._sensors: List[Tuple[PinnedFile, Temperature]] = []
+        self._chips: Tuple[str, ...] = ()
+        self._discovered_at = 0.0
+        self._checked_at = 0.0
+        self.available = root.is_dir()
+        if self.available:
+            self.discover()
+
+    def _list_chips(self) -> Tuple[str, ...]:
+        try:
+            return tuple(sorted(name for name in os.listdir(self.root) if name.startswith("hwmon")))
+        except OSError:
+            return ()
+
+    def discover(self) -> None:
+        previous = {pinned.path: temp for pinned, temp in self._sensors}
+        self.close()
+        sensors: list[tuple[PinnedFile, Temperature]] = []
+        self._chips = self._list_chips()
+        for chip_name in self._chips:
+            chip = self.root / chip_name
+            try:
+                name = (chip / "name").read_text().strip()
+            except OSError:
+                continue
+            for source in sorted(chip.glob("temp*_input")):
+                label_path = source.with_name(source.name.replace("_input", "_label"))
+                try:
+                    label = f"{name} {label_path.read_text().strip()}".strip()
+                except OSError:
+                    label = name
+                try:
+                    pinned = PinnedFile(source, size=32)
+                except OSError:
+                    continue
+                temp = previous.get(source)
+                if temp is None or temp.label != label:
+                    temp = Temperature(label=label, current=0.0)
+                sensors.append((pinned, temp))
+        self._sensors = sensors
+        self._discovered_at = self._checked_at = time.monotonic()
+        logger.info("Sensor hwmon ditemukan: %d input suhu", len(sensors))
+
+    def _maybe_refresh(self) -> None:
+        now = time.monotonic()
+        if now - self._discovered_at >= self.refresh_interval:
+            self.discover()
+        elif now - self._checked_at >= self.hotplug_interval:
+            self._checked_at = now
+            if self._list_chips() != self._chips:
+                logger.info("Perubahan chip hwmon terdeteksi, scan ulang sensor")
+                self.discover()
+
+    def read(self) -> List[Temperature]:
+        if not self.available:
+            return read_temperatures()
+        self._maybe_refresh()
+        readings: list[Temperature] = []
+        stale = False
+        for pinned, temp in self._sensors:
+            try:
+                length = pinned.read()
+                temp.current = int(pinned.buffer[:length]) / 1000
+            except OSError:
+                stale = True  # chip went away; rescan on the next tick
+                continue
+            except ValueError:
+                continue
+            readings.append(temp)
+        if stale:
+            self._discovered_at = 0.0
+        return readings
+
+    def close(self) -> None:
+        for pinned, _temp in self._sensors:
+            pinned.close()
+        self._sensors = []
+
+    def __len__(self) -> int:
+        return len(self._sensors)
+
+
+__all__ = ["SensorRegistry"]
@@ -0,0 +1,198 @@
+"""Cursor-based ``journalctl`` reads with JSON output."""
+from __future__ import annotations
+
+import asyncio
+import datetime as dt
+import json
+from dataclasses import dataclass
+from html import escape
+from typing import AsyncIterator, List, Sequence
+
+from ..utils.logging import get_logger
+from ..utils.shell import ShellCommandError, run_cmd
+
+logger = get_logger(__name__)
+
+PRIORITIES = {
+    "emerg": 0,
+    "alert": 1,
+    "crit": 2,
+    "err": 3,
+    "warning": 4,
+    "notice": 5,
+    "info": 6,
+    "debug": 7,
+}
+_PRIORITY_LABELS = {value: name.upper()[:4] for name, value in PRIORITIES.items()}
+PAGE_SIZE = 15
+_TEXT_BUDGET = 3500
+
+
+@dataclass(slots=True)
+class JournalEntry:
+    cursor: str
+    timestamp: float
+    priority: int
+    message: str
+
+
+@dataclass(slots=True)
+class JournalQuery:
+    """Filters handed to journalctl; ``priority`` is the max level (0-7)."""
+
+    service: str
+    priority: int | None = None
+    since: float | None = None
+
+
+@dataclass(slots=True)
+class JournalPage:
+    entries: List[JournalEntry]  # oldest first
+    more: bool  # another page exists in the direction that was read
+
+
+def parse_priority(raw: str) -> int:
+    raw = raw.strip().lower()
+    if raw.isdigit() and 0 <= int(raw) <= 7:
+        return int(raw)
+    if raw in PRIORITIES:
+        return PRIORITIES[raw]
+    raise ValueError("Prioritas tidak dikenal. Pakai emerg/alert/crit/err/warning/notice/info/debug atau 0-7.")
+
+
+def journal_command(
+    query: JournalQuery, *, limit: int, after_cursor: str | None = None, older: bool = False
+) -> tuple[str, ...]:
+    """Build the journalctl call; filtering and paging stay inside journalctl.
+
+    ``older`` reads backwards, so together with ``--after-cursor`` it returns
+    the entries just before the cursor.
+    """
+    command = [
+        "journalctl",
+        "-u",
+        query.service,
+        "-o",
+        "json",
+        "--output-fields=MESSAGE,PRIORITY",
+        "-n",
+        str(limit),
+        "--no-pager",
+        "-q",
+    ]
+    if query.priority is not None:
+        command.append(f"--priority={query.priority}")
+    if query.since is not None:
+        command.append(f"--since=@{int(query.since)}")
+    if after_cursor:
+        command.append(f"--after-cursor={after_cursor}")
+    if older:
+        command.append("--reverse")
+    return tuple(command)
+
+
+async def follow_journal(arguments: Sequence[str]) -> AsyncIterator[bytes]:
+    """Spawn ``journalctl -f -o json <arguments>`` and return its output lines.
+
+    The process is killed once the returned iterator is closed or abandoned.
+    """
+    process = await asyncio.create_subprocess_exec(
+        "journalctl", "-f", "-o", "json", *arguments,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.DEVNULL,
+    )
+
+    async def _lines() -> AsyncIterator[bytes]:
+        try:
+            while True:
+                line = await process.stdout.readline()
+                if not line:
+                    return
+                yield line
+        finally:
+            if process.returncode is None:
+                process.kill()
+            await process.wait()
+
+    return _lines()
+
+
+def unit_name(service: str) -> str:
+    return service if "." in service else f"{service}.service"
+
+
+def message_text(value: object) -> str:
+    if isinstance(value, list):  # non-UTF-8 payloads come as a byte array
+        return bytes(value).decode("utf-8", errors="replace")
+    return "" if value is None else str(value)
+
+
+def parse_entries(stdout: str) -> List[JournalEntry]:
+    entries: List[JournalEntry] = []
+    for line in stdout.splitlines():
+        try:
+            data = json.loads(line)
+            entries.append(
+                JournalEntry(
+                    cursor=data["__CURSOR"],
+                    timestamp=int(data.get("__REALTIME_TIMESTAMP", 0)) / 1_000_000,
+                    priority=int(data.get("PRIORITY", 6)),
+                    message=message_text(data.get("MESSAGE")),
+                )
+            )
+        except (ValueError, KeyError, TypeError):
+            continue
+    return entries
+
+
+async def read_journal(
+    query: JournalQuery,
+    *,
+    after_cursor: str | None = None,
+    older: bool = False,
+    limit: int = PAGE_SIZE,
+) -> JournalPage:
+    """One page of entries: newest page, or the page before/after ``after_cursor``."""
+    result = await run_cmd(
+        journal_command(query, limit=limit + 1, after_cursor=after_cursor, older=older),
+        check=False,
+    )
+    if result.returncode != 0 and not result.stdout.strip():
+        raise ShellCommandError(tuple(result.command), result.returncode, result.stdout, result.stderr)
+    entries = parse_entries(result.stdout)
+    more = len(entries) > limit
+    entries = entries[:limit]
+    if older:
+        entries.reverse()
+    return JournalPage(entries=entries, more=more)
+
+
+def render_entries(entries: Sequence[JournalEntry], tzinfo: dt.tzinfo | None = None) -> str:
+    """HTML lines ``dd/mm HH:MM:SS PRIO message`` that fit in one Telegram message."""
+    if not entries:
+        return ""
+    budget = max(60, _TEXT_BUDGET // len(entries))
+    lines = []
+    for entry in entries:
+        stamp = dt.datetime.fromtimestamp(entry.timestamp, tz=tzinfo or dt.timezone.utc)
+        message = entry.message if len(entry.message) <= budget else entry.message[: budget - 1] + "…"
+        label = _PRIORITY_LABELS.get(entry.priority, str(entry.priority))
+        lines.append(f"<code>{stamp:%d/%m %H:%M:%S}</code> {label} {escape(message)}")
+    return "\n".join(lines)
+
+
+__all__ = [
+    "JournalEntry",
+    "JournalPage",
+    "JournalQuery",
+    "PAGE_SIZE",
+    "PRIORITIES",
+    "follow_journal",
+    "journal_command",
+    "message_text",
+    "parse_entries",
+    "parse_priority",
+    "read_journal",
+    "render_entries",
+    "unit_name",
+]
@@ -0,0 +1,196 @@
+"""Per-service warning/error signature counts from a live journal stream."""
+from __future__ import annotations
+
+import asyncio
+import json
+import re
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Sequence, Tuple
+
+from ..config import Settings
+from ..utils.logging import get_logger
+from .journal import follow_journal, message_text, unit_name
+
+logger = get_logger(__name__)
+
+HOUR = 3600
+TOP_K = 20
+_MAX_SIGNATURE = 160
+
+# order matters: specific shapes first, bare numbers last
+_SIGNATURE_RULES: Tuple[Tuple[re.Pattern, str], ...] = (
+    (re.compile(r"\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b", re.I), "<id>"),
+    (re.compile(r"\b(?:\d{1,3}\.){3}\d{1,3}(?::\d+)?\b"), "<ip>"),
+    (re.compile(r"(?<![\w<])/[^\s:,;'\"()\[\]<>]+"), "<path>"),
+    (re.compile(r"\b0x[0-9a-f]+\b|\b(?=[0-9a-f]*\d)[0-9a-f]{8,}\b", re.I), "<hex>"),
+    (re.compile(r"\d+(?:\.\d+)?"), "<n>"),
+    (re.compile(r"\s+"), " "),
+)
+
+StreamFactory = Callable[[Sequence[str], str | None], Awaitable]
+
+
+def signature(message: str) -> str:
+    """Collapse ids, addresses, paths and numbers so repeats of one error group together."""
+    for pattern, replacement in _SIGNATURE_RULES:
+        message = pattern.sub(replacement, message)
+    return message.strip()[:_MAX_SIGNATURE]
+
+
+class SpaceSaving:
+    """Top-``k`` counter in bounded memory (Metwally et al. space-saving).
+
+    Once full, a new key replaces the smallest one and inherits its count, so
+    counts are upper bounds; ``total`` stays exact.
+    """
+
+    __slots__ = ("k", "counts", "total")
+
+    def __init__(self, k: int = TOP_K):
+        self.k = k
+        self.counts: Dict[str, int] = {}
+        self.total = 0
+
+    def add(self, key: str, amount: int = 1) -> None:
+        self.total += amount
+        if key in self.counts or len(self.counts) < self.k:
+            self.counts[key] = self.counts.get(key, 0) + amount
+            return
+        victim = min(self.counts, key=self.counts.__getitem__)
+        self.counts[key] = self.counts.pop(victim) + amount
+
+
+@dataclass(slots=True)
+class ServiceNoise:
+    service: str
+    total: int
+    top: List[Tuple[str, int]]
+
+
+async def journal_follow(units: Sequence[str], after_cursor: str | None):
+    """``journalctl -f`` for warning-and-worse entries of ``units``."""
+    arguments = ["-p", "warning", "--output-fields=MESSAGE,_SYSTEMD_UNIT,UNIT"]
+    arguments += [f"--after-cursor={after_cursor}"] if after_cursor else [f"--since=@{int(time.time()) - HOUR}"]
+    for unit in units:
+        arguments += ["-u", unit_name(unit)]
+    return await follow_journal(arguments)
+
+
+class JournalTop:
+    """Hourly top-K message signatures per whitelisted service, kept in memory.
+
+    Entries arrive from one long-running ``journalctl -f`` for all units; on
+    reconnect the stream resumes from the last ``__CURSOR`` so nothing is
+    counted twice.
+    """
+
+    def __init__(
+        self,
+        settings: Settings,
+        *,
+        hours: int = 24,
+        k: int = TOP_K,
+        stream_factory: StreamFactory = journal_follow,
+        retry_delay: float = 5.0,
+    ):
+        self.settings = settings
+        self.hours = hours
+        self.k = k
+        self.stream_factory = stream_factory
+        self.retry_delay = retry_delay
+        self._buckets: Dict[Tuple[str, int], SpaceSaving] = {}
+        self._aliases: Dict[str, str] = {}
+        self._units: tuple[str, ...] = ()
+        self._cursor: str | None = None
+        self._task: asyncio.Task | None = None
+
+    def observe(self, service: str, message: str, timestamp: float) -> None:
+        hour = int(timestamp) // HOUR
+        bucket = self._buckets.get((service, hour))
+        if bucket is None:
+            self._prune(hour)
+            bucket = self._buckets[(service, hour)] = SpaceSaving(self.k)
+        bucket.add(signature(message))
+
+    def _prune(self, hour: int) -> None:
+        oldest = hour - self.hours
+        for key in [key for key in self._buckets if key[1] <= oldest]:
+            del self._buckets[key]
+
+    def handle_line(self, line: bytes | str) -> None:
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            return
+        unit = entry.get("_SYSTEMD_UNIT") or entry.get("UNIT") or ""
+        service = self._aliases.get(unit)
+        if service is None:
+            return
+        self._cursor = entry.get("__CURSOR", self._cursor)
+        stamp = int(entry.get("__REALTIME_TIMESTAMP", 0)) / 1_000_000 or time.time()
+        self.observe(service, message_text(entry.get("MESSAGE")), stamp)
+
+    def top(self, hours: int = 1, limit: int = 5, now: float | None = None) -> List[ServiceNoise]:
+        """Noisiest services over the last ``hours`` hourly buckets, loudest first."""
+        since = int(now if now is not None else time.time()) // HOUR - hours
+        totals: Counter = Counter()
+        signatures: Dict[str, Counter] = {}
+        for (service, hour), bucket in self._buckets.items():
+            if hour <= since:
+                continue
+            totals[service] += bucket.total
+            signatures.setdefault(service, Counter()).update(bucket.counts)
+        return [
+            ServiceNoise(service, total, signatures[service].most_common(limit))
+            for service, total in totals.most_common()
+        ]
+
+    def _set_units(self) -> None:
+        self._units = tuple(self.settings.services_whitelist)
+        self._aliases = {}
+        for name in self._units:
+            self._aliases[name] = name
+            self._aliases[unit_name(name)] = name
+
+    async def _run(self) -> None:
+        delay = self.retry_delay
+        while True:
+            try:
+                self._set_units()
+                stream = await self.stream_factory(self._units, self._cursor)
+                async for line in stream:
+                    delay = self.retry_delay
+                    self.handle_line(line)
+                logger.warning("Stream journal top berhenti, sambung ulang")
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning("Stream journal top gagal: %s", exc)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 300.0)
+
+    def sync(self) -> None:
+        """Reopen the stream if the whitelist changed since it was started."""
+        if self._task is not None and tuple(self.settings.services_whitelist) != self._units:
+            logger.info("Whitelist service berubah, stream journal top dibuka ulang")
+            self._task.cancel()
+            self._task = None
+        self.start()
+
+    def start(self) -> None:
+        if self._task is None and self.settings.services_whitelist:
+            self._task = asyncio.create_task(self._run(), name="journal-top")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+__all__ = ["JournalTop", "ServiceNoise", "SpaceSaving", "journal_follow", "signature"]
@@ -11,6 +11,10 @@ import psutil
 from ..config import Settings, Thresholds
 from ..utils.format import human_bytes
 from ..utils.logging import get_logger
+from .anomaly import AnomalyDetector
+from .cgroup import ServiceUsage, limit_conditions
+from .forecast import DiskForecaster
+from .rules import RuleEngine, build_rules
 
 logger = get_logger(__name__)
 
@@ -21,6 +25,25 @@ class Temperature:
     current: float
 
 
+@dataclass(slots=True)
+class DiskIO:
+    name: str
+    read_bps: float = 0.0
+    write_bps: float = 0.0
+    read_iops: float = 0.0
+    write_iops: float = 0.0
+    await_ms: float = 0.0
+
+
+@dataclass(slots=True)
+class NetIO:
+    name: str
+    rx_bps: float = 0.0
+    tx_bps: float = 0.0
+    errors_per_s: float = 0.0
+    drops_per_s: float = 0.0
+
+
 @dataclass(slots=True)
 class SystemMetrics:
     timestamp: dt.datetime
@@ -38,10 +61,17 @@ class SystemMetrics:
     disk_hdd_total: int | None
     uptime_seconds: float
     temperatures: List[Temperature] = field(default_factory=list)
+    cpu_per_core: List[float] = field(default_factory=list)
+    disk_io: List[DiskIO] = field(default_factory=list)
+    net_io: List[NetIO] = field(default_factory=list)
 
     def mem_available_mb(self) -> float:
         return self.mem_available / (1024 * 1024)
 
+    def age_seconds(self, now: dt.datetime | None = None) -> float:
+        now = now or dt.datetime.now(dt.timezone.utc)
+        return max(0.0, (now - self.timestamp).total_seconds())
+
 
 @dataclass(slots=True)
 class Alert:
@@ -54,59 +84,52 @@ class HealthMonitor:
 
     def __init__(self, thresholds: Thresholds):
         self.thresholds = thresholds
+        self.rules = RuleEngine(thresholds, build_rules(thresholds.rules))
+        self.anomaly = AnomalyDetector(thresholds)
+        self.forecast = DiskForecaster(thresholds)
         self._breach_started: Dict[str, dt.datetime] = {}
         self._active_alerts: Dict[str, dt.datetime] = {}
         self._cooldown: Dict[str, dt.datetime] = {}
         self._last_snapshot: SystemMetrics | None = None
 
-    def evaluate(self, metrics: SystemMetrics, failed_services: Sequence[str]) -> tuple[List[Alert], List[str]]:
+    def active_alerts(self) -> Dict[str, dt.datetime]:
+        """Currently firing alert codes mapped to when they fired."""
+        return dict(self._active_alerts)
+
+    def observe(self, metrics: SystemMetrics) -> None:
+        """Feed one sample into the rule windows and disk trends (sampler listener)."""
+        if self.rules.observe(metrics):
+            self.forecast.observe(metrics)
+
+    def evaluate(
+        self,
+        metrics: SystemMetrics,
+        failed_services: Sequence[str],
+        service_usage: Sequence[ServiceUsage] = (),
+    ) -> tuple[List[Alert], List[str]]:
         now = metrics.timestamp
         triggered: List[Alert] = []
         recovered: List[str] = []
+        conditions: Dict[str, bool] = {}
 
-        checks = [
-            (
-                metrics.cpu_percent >= self.thresholds.cpu_percent,
-                "cpu_high",
-                f"CPU tinggi {metrics.cpu_percent:.1f}%",
-                dt.timedelta(minutes=5),
-            ),
-            (
-                metrics.mem_available_mb() <= self.thresholds.ram_free_mb,
-                "ram_low",
-                f"RAM tersisa {metrics.mem_available_mb():.0f} MB",
-                dt.timedelta(minutes=2),
-            ),
-            (
-                metrics.disk_root_percent >= self.thresholds.disk_percent,
-                "disk_root",
-                f"Disk / mencapai {metrics.disk_root_percent:.1f}%",
-                dt.timedelta(minutes=1),
-            ),
-            (
-                (metrics.disk_hdd_percent or 0) >= self.thresholds.disk_percent,
-                "disk_hdd",
-                f"Disk HDD mencapai {metrics.disk_hdd_percent:.1f}%",
-                dt.timedelta(minutes=1),
-            ),
-        ]
-
-        if metrics.temperatures:
-            max_temp = max(temp.current for temp in metrics.temperatures)
-            checks.append(
-                (
-                    max_temp >= self.thresholds.temperature_c,
-                    "temp_high",
-                    f"Suhu CPU {max_temp:.0f}°C",
-                    dt.timedelta(minutes=3),
-                )
-            )
-
-        for condition, code, message, delay in checks:
+        if self.rules.observe(metrics):  # False when the sampler already fed this sample
+            self.forecast.observe(metrics)
+        for condition, code, message, delay in self.rules.evaluate(now.timestamp()):
+            conditions[code] = condition
+            self._process_condition(condition, code, message, delay, now, triggered, recovered)
+        for condition, code, message, delay in self.anomaly.evaluate(metrics):
+            conditions[code] = condition
+            self._process_condition(condition, code, message, delay, now, triggered, recovered)
+        for condition, code, message, delay in self.forecast.evaluate():
+            conditions[code] = condition
+            self._process_condition(condition, code, message, delay, now, triggered, recovered)
+        for condition, code, message, delay in limit_conditions(service_usage, self.thresholds):
+            conditions[code] = condition
             self._process_condition(condition, code, message, delay, now, triggered, recovered)
 
         for service in failed_services:
             message = f"Service {service} gagal"
+            conditions[f"svc_{service}"] = True
             self._process_condition(
                 True,
                 f"svc_{service}",
@@ -118,10 +141,11 @@ class HealthMonitor:
             )
 
         # Recovery when metrics back to normal but alert is active
+        triggered_codes = {alert.code for alert in triggered}
         for code in list(self._active_alerts.keys()):
-            if any(alert.code == code for alert in triggered):
+            if code in triggered_codes:
                 continue
-            if self._is_condition_resolved(code, checks, failed_services):
+            if not conditions.get(code, False):
                 logger.info("Alert %s pulih", code)
                 self._active_alerts.pop(code, None)
                 recovered.append(code)
@@ -129,6 +153,24 @@ class HealthMonitor:
         self._last_snapshot = metrics
         return triggered, recovered
 
+    def service_changed(self, service: str, healthy: bool, now: dt.datetime) -> tuple[List[Alert], List[str]]:
+        """Apply one pushed unit state change without waiting for the next tick."""
+        code = f"svc_{service}"
+        triggered: List[Alert] = []
+        recovered: List[str] = []
+        if healthy:
+            self._breach_started.pop(code, None)
+            if self._active_alerts.pop(code, None) is not None:
+                logger.info("Alert %s pulih", code)
+                recovered.append(code)
+            return triggered, recovered
+        # the event itself is the confirmation, no second observation needed
+        self._breach_started.setdefault(code, now)
+        self._process_condition(
+            True, code, f"Service {service} gagal", dt.timedelta(0), now, triggered, recovered
+        )
+        return triggered, recovered
+
     def _process_condition(
         self,
         condition: bool,
@@ -164,41 +206,17 @@ class HealthMonitor:
         self._cooldown[code] = now + dt.timedelta(minutes=self.thresholds.hysteresis_minutes)
         triggered.append(Alert(code=code, message=message))
 
-    def _is_condition_resolved(
-        self,
-        code: str,
-        checks: Sequence[tuple[bool, str, str, dt.timedelta]],
-        failed_services: Sequence[str],
-    ) -> bool:
-        if code.startswith("svc_"):
-            name = code.split("_", 1)[1]
-            return name not in failed_services
-        for condition, chk_code, *_rest in checks:
-            if chk_code == code:
-                return not condition
-        return True
-
-
-def collect_metrics(settings: Settings) -> SystemMetrics:
-    timestamp = dt.datetime.now(dt.timezone.utc)
-    cpu_percent = psutil.cpu_percent(interval=0.5)
-    load_avg = psutil.getloadavg() if hasattr(psutil, "getloadavg") else (0.0, 0.0, 0.0)
-    memory = psutil.virtual_memory()
-    swap = psutil.swap_memory()
-    disk_root = psutil.disk_usage("/")
 
+def hdd_usage(mount: Path) -> tuple[float | None, int | None, int | None]:
+    """Return ``(percent, free, total)`` for the HDD mount, ``None`` when absent."""
     try:
-        disk_hdd = psutil.disk_usage(str(settings.hdd_mount))
-        disk_hdd_percent = disk_hdd.percent
-        disk_hdd_free = disk_hdd.free
-        disk_hdd_total = disk_hdd.total
+        usage = psutil.disk_usage(str(mount))
     except FileNotFoundError:
-        disk_hdd_percent = None
-        disk_hdd_free = None
-        disk_hdd_total = None
+        return None, None, None
+    return usage.percent, usage.free, usage.total
 
-    uptime_seconds = timestamp.timestamp() - psutil.boot_time()
 
+def read_temperatures() -> List[Temperature]:
     temps: list[Temperature] = []
     if hasattr(psutil, "sensors_temperatures"):
         try:
@@ -209,6 +227,32 @@ def collect_metrics(settings: Settings) -> SystemMetrics:
                         temps.append(Temperature(label=f"{label} {entry.label or ''}".strip(), current=entry.current))
         except Exception as exc:  # pragma: no cover - library dependent
             logger.debug("Tidak dapat membaca suhu: %s", exc)
+    return temps
+
+
+def collect_metrics(
+    settings: Settings,
+    *,
+    cpu_percent: float | None = None,
+    temperatures: List[Temperature] | None = None,
+) -> SystemMetrics:
+    """Collect a full metrics snapshot.
+
+    ``cpu_percent`` and ``temperatures`` can be supplied by a caller that tracks
+    them itself (see :class:`~app.services.sampler.MetricsSampler`); otherwise
+    this blocks for half a second to measure CPU and walks the sensor tree.
+    """
+    timestamp = dt.datetime.now(dt.timezone.utc)
+    if cpu_percent is None:
+        cpu_percent = psutil.cpu_percent(interval=0.5)
+    load_avg = psutil.getloadavg() if hasattr(psutil, "getloadavg") else (0.0, 0.0, 0.0)
+    memory = psutil.virtual_memory()
+    swap = psutil.swap_memory()
+    disk_root = psutil.disk_usage("/")
+
+    disk_hdd_percent, disk_hdd_free, disk_hdd_total = hdd_usage(settings.hdd_mount)
+    uptime_seconds = timestamp.timestamp() - psutil.boot_time()
+    temps = temperatures if temperatures is not None else read_temperatures()
 
     metrics = SystemMetrics(
         timestamp=timestamp,
@@ -245,6 +289,16 @@ def metrics_summary(metrics: SystemMetrics) -> str:
         parts.append(
             f"Disk HDD terpakai {human_bytes(metrics.disk_hdd_total - metrics.disk_hdd_free)} dari {human_bytes(metrics.disk_hdd_total)}"
         )
+    busiest_disk = max(metrics.disk_io, key=lambda io: io.read_bps + io.write_bps, default=None)
+    if busiest_disk is not None:
+        parts.append(
+            f"IO {busiest_disk.name} R {human_bytes(busiest_disk.read_bps)}/s W {human_bytes(busiest_disk.write_bps)}/s"
+        )
+    busiest_nic = max(metrics.net_io, key=lambda io: io.rx_bps + io.tx_bps, default=None)
+    if busiest_nic is not None:
+        parts.append(
+            f"Net {busiest_nic.name} ↓{human_bytes(busiest_nic.rx_bps)}/s ↑{human_bytes(busiest_nic.tx_bps)}/s"
+        )
     parts.append(f"Uptime {metrics.uptime_seconds/3600:.1f} jam")
     if metrics.temperatures:
         top = max(metrics.temperatures, key=lambda item: item.current)
@@ -266,6 +320,8 @@ def write_health_snapshot(metrics: SystemMetrics, path: Path) -> None:
 
 __all__ = [
     "SystemMetrics",
+    "DiskIO",
+    "NetIO",
     "collect_metrics",
     "metrics_summary",
     "HealthMonitor",
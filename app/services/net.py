@@ -10,7 +10,9 @@ from typing import Dict, List
 import psutil
 
 from ..config import Settings
-from ..utils.shell import CommandResult, run_cmd
+from ..utils.shell import CommandResult, cached_cmd, run_cmd
+
+TAILSCALE_TTL = 15.0
 
 
 @dataclass(slots=True)
@@ -32,27 +34,23 @@ async def ip_info() -> List[IPInterface]:
     return interfaces
 
 
-async def ping(host: str, *, count: int = 4, deadline: int = 20) -> CommandResult:
-    """Ping a host and return the result."""
-    return await run_cmd(
-        (
-            "ping",
-            "-c",
-            str(count),
-            "-w",
-            str(deadline),
-            host,
-        ),
-        check=False,
-    )
+async def ping(
+    host: str, *, count: int = 4, deadline: int = 20, ttl: float = 0.0, fresh: bool = False
+) -> CommandResult:
+    """Ping a host and return the result; with ``ttl`` a recent result may be reused."""
+    command = ("ping", "-c", str(count), "-w", str(deadline), host)
+    if ttl > 0:
+        return await cached_cmd(command, ttl=ttl, timeout=deadline + 5, check=False, fresh=fresh)
+    return await run_cmd(command, check=False)
 
 
-async def tailscale_status() -> str:
+async def tailscale_status(*, fresh: bool = False) -> str:
     """Get the status of the Tailscale service."""
     if shutil.which("tailscale") is None:
         return "Tailscale belum terpasang. Lewati langkah ini jika tidak perlu."
-    result = await run_cmd(("tailscale", "status"), check=False)
-    return result.stdout or result.stderr
+    result = await cached_cmd(("tailscale", "status"), ttl=TAILSCALE_TTL, check=False, fresh=fresh)
+    text = result.stdout or result.stderr
+    return f"{text}\n{result.cache_note()}" if result.cached_age is not None else text
 
 
 async def speed_quick() -> str:
@@ -0,0 +1,180 @@
+"""Linux fast-path metrics collector reading /proc and /sys directly."""
+from __future__ import annotations
+
+import datetime as dt
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING, List, Tuple
+
+import psutil
+
+from ..config import Settings
+from ..utils.logging import get_logger
+from .metrics import SystemMetrics, Temperature, hdd_usage, read_temperatures
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .hwmon import SensorRegistry
+
+logger = get_logger(__name__)
+
+_MEMINFO_KEYS = (b"MemTotal:", b"MemAvailable:", b"SwapTotal:", b"SwapFree:")
+
+
+class PinnedFile:
+    """Keep a descriptor open and re-read it from offset 0 into a reused buffer."""
+
+    __slots__ = ("path", "fd", "buffer")
+
+    def __init__(self, path: Path, size: int = 4096):
+        self.path = path
+        self.fd = os.open(path, os.O_RDONLY)
+        self.buffer = bytearray(size)
+
+    def read(self) -> int:
+        """Refill :attr:`buffer`; returns the number of valid bytes."""
+        while True:
+            length = os.preadv(self.fd, [self.buffer], 0)
+            if length < len(self.buffer):
+                return length
+            self.buffer = bytearray(len(self.buffer) * 2)
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+def _pin(path: Path) -> PinnedFile | None:
+    try:
+        return PinnedFile(path)
+    except OSError as exc:
+        logger.info("%s tidak bisa dibuka (%s), pakai psutil", path, exc)
+        return None
+
+
+def parse_cpu_line(buffer: bytearray, length: int) -> Tuple[float, float]:
+    """Return ``(total, idle)`` jiffies from the aggregate ``cpu`` line."""
+    end = buffer.find(b"\n", 0, length)
+    fields = buffer[5 : end if end >= 0 else length].split()
+    values = [int(item) for item in fields[:8]]  # guest/guest_nice already in user/nice
+    return float(sum(values)), float(values[3] + values[4])
+
+
+def parse_meminfo(buffer: bytearray, length: int) -> Tuple[int, int, int, int]:
+    """Return ``(mem_total, mem_available, swap_total, swap_free)`` in bytes."""
+    found = dict.fromkeys(_MEMINFO_KEYS, 0)
+    remaining = len(found)
+    for line in bytes(memoryview(buffer)[:length]).splitlines():
+        key, _sep, rest = line.partition(b" ")
+        if key in found:
+            found[key] = int(rest.split()[0]) * 1024
+            remaining -= 1
+            if not remaining:
+                break
+    return tuple(found[key] for key in _MEMINFO_KEYS)  # type: ignore[return-value]
+
+
+def parse_loadavg(buffer: bytearray, length: int) -> Tuple[float, float, float]:
+    one, five, fifteen = buffer[:length].split(None, 3)[:3]
+    return float(one), float(five), float(fifteen)
+
+
+class ProcCollector:
+    """Drop-in replacement for :func:`collect_metrics` on Linux.
+
+    /proc/stat, /proc/meminfo and /proc/loadavg are opened once and re-read with
+    ``pread`` on each sample; temperatures come from a shared
+    :class:`~app.services.hwmon.SensorRegistry`. Any source that is missing at
+    startup or fails later falls back to the psutil path.
+    """
+
+    def __init__(
+        self,
+        settings: Settings,
+        *,
+        proc_root: Path = Path("/proc"),
+        sensors: "SensorRegistry | None" = None,
+    ):
+        self.settings = settings
+        self.sensors = sensors
+        self._stat = _pin(proc_root / "stat")
+        self._meminfo = _pin(proc_root / "meminfo")
+        self._loadavg = _pin(proc_root / "loadavg")
+        self._boot_time = psutil.boot_time()
+
+    @classmethod
+    def create(
+        cls, settings: Settings, sensors: "SensorRegistry | None" = None
+    ) -> "ProcCollector | None":
+        if not os.path.exists("/proc/stat") or not hasattr(os, "preadv"):
+            return None
+        return cls(settings, sensors=sensors)
+
+    def close(self) -> None:
+        for pinned in (self._stat, self._meminfo, self._loadavg):
+            if pinned is not None:
+                pinned.close()
+        self._stat = self._meminfo = self._loadavg = None
+
+    def cpu_times(self) -> Tuple[float, float]:
+        if self._stat is not None:
+            try:
+                return parse_cpu_line(self._stat.buffer, self._stat.read())
+            except (OSError, ValueError, IndexError) as exc:
+                logger.debug("Baca /proc/stat gagal: %s", exc)
+        times = psutil.cpu_times()
+        total = sum(times) - getattr(times, "guest", 0.0) - getattr(times, "guest_nice", 0.0)
+        return total, times.idle + getattr(times, "iowait", 0.0)
+
+    def _memory(self) -> Tuple[int, int, float, float]:
+        if self._meminfo is not None:
+            try:
+                total, available, swap_total, swap_free = parse_meminfo(
+                    self._meminfo.buffer, self._meminfo.read()
+                )
+                mem_percent = round((total - available) / total * 100, 1) if total else 0.0
+                swap_percent = (
+                    round((swap_total - swap_free) / swap_total * 100, 1) if swap_total else 0.0
+                )
+                return total, available, mem_percent, swap_percent
+            except (OSError, ValueError, IndexError) as exc:
+                logger.debug("Baca /proc/meminfo gagal: %s", exc)
+        memory = psutil.virtual_memory()
+        return memory.total, memory.available, memory.percent, psutil.swap_memory().percent
+
+    def _load(self) -> Tuple[float, float, float]:
+        if self._loadavg is not None:
+            try:
+                return parse_loadavg(self._loadavg.buffer, self._loadavg.read())
+            except (OSError, ValueError) as exc:
+                logger.debug("Baca /proc/loadavg gagal: %s", exc)
+        return psutil.getloadavg() if hasattr(psutil, "getloadavg") else (0.0, 0.0, 0.0)
+
+    def _temperatures(self) -> List[Temperature]:
+        if self.sensors is not None:
+            return self.sensors.read()
+        return read_temperatures()
+
+    def collect(self, cpu_percent: float) -> SystemMetrics:
+        timestamp = dt.datetime.now(dt.timezone.utc)
+        mem_total, mem_available, mem_percent, swap_percent = self._memory()
+        disk_root = psutil.disk_usage("/")
+        disk_hdd_percent, disk_hdd_free, disk_hdd_total = hdd_usage(self.settings.hdd_mount)
+        return SystemMetrics(
+            timestamp=timestamp,
+            cpu_percent=cpu_percent,
+            load_avg=self._load(),
+            mem_total=mem_total,
+            mem_available=mem_available,
+            mem_percent=mem_percent,
+            swap_percent=swap_percent,
+            disk_root_percent=disk_root.percent,
+            disk_root_free=disk_root.free,
+            disk_root_total=disk_root.total,
+            disk_hdd_percent=disk_hdd_percent,
+            disk_hdd_free=disk_hdd_free,
+            disk_hdd_total=disk_hdd_total,
+            uptime_seconds=timestamp.timestamp() - self._boot_time,
+            temperatures=self._temperatures(),
+        )
+
+
+__all__ = ["ProcCollector", "PinnedFile", "parse_cpu_line", "parse_meminfo", "parse_loadavg"]
@@ -0,0 +1,170 @@
+"""Per-core CPU, disk I/O and network I/O rates from cumulative counters."""
+from __future__ import annotations
+
+import os
+import time
+from array import array
+from typing import Dict, List, Mapping, Sequence, Tuple
+
+import psutil
+
+from ..utils.logging import get_logger
+from .metrics import DiskIO, NetIO, SystemMetrics
+
+logger = get_logger(__name__)
+
+_DISK_FIELDS = ("read_bytes", "write_bytes", "read_count", "write_count", "read_time", "write_time")
+_NET_FIELDS = ("bytes_recv", "bytes_sent", "errin", "errout", "dropin", "dropout")
+
+
+class CounterTable:
+    """Previous counter values per device in one flat preallocated array.
+
+    Devices get a fixed slot and the layout is only rebuilt when the set of
+    device names changes, so a steady-state tick just overwrites numbers in
+    place. Callers build fresh result objects from :meth:`deltas` each tick,
+    since snapshots handed out earlier are still read elsewhere.
+    """
+
+    def __init__(self, fields: Sequence[str]):
+        self.fields = tuple(fields)
+        self.names: Tuple[str, ...] = ()
+        self._slots: Dict[str, int] = {}
+        self._previous = array("d")
+        self._current = array("d")
+        self.primed = False
+
+    def _relayout(self, names: Tuple[str, ...]) -> None:
+        self.names = names
+        self._slots = {name: index for index, name in enumerate(names)}
+        self._previous = array("d", [0.0]) * (len(names) * len(self.fields))
+        self._current = array("d", [0.0]) * len(self._previous)
+        self.primed = False
+
+    def load(self, counters: Mapping[str, object], names: Tuple[str, ...]) -> None:
+        """Copy raw counters into the current buffer (relayout on device change)."""
+        if names != self.names:
+            self._relayout(names)
+        width = len(self.fields)
+        current = self._current
+        for name, slot in self._slots.items():
+            row = counters[name]
+            base = slot * width
+            for offset, field_name in enumerate(self.fields):
+                current[base + offset] = float(getattr(row, field_name, 0) or 0)
+
+    def deltas(self, slot: int) -> Tuple[float, ...]:
+        width = len(self.fields)
+        base = slot * width
+        return tuple(
+            max(0.0, self._current[base + i] - self._previous[base + i]) for i in range(width)
+        )
+
+    def commit(self) -> None:
+        self._previous, self._current = self._current, self._previous
+        self.primed = True
+
+
+def _whole_disks(names) -> Tuple[str, ...]:
+    block_root = "/sys/block"
+    has_sysfs = os.path.isdir(block_root)
+    selected = []
+    for name in sorted(names):
+        if name.startswith(("loop", "ram", "zram")):
+            continue
+        if has_sysfs and not os.path.exists(os.path.join(block_root, name)):
+            continue  # partition, counted in its parent disk
+        selected.append(name)
+    return tuple(selected)
+
+
+class IORates:
+    """Compute throughput and utilisation deltas between sampler ticks."""
+
+    def __init__(self) -> None:
+        self._cores = array("d")
+        self._per_core: List[float] = []
+        self._disks = CounterTable(_DISK_FIELDS)
+        self._nics = CounterTable(_NET_FIELDS)
+        self._last_time: float | None = None
+
+    def _core_percent(self) -> List[float]:
+        times = psutil.cpu_times(percpu=True)
+        if len(self._cores) != len(times) * 2:
+            self._cores = array("d", [0.0]) * (len(times) * 2)
+            self._per_core = [0.0] * len(times)
+            primed = False
+        else:
+            primed = True
+        for index, core in enumerate(times):
+            total = sum(core) - getattr(core, "guest", 0.0) - getattr(core, "guest_nice", 0.0)
+            idle = core.idle + getattr(core, "iowait", 0.0)
+            delta_total = total - self._cores[index * 2]
+            delta_idle = idle - self._cores[index * 2 + 1]
+            self._cores[index * 2] = total
+            self._cores[index * 2 + 1] = idle
+            if primed and delta_total > 0:
+                busy = (delta_total - delta_idle) / delta_total * 100
+                self._per_core[index] = round(min(100.0, max(0.0, busy)), 1)
+        return self._per_core
+
+    def _disk_rates(self, elapsed: float) -> List[DiskIO]:
+        counters = psutil.disk_io_counters(perdisk=True) or {}
+        table = self._disks
+        table.load(counters, _whole_disks(counters))
+        if not table.primed or elapsed <= 0:
+            table.commit()
+            return [DiskIO(name=name) for name in table.names]
+        items = []
+        for slot, name in enumerate(table.names):
+            rbytes, wbytes, rcount, wcount, rtime, wtime = table.deltas(slot)
+            ops = rcount + wcount
+            items.append(
+                DiskIO(
+                    name=name,
+                    read_bps=rbytes / elapsed,
+                    write_bps=wbytes / elapsed,
+                    read_iops=rcount / elapsed,
+                    write_iops=wcount / elapsed,
+                    await_ms=(rtime + wtime) / ops if ops else 0.0,
+                )
+            )
+        table.commit()
+        return items
+
+    def _net_rates(self, elapsed: float) -> List[NetIO]:
+        counters = psutil.net_io_counters(pernic=True) or {}
+        table = self._nics
+        table.load(counters, tuple(sorted(name for name in counters if name != "lo")))
+        if not table.primed or elapsed <= 0:
+            table.commit()
+            return [NetIO(name=name) for name in table.names]
+        items = []
+        for slot, name in enumerate(table.names):
+            rx, tx, errin, errout, dropin, dropout = table.deltas(slot)
+            items.append(
+                NetIO(
+                    name=name,
+                    rx_bps=rx / elapsed,
+                    tx_bps=tx / elapsed,
+                    errors_per_s=(errin + errout) / elapsed,
+                    drops_per_s=(dropin + dropout) / elapsed,
+                )
+            )
+        table.commit()
+        return items
+
+    def fill(self, metrics: SystemMetrics) -> None:
+        """Attach per-core, disk and network rates to ``metrics``."""
+        now = time.monotonic()
+        elapsed = now - self._last_time if self._last_time is not None else 0.0
+        self._last_time = now
+        try:
+            metrics.cpu_per_core = list(self._core_percent())
+            metrics.disk_io = self._disk_rates(elapsed)
+            metrics.net_io = self._net_rates(elapsed)
+        except Exception as exc:  # pragma: no cover - platform dependent counters
+            logger.debug("Tidak dapat membaca counter I/O: %s", exc)
+
+
+__all__ = ["IORates", "CounterTable"]
@@ -0,0 +1,294 @@
+"""Declarative alert rules evaluated over rolling metric windows."""
+from __future__ import annotations
+
+import datetime as dt
+import re
+from array import array
+from collections import deque
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, Iterator, List, Mapping, Tuple
+
+from ..config import Thresholds
+from ..utils.logging import get_logger
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .metrics import SystemMetrics
+
+logger = get_logger(__name__)
+
+AGGREGATES = ("last", "avg", "min", "max", "p95")
+_SPEC_RE = re.compile(r"^(last|avg|min|max|p95)(?::(\d+)([smh]))?$")
+_SPEC_UNITS = {"s": 1, "m": 60, "h": 3600}
+
+Extractor = Callable[["SystemMetrics"], Iterable[Tuple[str, float]]]
+Condition = Tuple[bool, str, str, dt.timedelta]
+
+
+class RollingWindow:
+    """Time-based sliding window with O(1) amortised push/expire.
+
+    ``avg`` comes from a running sum, ``min``/``max`` from monotonic deques and
+    ``p95`` from a fixed-size histogram over ``[0, upper]``, so no aggregate
+    ever rescans the samples. Values above ``upper`` share an overflow bin;
+    when that bin holds the p95 the exact maximum is returned instead.
+    """
+
+    __slots__ = ("seconds", "upper", "_samples", "_sum", "_max", "_min", "_hist", "_seq")
+
+    BINS = 100
+
+    def __init__(self, seconds: float, *, upper: float = 100.0):
+        self.seconds = seconds
+        self.upper = max(upper, 1e-9)
+        self._samples: deque = deque()
+        self._sum = 0.0
+        self._max: deque = deque()
+        self._min: deque = deque()
+        self._hist = array("L", [0]) * (self.BINS + 1)
+        self._seq = 0
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def _bin(self, value: float) -> int:
+        return min(self.BINS, max(0, int(value / self.upper * self.BINS)))
+
+    def rebin(self, upper: float) -> None:
+        """Move the histogram to ``[0, upper]``, re-bucketing the live samples."""
+        self.upper = max(upper, 1e-9)
+        self._hist = array("L", [0]) * (self.BINS + 1)
+        samples = deque()
+        for timestamp, value, _bucket, seq in self._samples:
+            bucket = self._bin(value)
+            self._hist[bucket] += 1
+            samples.append((timestamp, value, bucket, seq))
+        self._samples = samples
+
+    def push(self, timestamp: float, value: float) -> None:
+        self._seq += 1
+        bucket = self._bin(value)
+        self._samples.append((timestamp, value, bucket, self._seq))
+        self._sum += value
+        self._hist[bucket] += 1
+        while self._max and self._max[-1][1] <= value:
+            self._max.pop()
+        self._max.append((self._seq, value))
+        while self._min and self._min[-1][1] >= value:
+            self._min.pop()
+        self._min.append((self._seq, value))
+        self.expire(timestamp)
+
+    def expire(self, now: float) -> None:
+        cutoff = now - self.seconds
+        samples = self._samples
+        while len(samples) > 1 and samples[0][0] <= cutoff:
+            _ts, value, bucket, seq = samples.popleft()
+            self._sum -= value
+            self._hist[bucket] -= 1
+            if self._max[0][0] == seq:
+                self._max.popleft()
+            if self._min[0][0] == seq:
+                self._min.popleft()
+
+    def span(self) -> float:
+        if not self._samples:
+            return 0.0
+        return self._samples[-1][0] - self._samples[0][0]
+
+    def newest(self) -> float | None:
+        return self._samples[-1][0] if self._samples else None
+
+    def aggregate(self, kind: str) -> float | None:
+        if not self._samples:
+            return None
+        if kind == "last":
+            return self._samples[-1][1]
+        if kind == "avg":
+            return self._sum / len(self._samples)
+        if kind == "max":
+            return self._max[0][1]
+        if kind == "min":
+            return self._min[0][1]
+        if kind == "p95":
+            target = len(self._samples) * 0.05
+            seen = 0
+            for bucket in range(self.BINS, -1, -1):
+                seen += self._hist[bucket]
+                if seen > target:
+                    if bucket == self.BINS:
+                        return self._max[0][1]
+                    return min(self._max[0][1], (bucket + 1) * self.upper / self.BINS)
+            return self._max[0][1]
+        raise ValueError(f"Agregasi {kind} tidak dikenal")
+
+
+@dataclass(slots=True)
+class Rule:
+    code: str
+    extract: Extractor
+    threshold_attr: str
+    message: str
+    aggregate: str = "last"
+    window: float = 0.0
+    delay: dt.timedelta = dt.timedelta(0)
+    below: bool = False  # breach when value <= threshold instead of >=
+    percent: bool = False
+
+    def code_for(self, key: str) -> str:
+        return f"{self.code}_{key}" if key else self.code
+
+    def describe(self) -> str:
+        if self.aggregate == "last":
+            return ""
+        minutes = self.window / 60
+        window = f"{minutes:.0f}m" if self.window >= 60 else f"{self.window:.0f}s"
+        return f" ({self.aggregate} {window})"
+
+
+def _single(attr: str) -> Extractor:
+    def _extract(metrics: "SystemMetrics") -> Iterable[Tuple[str, float]]:
+        value = getattr(metrics, attr)
+        return () if value is None else (("", float(value)),)
+
+    return _extract
+
+
+def _mem_available_mb(metrics: "SystemMetrics") -> Iterable[Tuple[str, float]]:
+    return (("", metrics.mem_available_mb()),)
+
+
+def _temp_max(metrics: "SystemMetrics") -> Iterable[Tuple[str, float]]:
+    if not metrics.temperatures:
+        return ()
+    return (("", max(temp.current for temp in metrics.temperatures)),)
+
+
+def _disk_await(metrics: "SystemMetrics") -> Iterable[Tuple[str, float]]:
+    return ((disk.name, disk.await_ms) for disk in metrics.disk_io)
+
+
+def _net_errors(metrics: "SystemMetrics") -> Iterable[Tuple[str, float]]:
+    return ((nic.name, nic.errors_per_s) for nic in metrics.net_io)
+
+
+def default_rules() -> List[Rule]:
+    minute = dt.timedelta(minutes=1)
+    return [
+        Rule("cpu_high", _single("cpu_percent"), "cpu_percent", "CPU tinggi {value:.1f}%",
+             aggregate="avg", window=300, percent=True),
+        Rule("ram_low", _mem_available_mb, "ram_free_mb", "RAM tersisa {value:.0f} MB",
+             aggregate="avg", window=120, below=True),
+        Rule("disk_root", _single("disk_root_percent"), "disk_percent",
+             "Disk / mencapai {value:.1f}%", delay=minute, percent=True),
+        Rule("disk_hdd", _single("disk_hdd_percent"), "disk_percent",
+             "Disk HDD mencapai {value:.1f}%", delay=minute, percent=True),
+        Rule("temp_high", _temp_max, "temperature_c", "Suhu CPU {value:.0f}°C",
+             aggregate="avg", window=180),
+        Rule("io_await", _disk_await, "disk_await_ms", "Disk {key} lambat (await {value:.0f} ms)",
+             aggregate="p95", window=120),
+        Rule("net_err", _net_errors, "net_errors_per_s", "Error jaringan {key} {value:.1f}/detik",
+             aggregate="avg", window=60),
+    ]
+
+
+def parse_rule_spec(spec: str) -> Tuple[str, float]:
+    """Parse ``avg:5m`` / ``p95:120s`` / ``last`` into ``(aggregate, seconds)``."""
+    match = _SPEC_RE.match(spec.strip().lower())
+    if not match:
+        raise ValueError(f"Spesifikasi rule tidak valid: {spec}")
+    aggregate, amount, unit = match.groups()
+    seconds = int(amount) * _SPEC_UNITS[unit] if amount else 0
+    if aggregate != "last" and seconds <= 0:
+        raise ValueError(f"Agregasi {aggregate} butuh window, contoh {aggregate}:5m")
+    return aggregate, float(seconds)
+
+
+def build_rules(overrides: Mapping[str, str] | None = None) -> List[Rule]:
+    """Default rules with ``RULE_<CODE>=<agg>:<window>`` overrides from .env applied."""
+    rules = default_rules()
+    for rule in rules:
+        spec = (overrides or {}).get(rule.code)
+        if not spec:
+            continue
+        try:
+            rule.aggregate, rule.window = parse_rule_spec(spec)
+        except ValueError as exc:
+            logger.warning("Override rule %s diabaikan: %s", rule.code, exc)
+    return rules
+
+
+class RuleEngine:
+    """Feed samples into per-code windows and evaluate rules against thresholds.
+
+    Rules and windows are indexed by alert code, so observing a sample or
+    checking one code never scans the other rules.
+    """
+
+    # a window must cover this fraction of its span before it may breach
+    MIN_FILL = 0.8
+
+    def __init__(self, thresholds: Thresholds, rules: Iterable[Rule]):
+        self.thresholds = thresholds
+        self.rules: Dict[str, Rule] = {rule.code: rule for rule in rules}
+        self._windows: Dict[str, Tuple[Rule, str, RollingWindow]] = {}
+        self._observed_at: float | None = None
+
+    def _upper_for(self, rule: Rule) -> float:
+        if rule.percent:
+            return 100.0
+        return max(float(getattr(self.thresholds, rule.threshold_attr)) * 2, 1.0)
+
+    def _window_for(self, rule: Rule, key: str) -> RollingWindow:
+        code = rule.code_for(key)
+        entry = self._windows.get(code)
+        upper = self._upper_for(rule)
+        if entry is None:
+            entry = (rule, key, RollingWindow(rule.window, upper=upper))
+            self._windows[code] = entry
+        elif entry[2].upper != upper:  # threshold changed since the window was made
+            entry[2].rebin(upper)
+        return entry[2]
+
+    def observe(self, metrics: "SystemMetrics") -> bool:
+        """Push one sample; returns ``False`` if it was already observed."""
+        timestamp = metrics.timestamp.timestamp()
+        if self._observed_at is not None and timestamp <= self._observed_at:
+            return False
+        self._observed_at = timestamp
+        for rule in self.rules.values():
+            for key, value in rule.extract(metrics):
+                self._window_for(rule, key).push(timestamp, value)
+        return True
+
+    def evaluate(self, now: float) -> Iterator[Condition]:
+        """Yield ``(condition, code, message, delay)`` for every tracked code."""
+        for code in list(self._windows):
+            rule, key, window = self._windows[code]
+            newest = window.newest()
+            if newest is None or now - newest > max(rule.window, 120.0) + 60.0:
+                del self._windows[code]  # device or sensor went away
+                continue
+            window.expire(now)
+            upper = self._upper_for(rule)
+            if window.upper != upper:
+                window.rebin(upper)
+            threshold = float(getattr(self.thresholds, rule.threshold_attr))
+            value = window.aggregate(rule.aggregate)
+            if value is None or threshold <= 0:
+                yield False, code, "", rule.delay
+                continue
+            filled = rule.aggregate == "last" or window.span() >= rule.window * self.MIN_FILL
+            breached = value <= threshold if rule.below else value >= threshold
+            message = rule.message.format(key=key, value=value) + rule.describe()
+            yield filled and breached, code, message, rule.delay
+
+
+__all__ = [
+    "AGGREGATES",
+    "RollingWindow",
+    "Rule",
+    "RuleEngine",
+    "build_rules",
+    "default_rules",
+    "parse_rule_spec",
+]
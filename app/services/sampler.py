@@ -0,0 +1,170 @@
+"""Background metrics sampler keeping a fresh snapshot in memory."""
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, MutableMapping
+
+import psutil
+
+from ..config import Settings
+from ..utils.logging import get_logger
+from ..utils.perf import timed
+from .hwmon import SensorRegistry
+from .metrics import SystemMetrics, collect_metrics
+from .procfs import ProcCollector
+from .rates import IORates
+
+logger = get_logger(__name__)
+
+MetricsListener = Callable[[SystemMetrics], None]
+
+
+class CpuDelta:
+    """Non-blocking CPU utilisation computed from ``cpu_times`` deltas."""
+
+    def __init__(self, reader: Callable[[], tuple[float, float]] | None = None) -> None:
+        self._read = reader or self._psutil_times
+        self._last_total, self._last_idle = self._read()
+
+    @staticmethod
+    def _psutil_times() -> tuple[float, float]:
+        times = psutil.cpu_times()
+        total = sum(times)
+        # guest time is already accounted in user/nice on Linux
+        total -= getattr(times, "guest", 0.0) + getattr(times, "guest_nice", 0.0)
+        idle = times.idle + getattr(times, "iowait", 0.0)
+        return total, idle
+
+    def sample(self) -> float:
+        total, idle = self._read()
+        delta_total = total - self._last_total
+        delta_idle = idle - self._last_idle
+        self._last_total, self._last_idle = total, idle
+        if delta_total <= 0:
+            return 0.0
+        busy = (delta_total - delta_idle) / delta_total * 100
+        return round(min(100.0, max(0.0, busy)), 1)
+
+
+class MetricsSampler:
+    """Refresh :class:`SystemMetrics` on a fixed interval off the event loop.
+
+    Collection runs in a dedicated single-thread executor so psutil calls never
+    block the bot's loop; on Linux the :class:`ProcCollector` fast path is used
+    unless disabled; readers get the cached snapshot via :meth:`latest` or
+    :meth:`get`. Listeners are invoked on the event loop after every sample.
+    """
+
+    def __init__(self, settings: Settings, *, interval: float = 5.0, fast_path: bool = True):
+        self.settings = settings
+        self.interval = interval
+        self._sensors = SensorRegistry()
+        self._collector = ProcCollector.create(settings, self._sensors) if fast_path else None
+        self._cpu = CpuDelta(self._collector.cpu_times if self._collector else None)
+        self._rates = IORates()
+        self._latest: SystemMetrics | None = None
+        self._listeners: List[MetricsListener] = []
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="metrics-sampler")
+        self._task: asyncio.Task | None = None
+        self._inflight: asyncio.Future | None = None
+        self.samples = 0
+        self.failures = 0
+
+    def add_listener(self, listener: MetricsListener) -> None:
+        self._listeners.append(listener)
+
+    def latest(self) -> SystemMetrics | None:
+        return self._latest
+
+    async def get(self, max_age: float | None = None) -> SystemMetrics:
+        """Return the cached snapshot, sampling first if it is missing or too old."""
+        metrics = self._latest
+        if metrics is not None and (max_age is None or metrics.age_seconds() <= max_age):
+            return metrics
+        return await self.sample_now()
+
+    async def sample_now(self) -> SystemMetrics:
+        """Take a sample immediately; concurrent callers share one collection."""
+        if self._inflight is None:
+            loop = asyncio.get_running_loop()
+            self._inflight = loop.run_in_executor(self._executor, self._collect)
+            self._inflight.add_done_callback(self._on_sample)
+        return await asyncio.shield(self._inflight)
+
+    def _on_sample(self, future: asyncio.Future) -> None:
+        self._inflight = None
+        if future.cancelled():
+            return
+        if future.exception() is not None:
+            self.failures += 1
+            return
+        metrics: SystemMetrics = future.result()
+        self.samples += 1
+        self._latest = metrics
+        for listener in self._listeners:
+            try:
+                listener(metrics)
+            except Exception as exc:  # pragma: no cover - listener bugs must not kill sampler
+                logger.exception("Listener metrics gagal: %s", exc)
+
+    def _collect(self) -> SystemMetrics:
+        with timed("metrics:collect"):
+            cpu_percent = self._cpu.sample()
+            if self._collector is not None:
+                metrics = self._collector.collect(cpu_percent)
+            else:
+                metrics = collect_metrics(
+                    self.settings, cpu_percent=cpu_percent, temperatures=self._sensors.read()
+                )
+            self._rates.fill(metrics)
+        return metrics
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run(), name="metrics-sampler")
+            logger.info("Metrics sampler jalan tiap %.1f detik", self.interval)
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._executor.shutdown(wait=False)
+        if self._collector is not None:
+            self._collector.close()
+            self._collector = None
+        self._sensors.close()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.sample_now()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning("Sampling metrics gagal: %s", exc)
+            await asyncio.sleep(self.interval)
+
+
+async def current_metrics(
+    bot_data: MutableMapping, settings: Settings, *, max_age: float | None = None
+) -> SystemMetrics:
+    """Fetch metrics from the shared sampler, falling back to a one-off collection.
+
+    Snapshots older than ``max_age`` seconds (default: three sampler intervals)
+    are refreshed before being returned.
+    """
+    sampler: MetricsSampler | None = bot_data.get("metrics_sampler")
+    if sampler is not None:
+        if max_age is None:
+            max_age = sampler.interval * 3
+        return await sampler.get(max_age=max_age)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, collect_metrics, settings)
+
+
+__all__ = ["CpuDelta", "MetricsSampler", "current_metrics"]
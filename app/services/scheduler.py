@@ -0,0 +1,179 @@
+"""Priority queue in front of heavy commands, with a concurrency cap per category."""
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Mapping, Tuple, TypeVar
+
+from ..utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+HEAVY_IO = "heavy-io"
+NETWORK_HEAVY = "network-heavy"
+CHEAP_READ = "cheap-read"
+DEFAULT_LIMITS = {HEAVY_IO: 1, NETWORK_HEAVY: 1, CHEAP_READ: 4}
+
+# lower runs first
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 10
+PRIORITY_LOW = 20
+
+T = TypeVar("T")
+
+
+class JobCancelled(RuntimeError):
+    """Raised from :meth:`CommandScheduler.run` when the job was cancelled via :meth:`cancel`."""
+
+
+@dataclass(slots=True)
+class Job:
+    id: int
+    category: str
+    label: str
+    priority: int
+    user_id: int | None
+    queued_at: float
+    state: str = "queued"  # queued -> running
+    started_at: float | None = None
+    cancelled: bool = False
+    waiter: asyncio.Future | None = None
+    task: asyncio.Future | None = None
+
+
+QueuedCallback = Callable[[Job, int], Awaitable[None]]
+
+
+class CommandScheduler:
+    """Run at most ``limits[category]`` jobs per category at a time.
+
+    Jobs that have to wait start by priority, then in arrival order. A queued
+    job is dropped by :meth:`cancel`; a running one has its work cancelled,
+    which for a shell command kills the process group.
+    """
+
+    def __init__(self, limits: Mapping[str, int] | None = None, *, clock: Callable[[], float] = time.monotonic):
+        self.limits = {**DEFAULT_LIMITS, **(limits or {})}
+        self.clock = clock
+        self._ids = itertools.count(1)
+        self._jobs: Dict[int, Job] = {}
+        self._queues: Dict[str, List[Tuple[int, int, Job]]] = {name: [] for name in self.limits}
+        self._active: Dict[str, int] = {name: 0 for name in self.limits}
+
+    def jobs(self) -> List[Job]:
+        """Running jobs first, then queued ones in the order they will start."""
+        running = [job for job in self._jobs.values() if job.state == "running"]
+        queued = [job for name in self.limits for _prio, _id, job in sorted(self._queues[name])]
+        return running + queued
+
+    def position(self, job: Job) -> int:
+        """1-based place of a queued job within its category; 0 once it runs."""
+        if job.state != "queued":
+            return 0
+        return sorted(self._queues[job.category]).index((job.priority, job.id, job)) + 1
+
+    def active(self, category: str) -> int:
+        return self._active[category]
+
+    async def run(
+        self,
+        category: str,
+        label: str,
+        work: Callable[[], Awaitable[T]],
+        *,
+        priority: int = PRIORITY_NORMAL,
+        user_id: int | None = None,
+        on_queued: QueuedCallback | None = None,
+    ) -> T:
+        """Wait for a slot in ``category``, then await ``work()``.
+
+        ``on_queued`` is called with the job and its queue position when it
+        cannot start right away.
+        """
+        if category not in self.limits:
+            raise ValueError(f"Kategori job tidak dikenal: {category}")
+        job = Job(next(self._ids), category, label, priority, user_id, self.clock())
+        self._jobs[job.id] = job
+        try:
+            if self._active[category] < self.limits[category] and not self._queues[category]:
+                self._grant(job)
+            else:
+                job.waiter = asyncio.get_running_loop().create_future()
+                heapq.heappush(self._queues[category], (priority, job.id, job))
+                if on_queued is not None:
+                    await on_queued(job, self.position(job))
+                await job.waiter
+                if job.cancelled:  # cancelled between being woken and getting here
+                    raise JobCancelled(f"Job #{job.id} dibatalkan")
+            job.task = asyncio.ensure_future(work())
+            try:
+                return await job.task
+            except asyncio.CancelledError:
+                current = asyncio.current_task()
+                if job.cancelled and current is not None and not current.cancelling():
+                    raise JobCancelled(f"Job #{job.id} dibatalkan") from None
+                raise
+        finally:
+            self._finish(job)
+
+    def cancel(self, job_id: int) -> Job | None:
+        """Drop a queued job or cancel a running one; ``None`` if there is no such job."""
+        job = self._jobs.get(job_id)
+        if job is None or job.cancelled:
+            return None
+        job.cancelled = True
+        if job.state == "queued":
+            self._dequeue(job)
+            if job.waiter is not None and not job.waiter.done():
+                job.waiter.set_exception(JobCancelled(f"Job #{job.id} dibatalkan"))
+        elif job.task is not None:
+            job.task.cancel()
+        logger.info("Job #%d (%s) dibatalkan", job.id, job.label)
+        return job
+
+    def _grant(self, job: Job) -> None:
+        self._active[job.category] += 1
+        job.state = "running"
+        job.started_at = self.clock()
+
+    def _dequeue(self, job: Job) -> None:
+        queue = self._queues[job.category]
+        try:
+            queue.remove((job.priority, job.id, job))
+        except ValueError:
+            return
+        heapq.heapify(queue)
+
+    def _dispatch(self, category: str) -> None:
+        queue = self._queues[category]
+        while queue and self._active[category] < self.limits[category]:
+            _prio, _id, job = heapq.heappop(queue)
+            if job.waiter is None or job.waiter.done():
+                continue
+            self._grant(job)
+            job.waiter.set_result(None)
+
+    def _finish(self, job: Job) -> None:
+        self._jobs.pop(job.id, None)
+        if job.state == "running":
+            self._active[job.category] -= 1
+        else:
+            self._dequeue(job)
+        self._dispatch(job.category)
+
+
+__all__ = [
+    "CHEAP_READ",
+    "CommandScheduler",
+    "DEFAULT_LIMITS",
+    "HEAVY_IO",
+    "Job",
+    "JobCancelled",
+    "NETWORK_HEAVY",
+    "PRIORITY_HIGH",
+    "PRIORITY_LOW",
+    "PRIORITY_NORMAL",
+]
@@ -1,9 +1,11 @@
 """Wrappers around systemctl and journalctl with whitelist validation."""
 from __future__ import annotations
 
+import asyncio
 import os
+import time
 from dataclasses import dataclass
-from typing import List, Sequence
+from typing import Awaitable, Callable, Dict, List, Sequence, Set
 
 from ..config import Settings
 from ..utils.format import human_datetime
@@ -20,6 +22,7 @@ class ServiceStatus:
     sub_state: str
     description: str
     since: str
+    control_group: str = ""
 
     def is_healthy(self) -> bool:
         return self.active_state == "active" and self.sub_state in {"running", "listening"}
@@ -43,12 +46,41 @@ def _systemctl_command(*args: str, require_root: bool = False) -> tuple[str, ...
     return base
 
 
-async def _systemctl_show(service: str, properties: Sequence[str] | None = None) -> dict[str, str]:
-    properties = properties or ["ActiveState", "SubState", "Description", "ActiveEnterTimestamp"]
+_STATUS_PROPERTIES = (
+    "Id",
+    "ActiveState",
+    "SubState",
+    "Description",
+    "ActiveEnterTimestamp",
+    "ControlGroup",
+)
+
+
+def _parse_show_blocks(stdout: str) -> List[dict[str, str]]:
+    """Split multi-unit ``systemctl show`` output into one dict per unit."""
+    blocks: list[dict[str, str]] = []
+    current: dict[str, str] = {}
+    for line in stdout.splitlines():
+        if not line.strip():
+            if current:
+                blocks.append(current)
+                current = {}
+            continue
+        if "=" in line:
+            key, value = line.split("=", 1)
+            current[key.strip()] = value.strip()
+    if current:
+        blocks.append(current)
+    return blocks
+
+
+async def _systemctl_show_many(
+    services: Sequence[str], properties: Sequence[str] = _STATUS_PROPERTIES
+) -> List[dict[str, str]]:
     result = await run_cmd(
         _systemctl_command(
             "show",
-            service,
+            *services,
             f"--property={','.join(properties)}",
             "--no-page",
         ),
@@ -56,41 +88,154 @@ async def _systemctl_show(service: str, properties: Sequence[str] | None = None)
     )
     if result.returncode != 0:
         raise ShellCommandError(tuple(result.command), result.returncode, result.stdout, result.stderr)
-    data: dict[str, str] = {}
-    for line in result.stdout.splitlines():
-        if "=" in line:
-            key, value = line.split("=", 1)
-            data[key.strip()] = value.strip()
-    return data
-
-
-async def list_services(settings: Settings) -> List[ServiceStatus]:
-    statuses: list[ServiceStatus] = []
-    for service in settings.services_whitelist:
-        try:
-            data = await _systemctl_show(service)
-        except ShellCommandError as exc:
-            logger.warning("systemctl show gagal untuk %s: %s", service, exc)
-            statuses.append(
-                ServiceStatus(
-                    name=service,
-                    active_state="unknown",
-                    sub_state="unknown",
-                    description="Tidak dapat membaca status",
-                    since=human_datetime(),
-                )
-            )
-            continue
-        statuses.append(
-            ServiceStatus(
-                name=service,
-                active_state=data.get("ActiveState", "unknown"),
-                sub_state=data.get("SubState", "unknown"),
-                description=data.get("Description", ""),
-                since=data.get("ActiveEnterTimestamp", ""),
-            )
-        )
-    return statuses
+    return _parse_show_blocks(result.stdout)
+
+
+async def _systemctl_show(service: str, properties: Sequence[str] | None = None) -> dict[str, str]:
+    blocks = await _systemctl_show_many([service], properties or _STATUS_PROPERTIES)
+    return blocks[0] if blocks else {}
+
+
+def _status_from(service: str, data: dict[str, str]) -> ServiceStatus:
+    return ServiceStatus(
+        name=service,
+        active_state=data.get("ActiveState", "unknown"),
+        sub_state=data.get("SubState", "unknown"),
+        description=data.get("Description", ""),
+        since=data.get("ActiveEnterTimestamp", ""),
+        control_group=data.get("ControlGroup", ""),
+    )
+
+
+def _unknown_status(service: str) -> ServiceStatus:
+    return ServiceStatus(
+        name=service,
+        active_state="unknown",
+        sub_state="unknown",
+        description="Tidak dapat membaca status",
+        since=human_datetime(),
+    )
+
+
+def _match_blocks(services: Sequence[str], blocks: List[dict[str, str]]) -> dict[str, dict[str, str]]:
+    """Map whitelist names to show blocks by ``Id`` (``foo`` matches ``foo.service``)."""
+    by_id = {block.get("Id", ""): block for block in blocks}
+    matched: dict[str, dict[str, str]] = {}
+    for service in services:
+        block = by_id.get(service) or by_id.get(f"{service}.service")
+        if block is not None:
+            matched[service] = block
+    if len(matched) < len(services) and len(blocks) == len(services):
+        # aliases report their target's Id; systemctl keeps argument order
+        for service, block in zip(services, blocks):
+            matched.setdefault(service, block)
+    return matched
+
+
+async def _fetch_services(services: Sequence[str]) -> List[ServiceStatus]:
+    try:
+        blocks = _match_blocks(services, await _systemctl_show_many(services))
+    except ShellCommandError as exc:
+        # one bad unit name fails the whole batch; retry per unit to isolate it
+        logger.warning("systemctl show batch gagal (%s), ulang per service", exc)
+        blocks = {}
+        for service in services:
+            try:
+                blocks[service] = await _systemctl_show(service)
+            except ShellCommandError as unit_exc:
+                logger.warning("systemctl show gagal untuk %s: %s", service, unit_exc)
+    return [
+        _status_from(service, blocks[service]) if service in blocks else _unknown_status(service)
+        for service in services
+    ]
+
+
+class StatusCache:
+    """Short-lived ``list_services`` result shared by every caller.
+
+    Concurrent misses share one in-flight fetch. :meth:`invalidate` bumps a
+    generation counter so a fetch that started before a unit was changed is
+    still handed to its waiters but never stored.
+    """
+
+    def __init__(self) -> None:
+        self._key: tuple[str, ...] | None = None
+        self._value: List[ServiceStatus] = []
+        self._expires = 0.0
+        self._generation = 0
+        self._inflight: asyncio.Future | None = None
+        self._inflight_key: tuple[str, ...] | None = None
+
+    def invalidate(self) -> None:
+        self._expires = 0.0
+        self._generation += 1
+        self._inflight = None
+
+    async def get(
+        self,
+        key: tuple[str, ...],
+        ttl: float,
+        fetch: Callable[[], Awaitable[List[ServiceStatus]]],
+    ) -> List[ServiceStatus]:
+        if key == self._key and time.monotonic() < self._expires:
+            return list(self._value)
+        if self._inflight is None or self._inflight_key != key:
+            generation = self._generation
+            future = asyncio.ensure_future(fetch())
+            future.add_done_callback(lambda done: self._store(done, key, ttl, generation))
+            self._inflight, self._inflight_key = future, key
+        return list(await asyncio.shield(self._inflight))
+
+    def _store(self, future: asyncio.Future, key: tuple[str, ...], ttl: float, generation: int) -> None:
+        if self._inflight is future:
+            self._inflight = None
+        if future.cancelled() or future.exception() is not None or generation != self._generation:
+            return
+        self._key, self._value = key, future.result()
+        self._expires = time.monotonic() + ttl
+
+
+_STATUS_CACHE = StatusCache()
+
+
+def invalidate_status_cache() -> None:
+    _STATUS_CACHE.invalidate()
+
+
+async def list_services(settings: Settings, *, fresh: bool = False) -> List[ServiceStatus]:
+    """Status of every whitelisted unit from a single ``systemctl show`` call.
+
+    Results are cached for ``settings.status_cache_ttl`` seconds; ``fresh``
+    drops the cached copy first.
+    """
+    services = tuple(settings.services_whitelist)
+    if not services:
+        return []
+    if fresh:
+        _STATUS_CACHE.invalidate()
+    return await _STATUS_CACHE.get(
+        services, settings.status_cache_ttl, lambda: _fetch_services(services)
+    )
+
+
+async def service_dependencies(services: Sequence[str]) -> Dict[str, Set[str]]:
+    """``After=``/``Requires=`` edges restricted to ``services``, keyed by the given names."""
+    services = list(services)
+    if not services:
+        return {}
+    blocks = _match_blocks(services, await _systemctl_show_many(services, ("Id", "After", "Requires")))
+    names: Dict[str, str] = {}
+    for service in services:
+        names[service] = service
+        names[f"{service}.service"] = service
+        if service in blocks:
+            names[blocks[service].get("Id", service)] = service
+    dependencies: Dict[str, Set[str]] = {}
+    for service in services:
+        block = blocks.get(service, {})
+        related = block.get("After", "").split() + block.get("Requires", "").split()
+        dependencies[service] = {names[unit] for unit in related if unit in names} - {service}
+    return dependencies
 
 
 async def control_service(settings: Settings, service: str, action: str) -> CommandResult:
@@ -99,19 +244,16 @@ async def control_service(settings: Settings, service: str, action: str) -> Comm
         raise ValueError("Aksi tidak valid. Gunakan start/stop/restart/reload.")
 
     logger.info("Menjalankan systemctl %s untuk %s", action, service)
-    return await run_cmd(_systemctl_command(action, service, require_root=True))
+    try:
+        return await run_cmd(_systemctl_command(action, service, require_root=True))
+    finally:
+        invalidate_status_cache()
 
 
 async def service_status(settings: Settings, service: str) -> ServiceStatus:
     service = _validate_service(settings, service)
-    data = await _systemctl_show(service)
-    return ServiceStatus(
-        name=service,
-        active_state=data.get("ActiveState", "unknown"),
-        sub_state=data.get("SubState", "unknown"),
-        description=data.get("Description", ""),
-        since=data.get("ActiveEnterTimestamp", ""),
-    )
+    statuses = await list_services(settings)
+    return next(status for status in statuses if status.name == service)
 
 
 async def tail_journal(service: str, lines: int = 50) -> str:
@@ -137,7 +279,10 @@ async def check_failed_services(settings: Settings) -> List[ServiceStatus]:
 
 __all__ = [
     "ServiceStatus",
+    "StatusCache",
+    "invalidate_status_cache",
     "list_services",
+    "service_dependencies",
     "service_status",
     "control_service",
     "tail_journal",
@@ -0,0 +1,195 @@
+"""Append-only, memory-mapped per-minute metrics store on the HDD."""
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+import time
+import zlib
+from array import array
+from pathlib import Path
+from typing import Iterator, Sequence, Tuple
+
+from ..utils.logging import get_logger
+from .history import METRIC_NAMES
+
+logger = get_logger(__name__)
+
+_MAGIC = b"PRTS"
+_VERSION = 1
+# magic, version, column count, schema crc32, record count
+_HEADER = struct.Struct("<4sHHIQ")
+_HEADER_SIZE = 64
+_GROW_RECORDS = 1440  # one day of per-minute samples
+
+
+class MetricStore:
+    """Fixed-size records (``uint32`` epoch + one ``float32`` per column).
+
+    Records are appended in timestamp order, so range queries binary-search the
+    record offsets directly instead of parsing anything. With the default
+    columns a record is 68 bytes: ~98 KB per day, ~9 MB for 90 days. Only the
+    1-minute average of each metric is kept, not its min/max.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        columns: Sequence[str] = METRIC_NAMES,
+        retention_days: float = 90.0,
+    ):
+        self.path = path
+        self.columns = tuple(columns)
+        self.retention_days = retention_days
+        self._record = struct.Struct(f"<I{len(self.columns)}f")
+        self._schema = zlib.crc32(",".join(self.columns).encode())
+        self._fd: int | None = None
+        self._mm: mmap.mmap | None = None
+        self._count = 0
+        self._capacity = 0
+
+    @property
+    def record_size(self) -> int:
+        return self._record.size
+
+    def __len__(self) -> int:
+        return self._count
+
+    def open(self) -> None:
+        if self._mm is not None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o640)
+        size = os.fstat(fd).st_size
+        if size < _HEADER_SIZE:
+            os.ftruncate(fd, _HEADER_SIZE + _GROW_RECORDS * self.record_size)
+            os.pwrite(fd, _HEADER.pack(_MAGIC, _VERSION, len(self.columns), self._schema, 0), 0)
+        else:
+            magic, version, ncols, schema, _count = _HEADER.unpack(os.pread(fd, _HEADER.size, 0))
+            if (magic, version, ncols, schema) != (_MAGIC, _VERSION, len(self.columns), self._schema):
+                os.close(fd)
+                backup = self.path.with_suffix(self.path.suffix + ".old")
+                logger.warning("Skema %s berubah, file lama dipindah ke %s", self.path, backup)
+                os.replace(self.path, backup)
+                self.open()
+                return
+        self._fd = fd
+        self._map()
+        self._count = _HEADER.unpack_from(self._mm, 0)[4]
+        self._count = min(self._count, self._capacity)
+        self._apply_retention()
+        logger.info("Metric store %s dibuka (%d record)", self.path, self._count)
+
+    def close(self) -> None:
+        if self._mm is not None:
+            self._mm.flush()
+            self._mm.close()
+            self._mm = None
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def _map(self) -> None:
+        size = os.fstat(self._fd).st_size
+        self._mm = mmap.mmap(self._fd, size)
+        self._capacity = (size - _HEADER_SIZE) // self.record_size
+
+    def _grow(self) -> None:
+        self._mm.flush()
+        self._mm.close()
+        new_size = _HEADER_SIZE + (self._capacity + _GROW_RECORDS) * self.record_size
+        os.ftruncate(self._fd, new_size)
+        self._map()
+
+    def _offset(self, index: int) -> int:
+        return _HEADER_SIZE + index * self.record_size
+
+    def timestamp_at(self, index: int) -> int:
+        return struct.unpack_from("<I", self._mm, self._offset(index))[0]
+
+    def last_timestamp(self) -> int | None:
+        return self.timestamp_at(self._count - 1) if self._count else None
+
+    def append(self, timestamp: float, values: Sequence[float]) -> bool:
+        """Append one record; out-of-order timestamps are ignored."""
+        if self._mm is None:
+            raise RuntimeError("MetricStore belum dibuka")
+        stamp = int(timestamp)
+        last = self.last_timestamp()
+        if last is not None and stamp <= last:
+            return False
+        if self._count >= self._capacity:
+            self._grow()
+        self._record.pack_into(self._mm, self._offset(self._count), stamp, *values)
+        self._count += 1
+        # header count is updated last so a crash never exposes a torn record
+        struct.pack_into("<Q", self._mm, _HEADER.size - 8, self._count)
+        return True
+
+    def bisect(self, timestamp: float) -> int:
+        """Index of the first record with ``ts >= timestamp``."""
+        low, high = 0, self._count
+        while low < high:
+            mid = (low + high) // 2
+            if self.timestamp_at(mid) < timestamp:
+                low = mid + 1
+            else:
+                high = mid
+        return low
+
+    def range_indices(self, start: float, end: float) -> Tuple[int, int]:
+        return self.bisect(start), self.bisect(end + 1)
+
+    def records(self, start: float, end: float) -> Iterator[Tuple[int, Tuple[float, ...]]]:
+        first, last = self.range_indices(start, end)
+        unpack = self._record.unpack_from
+        for index in range(first, last):
+            stamp, *values = unpack(self._mm, self._offset(index))
+            yield stamp, tuple(values)
+
+    def column(self, metric: str, start: float, end: float) -> Tuple[array, array]:
+        """Return ``(timestamps, values)`` arrays for one metric, sliced in C."""
+        position = self.columns.index(metric)
+        first, last = self.range_indices(start, end)
+        if first >= last:
+            return array("I"), array("f")
+        stride = self.record_size // 4
+        with memoryview(self._mm)[self._offset(first) : self._offset(last)] as raw:
+            with raw.cast("I") as ints, raw.cast("f") as floats:
+                stamps = array("I", ints[0::stride])
+                values = array("f", floats[position + 1 :: stride])
+        return stamps, values
+
+    def _apply_retention(self) -> None:
+        if not self._count or self.retention_days <= 0:
+            return
+        cutoff = time.time() - self.retention_days * 86400
+        keep_from = self.bisect(cutoff)
+        if keep_from == 0:
+            return
+        remaining = self._count - keep_from
+        start, end = self._offset(keep_from), self._offset(self._count)
+        self._mm.move(_HEADER_SIZE, start, end - start)
+        self._count = remaining
+        struct.pack_into("<Q", self._mm, _HEADER.size - 8, self._count)
+        self._mm.flush()
+        logger.info("Metric store: %d record lama dibuang (retensi %s hari)", keep_from, self.retention_days)
+
+
+def seed_history(history, store: MetricStore, *, days: float = 7.0) -> int:
+    """Replay recent per-minute records into a :class:`MetricsHistory`'s rollups.
+
+    The store only has 1-minute averages, so after a restart the min/max of
+    the replayed 1h/1d buckets are the extremes of those averages; shorter
+    peaks from before the restart are lost.
+    """
+    now = time.time()
+    count = 0
+    for stamp, values in store.records(now - days * 86400, now):
+        history.replay(float(stamp), values)
+        count += 1
+    return count
+
+
+__all__ = ["MetricStore", "seed_history"]
@@ -0,0 +1,157 @@
+"""Follow systemd unit lifecycle events for whitelisted services."""
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Sequence
+
+from ..config import Settings
+from ..utils.format import human_datetime
+from ..utils.logging import get_logger
+from .journal import follow_journal, unit_name
+from .sysctl import ServiceStatus, invalidate_status_cache, list_services
+
+logger = get_logger(__name__)
+
+# systemd catalog MESSAGE_IDs logged by PID 1 -> (ActiveState, SubState)
+UNIT_EVENTS: Dict[str, tuple[str, str]] = {
+    "7d4958e842da4a758f6c1cdc7b36dcc5": ("activating", "start"),  # starting
+    "39f53479d3a045ac8e11786248231fbf": ("active", "running"),  # started
+    "de5b426a63be47a7b6ac3eaac82e2f6f": ("deactivating", "stop"),  # stopping
+    "9d1aaa27d60140bd96365438aad20286": ("inactive", "dead"),  # stopped
+    "be02cf6855d2428ba40df7e9d022f03d": ("failed", "failed"),  # job failed
+    "d9b373ed55a64feb8242e02dbe79a49c": ("failed", "failed"),  # unit failed
+    "7ad2d189f7e94e70a38c781354912448": ("inactive", "dead"),  # unit succeeded ("Deactivated successfully")
+    "5eb03494b6584870a536b337290809b3": ("activating", "auto-restart"),  # restart scheduled
+    "d34d037fff1847e6ae669a370e694725": ("reloading", "reload"),  # reloading
+    "7b05ebc668384222baa8881179cfda54": ("active", "running"),  # reloaded
+}
+
+LineStream = AsyncIterator[bytes]
+StreamFactory = Callable[[Sequence[str]], Awaitable[LineStream]]
+ChangeCallback = Callable[[ServiceStatus, ServiceStatus | None], Awaitable[None]]
+
+
+async def journal_stream(units: Sequence[str]) -> LineStream:
+    """``journalctl -f -o json`` limited to PID 1 messages about ``units``."""
+    matches = ["-n", "0", "_PID=1", *(f"UNIT={unit_name(unit)}" for unit in units)]
+    return await follow_journal(matches)
+
+
+class UnitWatcher:
+    """Keep a live ``ServiceStatus`` table fed by systemd journal events.
+
+    The table is seeded (and periodically re-synced) with one
+    :func:`list_services` call; in between, each lifecycle message updates the
+    unit in place and ``on_change(new, old)`` is awaited right away. If the
+    stream dies the watcher reports ``running == False`` so callers fall back
+    to polling, and reconnects after ``retry_delay`` seconds.
+    """
+
+    def __init__(
+        self,
+        settings: Settings,
+        on_change: ChangeCallback,
+        *,
+        stream_factory: StreamFactory = journal_stream,
+        resync_interval: float = 600.0,
+        retry_delay: float = 5.0,
+    ):
+        self.settings = settings
+        self.on_change = on_change
+        self.stream_factory = stream_factory
+        self.resync_interval = resync_interval
+        self.retry_delay = retry_delay
+        self.running = False
+        self._table: Dict[str, ServiceStatus] = {}
+        self._aliases: Dict[str, str] = {}
+        self._synced_at = 0.0
+        self._units: tuple[str, ...] = ()
+        self._task: asyncio.Task | None = None
+
+    def statuses(self) -> List[ServiceStatus]:
+        return [self._table[name] for name in self.settings.services_whitelist if name in self._table]
+
+    async def current(self) -> List[ServiceStatus]:
+        """Live table while the stream is up, otherwise (or when stale) a fresh poll."""
+        if self.running and tuple(self.settings.services_whitelist) != self._units:
+            logger.info("Whitelist service berubah, stream journal dibuka ulang")
+            await self.stop()
+            self.start()
+        if not self.running or time.monotonic() - self._synced_at >= self.resync_interval:
+            await self.resync()
+        return self.statuses()
+
+    async def resync(self) -> None:
+        statuses = await list_services(self.settings)
+        self._table = {status.name: status for status in statuses}
+        self._aliases = {}
+        for name in self.settings.services_whitelist:
+            self._aliases[name] = name
+            self._aliases[unit_name(name)] = name
+        self._synced_at = time.monotonic()
+
+    async def handle_line(self, line: bytes | str) -> ServiceStatus | None:
+        """Apply one journal JSON entry; returns the new status if it changed."""
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            return None
+        state = UNIT_EVENTS.get(entry.get("MESSAGE_ID", ""))
+        name = self._aliases.get(entry.get("UNIT", ""))
+        if state is None or name is None:
+            return None
+        old = self._table.get(name)
+        if old is not None and (old.active_state, old.sub_state) == state:
+            return None
+        status = ServiceStatus(
+            name=name,
+            active_state=state[0],
+            sub_state=state[1],
+            description=old.description if old else "",
+            since=human_datetime() if state[0] == "active" else (old.since if old else ""),
+            control_group=old.control_group if old else "",
+        )
+        self._table[name] = status
+        invalidate_status_cache()
+        logger.info("Unit %s: %s/%s", name, status.active_state, status.sub_state)
+        await self.on_change(status, old)
+        return status
+
+    async def _run(self) -> None:
+        delay = self.retry_delay
+        while True:
+            try:
+                await self.resync()
+                self._units = tuple(self.settings.services_whitelist)
+                stream = await self.stream_factory(self._units)
+                self.running = True
+                async for line in stream:
+                    delay = self.retry_delay
+                    await self.handle_line(line)
+                logger.warning("Stream journal unit berhenti, fallback ke polling")
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning("Watcher unit systemd gagal: %s", exc)
+            self.running = False
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 300.0)
+
+    def start(self) -> None:
+        if self._task is None and self.settings.services_whitelist:
+            self._task = asyncio.create_task(self._run(), name="unit-watcher")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.running = False
+
+
+__all__ = ["UNIT_EVENTS", "UnitWatcher", "journal_stream"]
@@ -0,0 +1,121 @@
+"""In-process latency histograms for commands, handlers and jobs."""
+from __future__ import annotations
+
+import bisect
+import contextlib
+import functools
+import threading
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Iterator, List, TypeVar
+
+# bucket upper bounds in milliseconds; anything slower lands in the last, open bucket
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1_000, 2_000, 5_000, 10_000, 30_000, 60_000, 300_000)
+
+T = TypeVar("T")
+
+
+@dataclass(slots=True)
+class PerfSummary:
+    name: str
+    count: int
+    total_ms: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    max_ms: float
+
+
+class Histogram:
+    """Counts per fixed bucket plus count, sum and max; quantiles are bucket upper bounds."""
+
+    __slots__ = ("counts", "count", "total_ms", "max_ms")
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, ms: float) -> None:
+        self.counts[bisect.bisect_left(BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, bucket in enumerate(self.counts):
+            seen += bucket
+            if seen >= rank:
+                bound = BUCKETS_MS[index] if index < len(BUCKETS_MS) else self.max_ms
+                return min(bound, self.max_ms)
+        return self.max_ms
+
+
+class PerfRegistry:
+    """Histograms by name; safe to feed from executor threads."""
+
+    def __init__(self) -> None:
+        self._histograms: Dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+        self.since = time.time()
+
+    def observe(self, name: str, seconds: float) -> None:
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram()
+            histogram.observe(seconds * 1000)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self.since = time.time()
+
+    def summaries(self) -> List[PerfSummary]:
+        """Every path, slowest p95 first."""
+        with self._lock:
+            items = [
+                PerfSummary(
+                    name,
+                    hist.count,
+                    hist.total_ms,
+                    hist.quantile(0.5),
+                    hist.quantile(0.95),
+                    hist.quantile(0.99),
+                    hist.max_ms,
+                )
+                for name, hist in self._histograms.items()
+            ]
+        return sorted(items, key=lambda item: (item.p95_ms, item.max_ms), reverse=True)
+
+
+PERF = PerfRegistry()
+
+
+@contextlib.contextmanager
+def timed(name: str, registry: PerfRegistry = PERF) -> Iterator[None]:
+    """Record how long the block took, whether or not it raised."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        registry.observe(name, time.perf_counter() - start)
+
+
+def instrument(name: str, func: Callable[..., Awaitable[T]], registry: PerfRegistry = PERF) -> Callable[..., Awaitable[T]]:
+    """Wrap a coroutine function (handler, job callback) so every call is timed as ``name``."""
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs) -> T:
+        with timed(name, registry):
+            return await func(*args, **kwargs)
+
+    return wrapper
+
+
+__all__ = ["BUCKETS_MS", "Histogram", "PERF", "PerfRegistry", "PerfSummary", "instrument", "timed"]
@@ -2,10 +2,22 @@
 from __future__ import annotations
 
 import asyncio
+import contextlib
+import os
 import shlex
+import signal
 import subprocess
-from dataclasses import dataclass
-from typing import Iterable, Mapping, Sequence
+import tempfile
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import AsyncIterator, Awaitable, BinaryIO, Callable, Deque, Dict, List, Mapping, Sequence, Tuple
+
+from .perf import timed
+
+# a partial line longer than this is passed on as is rather than held back
+LINE_LIMIT = 4096
 
 
 class ShellCommandError(RuntimeError):
@@ -25,54 +37,389 @@ class CommandResult:
     stdout: str
     stderr: str
     returncode: int
+    dropped_bytes: int = 0  # elided from the middle of stdout/stderr by ``max_output``
+    spill_path: Path | None = None  # full output, only kept when something was dropped
+    cached_age: float | None = None  # seconds since the run, when served by ``cached_cmd``
 
     def succeeded(self) -> bool:
         return self.returncode == 0
 
+    def cache_note(self) -> str:
+        """``"(cache N dtk lalu)"`` for a cached result, empty for a fresh one."""
+        if self.cached_age is None:
+            return ""
+        return f"(cache {int(self.cached_age)} dtk lalu)"
+
+
+class OutputBuffer:
+    """Keep the first and last ``limit // 2`` bytes of a stream, counting what falls between.
+
+    The tail is a fixed ring, so memory stays at ``limit`` however much the
+    command prints. Every chunk is also copied to ``spill`` when given.
+    """
+
+    __slots__ = ("head", "head_limit", "ring", "pos", "tail_len", "dropped", "spill")
+
+    def __init__(self, limit: int | None = None, spill: BinaryIO | None = None):
+        self.head = bytearray()
+        self.head_limit = limit - limit // 2 if limit is not None else None
+        self.ring = bytearray(limit // 2 if limit is not None else 0)
+        self.pos = 0
+        self.tail_len = 0
+        self.dropped = 0
+        self.spill = spill
+
+    def feed(self, chunk: bytes) -> None:
+        if self.spill is not None:
+            self.spill.write(chunk)
+        if self.head_limit is None:
+            self.head += chunk
+            return
+        room = self.head_limit - len(self.head)
+        if room > 0:
+            self.head += chunk[:room]
+            chunk = chunk[room:]
+        if chunk:
+            self._ring_write(chunk)
+
+    def _ring_write(self, chunk: bytes) -> None:
+        size = len(self.ring)
+        length = len(chunk)
+        if length >= size:
+            self.dropped += self.tail_len + length - size
+            self.ring[:] = chunk[length - size :]
+            self.pos, self.tail_len = 0, size
+            return
+        self.dropped += max(0, self.tail_len + length - size)
+        end = self.pos + length
+        if end <= size:
+            self.ring[self.pos : end] = chunk
+        else:
+            first = size - self.pos
+            self.ring[self.pos :] = chunk[:first]
+            self.ring[: length - first] = chunk[first:]
+        self.pos = end % size
+        self.tail_len = min(size, self.tail_len + length)
+
+    def text(self) -> str:
+        if self.tail_len == len(self.ring):
+            tail = self.ring[self.pos :] + self.ring[: self.pos]
+        else:
+            tail = self.ring[: self.tail_len]
+        if not self.dropped:
+            return bytes(self.head + tail).decode("utf-8", errors="replace").strip()
+        head = self.head.decode("utf-8", errors="replace")
+        return f"{head}\n… {self.dropped} byte dipotong …\n{tail.decode('utf-8', errors='replace')}".strip()
+
+
+def _args(command: Sequence[str] | str) -> tuple[str, ...]:
+    return tuple(shlex.split(command)) if isinstance(command, str) else tuple(command)
+
+
+async def _spawn(
+    args: tuple[str, ...], env: Mapping[str, str] | None, stderr: int
+) -> asyncio.subprocess.Process:
+    # own session/process group, so a timeout can take grandchildren down too
+    with timed("cmd.spawn"):
+        return await asyncio.create_subprocess_exec(
+            *args,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=stderr,
+            env=dict(env) if env else None,
+            start_new_session=True,
+        )
+
 
-def _run_sync(
-    command: Sequence[str],
+def _kill_group(process: asyncio.subprocess.Process) -> None:
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+async def _reap(process: asyncio.subprocess.Process) -> None:
+    _kill_group(process)
+    with contextlib.suppress(ProcessLookupError):
+        await process.wait()
+
+
+async def _drain(
+    stream: asyncio.StreamReader, buffer: OutputBuffer, on_line: Callable[[str], None] | None
+) -> None:
+    partial = b""
+    while chunk := await stream.read(65536):
+        buffer.feed(chunk)
+        if on_line is not None:
+            partial = _split_lines(partial + chunk, on_line)
+    if on_line is not None and partial:
+        on_line(partial.decode("utf-8", errors="replace"))
+
+
+def _split_lines(data: bytes, on_line: Callable[[str], None]) -> bytes:
+    """Pass every complete line to ``on_line``; return the unfinished rest.
+
+    ``\r`` counts as a line end so progress bars show up as they redraw.
+    """
+    *lines, partial = data.replace(b"\r\n", b"\n").replace(b"\r", b"\n").split(b"\n")
+    for line in lines:
+        on_line(line.decode("utf-8", errors="replace"))
+    if len(partial) > LINE_LIMIT:
+        on_line(partial.decode("utf-8", errors="replace"))
+        return b""
+    return partial
+
+
+async def run_cmd(
+    command: Sequence[str] | str,
     *,
     timeout: int | float = 60,
     env: Mapping[str, str] | None = None,
     check: bool = True,
+    max_output: int | None = None,
+    spill_dir: Path | None = None,
+    on_line: Callable[[str], None] | None = None,
 ) -> CommandResult:
-    process = subprocess.run(
-        command,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        timeout=timeout,
-        env=dict(env) if env else None,
-        text=True,
-    )
+    """Run a command without blocking a thread; output is read as it is produced.
+
+    On timeout or cancellation the whole process group is killed. A timeout
+    raises :class:`subprocess.TimeoutExpired` carrying the output so far.
+    ``max_output`` caps what is kept per stream to a head and a tail window;
+    with ``spill_dir`` the full output is also written to a file there.
+    ``on_line`` is called with each stdout/stderr line as it arrives.
+    Every call is timed under ``cmd:<program>`` in :data:`~app.utils.perf.PERF`.
+    """
+    args = _args(command)
+    with timed(f"cmd:{Path(args[0]).name if args else '?'}"):
+        return await _run(args, timeout, env, check, max_output, spill_dir, on_line)
+
+
+async def _run(
+    args: tuple[str, ...],
+    timeout: int | float,
+    env: Mapping[str, str] | None,
+    check: bool,
+    max_output: int | None,
+    spill_dir: Path | None,
+    on_line: Callable[[str], None] | None,
+) -> CommandResult:
+    spill = _open_spill(spill_dir, args) if spill_dir is not None and max_output is not None else None
+    stdout = OutputBuffer(max_output, spill)
+    stderr = OutputBuffer(max_output, spill)
+    try:
+        process = await _spawn(args, env, asyncio.subprocess.PIPE)
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(
+                    _drain(process.stdout, stdout, on_line),
+                    _drain(process.stderr, stderr, on_line),
+                    process.wait(),
+                ),
+                timeout,
+            )
+        except asyncio.TimeoutError:
+            await _reap(process)
+            raise subprocess.TimeoutExpired(args, timeout, output=stdout.text(), stderr=stderr.text()) from None
+        except BaseException:
+            await asyncio.shield(_reap(process))
+            raise
+    except BaseException:
+        _close_spill(spill, keep=False)
+        raise
+    dropped = stdout.dropped + stderr.dropped
     result = CommandResult(
-        command=command,
-        stdout=process.stdout.strip(),
-        stderr=process.stderr.strip(),
+        command=args,
+        stdout=stdout.text(),
+        stderr=stderr.text(),
         returncode=process.returncode,
+        dropped_bytes=dropped,
+        spill_path=_close_spill(spill, keep=dropped > 0),
     )
-    if check and process.returncode != 0:
-        raise ShellCommandError(command, process.returncode, result.stdout, result.stderr)
+    if check and result.returncode != 0:
+        raise ShellCommandError(args, result.returncode, result.stdout, result.stderr)
     return result
 
 
-async def run_cmd(
+def _open_spill(spill_dir: Path, args: tuple[str, ...]) -> BinaryIO:
+    spill_dir.mkdir(parents=True, exist_ok=True)
+    name = Path(args[0]).name if args else "cmd"
+    return tempfile.NamedTemporaryFile("wb", dir=spill_dir, prefix=f"{name}-", suffix=".log", delete=False)
+
+
+def _close_spill(spill: BinaryIO | None, *, keep: bool) -> Path | None:
+    if spill is None:
+        return None
+    spill.close()
+    path = Path(spill.name)
+    if keep:
+        return path
+    path.unlink(missing_ok=True)
+    return None
+
+
+async def stream_cmd(
     command: Sequence[str] | str,
     *,
+    timeout: int | float | None = None,
+    env: Mapping[str, str] | None = None,
+    check: bool = True,
+) -> AsyncIterator[str]:
+    """Yield stdout+stderr lines as they arrive.
+
+    Output is read in chunks and split like ``run_cmd``'s ``on_line``: ``\r``
+    ends a line and a line longer than :data:`LINE_LIMIT` comes out in pieces.
+    Breaking out of the loop, cancellation or ``timeout`` (for the whole run)
+    kill the process group. With ``check`` a non-zero exit raises
+    :class:`ShellCommandError` after the last line, with the tail of the
+    output as ``stderr``.
+    """
+    args = _args(command)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout if timeout is not None else None
+    process = await _spawn(args, env, asyncio.subprocess.STDOUT)
+    tail: Deque[str] = deque(maxlen=20)
+    partial = b""
+    try:
+        while True:
+            remaining = None if deadline is None else max(0.0, deadline - loop.time())
+            try:
+                chunk = await asyncio.wait_for(process.stdout.read(65536), remaining)
+            except asyncio.TimeoutError:
+                raise subprocess.TimeoutExpired(args, timeout, output="\n".join(tail)) from None
+            lines: List[str] = []
+            if chunk:
+                partial = _split_lines(partial + chunk, lines.append)
+            elif partial:
+                lines.append(partial.decode("utf-8", errors="replace"))
+            for text in lines:
+                tail.append(text)
+                yield text
+            if not chunk:
+                break
+        await process.wait()
+    finally:
+        if process.returncode is None:
+            await asyncio.shield(_reap(process))
+    if check and process.returncode != 0:
+        raise ShellCommandError(args, process.returncode, "", "\n".join(tail))
+
+
+CacheKey = Tuple[Tuple[str, ...], Tuple[Tuple[str, str], ...]]
+
+
+class CommandCache:
+    """Recent results of read-only commands keyed on argv, least recently used out first.
+
+    Concurrent calls for the same argv share one run, whether or not they
+    asked for a fresh result; the run is cancelled (and its process group
+    killed) once every caller waiting on it was cancelled. Only exit code 0
+    is stored.
+    """
+
+    def __init__(self, max_entries: int = 64, *, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.clock = clock
+        self._entries: "OrderedDict[CacheKey, Tuple[float, float, CommandResult]]" = OrderedDict()
+        self._inflight: Dict[CacheKey, asyncio.Future] = {}
+        self._waiters: Dict[asyncio.Future, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def invalidate(self, prefix: Sequence[str] = ()) -> None:
+        """Forget entries whose argv starts with ``prefix`` (all of them by default)."""
+        prefix = tuple(prefix)
+        for key in [key for key in self._entries if key[0][: len(prefix)] == prefix]:
+            del self._entries[key]
+        # a run already in flight still reaches its waiters but is not stored
+        for key in [key for key in self._inflight if key[0][: len(prefix)] == prefix]:
+            del self._inflight[key]
+
+    async def get(
+        self,
+        key: CacheKey,
+        ttl: float,
+        fetch: Callable[[], Awaitable[CommandResult]],
+        *,
+        fresh: bool = False,
+    ) -> CommandResult:
+        now = self.clock()
+        entry = self._entries.get(key)
+        if entry is not None and not fresh:
+            ran_at, expires, result = entry
+            if now < expires:
+                self._entries.move_to_end(key)
+                return replace(result, cached_age=now - ran_at)
+            del self._entries[key]
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(fetch())
+            future.add_done_callback(lambda done: self._store(done, key, ttl, now))
+            self._inflight[key] = future
+        self._waiters[future] = self._waiters.get(future, 0) + 1
+        try:
+            return await asyncio.shield(future)
+        finally:
+            left = self._waiters.pop(future) - 1
+            if left:
+                self._waiters[future] = left
+            elif not future.done():  # the last caller went away, e.g. /jobs cancel
+                future.cancel()
+
+    def _store(self, future: asyncio.Future, key: CacheKey, ttl: float, ran_at: float) -> None:
+        if self._inflight.get(key) is not future:
+            return
+        del self._inflight[key]
+        if future.cancelled() or future.exception() is not None or ttl <= 0:
+            return
+        result: CommandResult = future.result()
+        if result.returncode != 0:
+            return
+        self._entries[key] = (ran_at, ran_at + ttl, result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+_COMMAND_CACHE = CommandCache()
+
+
+def invalidate_cached(prefix: Sequence[str] = ()) -> None:
+    """Drop cached results of commands starting with ``prefix``, e.g. after ``docker stop``."""
+    _COMMAND_CACHE.invalidate(prefix)
+
+
+async def cached_cmd(
+    command: Sequence[str] | str,
+    *,
+    ttl: float,
     timeout: int | float = 60,
     env: Mapping[str, str] | None = None,
     check: bool = True,
+    fresh: bool = False,
 ) -> CommandResult:
-    if isinstance(command, str):
-        args: Iterable[str] = shlex.split(command)
-    else:
-        args = command
+    """:func:`run_cmd` for idempotent read-only commands, reusing a result up to ``ttl`` seconds old.
 
-    loop = asyncio.get_running_loop()
-    return await loop.run_in_executor(
-        None,
-        lambda: _run_sync(tuple(args), timeout=timeout, env=env, check=check),
+    ``fresh`` skips the stored result (and replaces it). A served copy has
+    ``cached_age`` set; ``check`` applies to it as to a new run.
+    """
+    args = _args(command)
+    key = (args, tuple(sorted(env.items())) if env else ())
+    result = await _COMMAND_CACHE.get(
+        key, ttl, lambda: run_cmd(args, timeout=timeout, env=env, check=False), fresh=fresh
     )
+    if check and result.returncode != 0:
+        raise ShellCommandError(args, result.returncode, result.stdout, result.stderr)
+    return result
 
 
-__all__ = ["run_cmd", "ShellCommandError", "CommandResult"]
+__all__ = [
+    "CommandCache",
+    "CommandResult",
+    "OutputBuffer",
+    "ShellCommandError",
+    "cached_cmd",
+    "invalidate_cached",
+    "run_cmd",
+    "stream_cmd",
+]
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""Compare per-sample cost of the psutil collector against the /proc fast path."""
+import argparse
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+from app.services.hwmon import SensorRegistry
+from app.services.metrics import collect_metrics
+from app.services.procfs import ProcCollector
+
+
+def _bench(label: str, func, rounds: int) -> float:
+    func()  # warm up caches and lazy imports
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func()
+    per_sample = (time.perf_counter() - start) / rounds * 1_000_000
+    print(f"{label:<12} {per_sample:10.1f} µs/sampel")
+    return per_sample
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark collector metrics.")
+    parser.add_argument("--rounds", type=int, default=2000)
+    parser.add_argument("--hdd", default="/mnt/dre", help="Mount HDD yang ikut dibaca.")
+    args = parser.parse_args()
+
+    settings = SimpleNamespace(hdd_mount=Path(args.hdd))
+    # cpu_percent is passed in for both paths so neither sleeps for 0.5 s
+    baseline = _bench("psutil", lambda: collect_metrics(settings, cpu_percent=0.0), args.rounds)
+
+    collector = ProcCollector.create(settings, SensorRegistry())
+    if collector is None:
+        print("Fast path tidak tersedia di platform ini.")
+        return
+
+    def _fast() -> None:
+        collector.cpu_times()
+        collector.collect(0.0)
+
+    fast = _bench("procfs", _fast, args.rounds)
+    collector.close()
+    print(f"Percepatan: {baseline / fast:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
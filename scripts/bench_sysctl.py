@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""Compare one-call-per-unit ``systemctl show`` against the batched call."""
+import argparse
+import asyncio
+import time
+from types import SimpleNamespace
+
+from app.services.sysctl import _systemctl_show, list_services
+from app.utils.shell import run_cmd
+
+
+async def _units(count: int) -> list[str]:
+    result = await run_cmd(
+        ("systemctl", "list-units", "--type=service", "--all", "--no-legend", "--plain"), check=False
+    )
+    names = [line.split()[0] for line in result.stdout.splitlines() if line.strip()]
+    return (names * (count // max(len(names), 1) + 1))[:count]
+
+
+async def _per_unit(services: list[str]) -> None:
+    for service in services:
+        await _systemctl_show(service)
+
+
+async def main(sizes: list[int], rounds: int) -> None:
+    print(f"{'unit':>5} {'per-unit':>12} {'batch':>12}")
+    for size in sizes:
+        services = await _units(size)
+        settings = SimpleNamespace(services_whitelist=services, status_cache_ttl=0.0)
+        timings = []
+        for func in (lambda: _per_unit(services), lambda: list_services(settings, fresh=True)):
+            await func()  # warm up
+            start = time.perf_counter()
+            for _ in range(rounds):
+                await func()
+            timings.append((time.perf_counter() - start) / rounds * 1000)
+        print(f"{size:>5} {timings[0]:>9.1f} ms {timings[1]:>9.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark list_services.")
+    parser.add_argument("--sizes", default="3,10,30,60", help="Jumlah unit, dipisah koma")
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main([int(item) for item in args.sizes.split(",")], args.rounds))
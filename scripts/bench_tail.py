@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""Compare ``readlines()[-n:]`` against the block-wise reverse tail used by /log_runtime."""
+import argparse
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from app.handlers.logs import _read_tail
+
+LINE = b"2024-01-01 00:00:00,000 | INFO | potion.sampler | Metrics terkumpul cpu=12.5 mem=41.0 disk=63.2\n"
+UNITS = {"K": 1 << 10, "M": 1 << 20, "G": 1 << 30}
+
+
+def _size(raw: str) -> int:
+    raw = raw.strip().upper()
+    return int(float(raw[:-1]) * UNITS[raw[-1]]) if raw[-1] in UNITS else int(raw)
+
+
+def _write_log(path: Path, size: int) -> None:
+    chunk = LINE * ((4 << 20) // len(LINE))
+    with path.open("wb") as handle:
+        written = 0
+        while written < size:
+            part = chunk[: size - written]
+            handle.write(part)
+            written += len(part)
+
+
+def _readlines(path: Path, lines: int) -> str:
+    with path.open("r", encoding="utf-8", errors="ignore") as handle:
+        return "".join(handle.readlines()[-lines:])
+
+
+def _measure(func, path: Path, lines: int, rounds: int) -> tuple[float, float]:
+    func(path, lines)  # warm the page cache
+    tracemalloc.start()
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func(path, lines)
+    elapsed = (time.perf_counter() - start) / rounds * 1000
+    peak = tracemalloc.get_traced_memory()[1] / (1 << 20)
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main(sizes: list[str], lines: int, rounds: int, readlines_max: int, directory: str | None) -> None:
+    print(f"{'file':>6} {'readlines':>22} {'reverse tail':>22}")
+    with tempfile.TemporaryDirectory(dir=directory) as tmp:
+        for raw in sizes:
+            size = _size(raw)
+            path = Path(tmp) / f"runtime-{raw}.log"
+            _write_log(path, size)
+            if size <= readlines_max:
+                ms, peak = _measure(_readlines, path, lines, rounds)
+                old = f"{ms:>9.2f} ms {peak:>7.1f} MiB"
+            else:
+                old = f"{'(dilewati)':>22}"
+            ms, peak = _measure(_read_tail, path, lines, rounds)
+            print(f"{raw:>6} {old} {ms:>9.3f} ms {peak:>7.2f} MiB")
+            path.unlink()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark tail runtime.log.")
+    parser.add_argument("--sizes", default="1M,100M,1G", help="Ukuran file log, dipisah koma")
+    parser.add_argument("--lines", type=int, default=80)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument(
+        "--readlines-max", default="100M", help="readlines() di atas ukuran ini dilewati (makan RAM sebesar file)"
+    )
+    parser.add_argument("--dir", default=None, help="Folder sementara untuk file log uji")
+    args = parser.parse_args()
+    main(args.sizes.split(","), args.lines, args.rounds, _size(args.readlines_max), args.dir)
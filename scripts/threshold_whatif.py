@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""Backtest a candidate alert threshold against the recorded metrics store."""
+import argparse
+import time
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+from app.config import load_settings
+from app.services.backtest import current_threshold, render_what_if, what_if
+from app.services.history import parse_range
+from app.services.tsdb import MetricStore
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Simulasikan threshold alert ke riwayat metrics.")
+    parser.add_argument("metric", help="cpu, ram, disk, hdd, atau temp")
+    parser.add_argument("value", type=float)
+    parser.add_argument("range", help="Rentang ke belakang, contoh 30d atau 52w")
+    parser.add_argument("--store", type=Path, help="File metrics.tsdb (default DATA_DIR/metrics.tsdb)")
+    parser.add_argument("--limit", type=int, default=20, help="Jumlah alert terakhir yang ditampilkan")
+    args = parser.parse_args()
+
+    settings = load_settings()
+    # retention 0 keeps the CLI from compacting a file the bot may be writing
+    store = MetricStore(args.store or settings.data_dir / "metrics.tsdb", retention_days=0)
+    store.open()
+    try:
+        end = time.time()
+        start = end - parse_range(args.range)
+        began = time.perf_counter()
+        result = what_if(store, args.metric, args.value, start, end, settings.thresholds)
+        elapsed = time.perf_counter() - began
+        current = current_threshold(result.metric, settings.thresholds)
+        baseline = None
+        if current != args.value:
+            baseline = what_if(store, args.metric, current, start, end, settings.thresholds)
+    finally:
+        store.close()
+    for line in render_what_if(result, baseline, ZoneInfo(settings.timezone), limit=args.limit):
+        print(line)
+    print(f"Waktu replay: {elapsed * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
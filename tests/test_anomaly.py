@@ -0,0 +1,80 @@
+import datetime as dt
+import random
+
+from app.config import Thresholds
+from app.services.anomaly import AnomalyDetector, hour_of_week
+from app.services.metrics import HealthMonitor, SystemMetrics
+
+MONDAY = dt.datetime(2024, 1, 1, tzinfo=dt.timezone.utc).timestamp()
+
+
+def _metrics(stamp: float, cpu: float) -> SystemMetrics:
+    return SystemMetrics(
+        timestamp=dt.datetime.fromtimestamp(stamp, dt.timezone.utc),
+        cpu_percent=cpu,
+        load_avg=(0.5, 0.5, 0.5),
+        mem_total=8 << 30,
+        mem_available=4 << 30,
+        mem_percent=50.0,
+        swap_percent=0.0,
+        disk_root_percent=40.0,
+        disk_root_free=1,
+        disk_root_total=2,
+        disk_hdd_percent=None,
+        disk_hdd_free=None,
+        disk_hdd_total=None,
+        uptime_seconds=100.0,
+    )
+
+
+def _cpu_flags(detector: AnomalyDetector, stamp: float, cpu: float) -> bool:
+    conditions = {code: condition for condition, code, *_ in detector.evaluate(_metrics(stamp, cpu))}
+    return conditions["anomaly_cpu_percent"]
+
+
+def _busy_monday_history(detector: AnomalyDetector, weeks: int) -> float:
+    rng = random.Random(3)
+    stamp = MONDAY
+    for _ in range(weeks * 7 * 1440):
+        busy = hour_of_week(stamp) == 2  # Monday 02:00 UTC batch job
+        cpu = 80.0 if busy else 20.0 + rng.uniform(-2, 2)
+        detector.observe(stamp, {"cpu_percent": cpu, "mem_percent": 50.0})
+        stamp += 60
+    return stamp
+
+
+def test_hour_of_week_starts_monday():
+    assert hour_of_week(MONDAY) == 0
+    assert hour_of_week(MONDAY + 6 * 86400 + 23 * 3600) == 167
+
+
+def test_seasonal_baseline_expects_busy_hour():
+    seasonal = AnomalyDetector(Thresholds())
+    flat = AnomalyDetector(Thresholds(anomaly_seasonal=False))
+    end = _busy_monday_history(seasonal, 2)
+    _busy_monday_history(flat, 2)
+    batch_time = end + 2 * 3600 + 1800
+    assert not _cpu_flags(seasonal, batch_time, 80.0)
+    assert _cpu_flags(flat, batch_time, 80.0)
+    # the same load outside the batch window is unusual for both
+    assert _cpu_flags(seasonal, batch_time + 6 * 3600, 80.0)
+
+
+def test_anomaly_alert_goes_through_hysteresis():
+    monitor = HealthMonitor(Thresholds(cpu_percent=101.0))
+    stamp = MONDAY
+    for _ in range(120):
+        monitor.evaluate(_metrics(stamp, 10.0), [])
+        stamp += 60
+    codes = []
+    for _ in range(7):
+        triggered, _ = monitor.evaluate(_metrics(stamp, 60.0), [])
+        codes.extend(alert.code for alert in triggered)
+        stamp += 60
+    assert codes == ["anomaly_cpu_percent"]
+    for _ in range(3):
+        _, recovered = monitor.evaluate(_metrics(stamp, 10.0), [])
+        if recovered:
+            break
+        stamp += 60
+    assert recovered == ["anomaly_cpu_percent"]
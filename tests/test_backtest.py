@@ -0,0 +1,107 @@
+import datetime as dt
+import random
+from array import array
+
+import pytest
+from app.config import Thresholds
+from app.services.backtest import breach_mask, replay, what_if, what_if_many
+from app.services.metrics import HealthMonitor, SystemMetrics
+from app.services.rules import build_rules
+from app.services.tsdb import MetricStore
+
+START = 1_700_000_000
+
+
+def _metrics(stamp: int, cpu: float, disk: float) -> SystemMetrics:
+    return SystemMetrics(
+        timestamp=dt.datetime.fromtimestamp(stamp, dt.timezone.utc),
+        cpu_percent=cpu,
+        load_avg=(0.0, 0.0, 0.0),
+        mem_total=8 << 30,
+        mem_available=4 << 30,
+        mem_percent=50.0,
+        swap_percent=0.0,
+        disk_root_percent=disk,
+        disk_root_free=1,
+        disk_root_total=2,
+        disk_hdd_percent=None,
+        disk_hdd_free=None,
+        disk_hdd_total=None,
+        uptime_seconds=100.0,
+    )
+
+
+def _series(count: int, seed: int):
+    rng = random.Random(seed)
+    cpu, disk = [], []
+    level_cpu, level_disk = 60.0, 85.0
+    for _ in range(count):
+        level_cpu = min(100.0, max(0.0, level_cpu + rng.uniform(-8, 8)))
+        level_disk = min(100.0, max(0.0, level_disk + rng.uniform(-1, 1)))
+        cpu.append(round(level_cpu, 1))
+        disk.append(round(level_disk, 1))
+    return cpu, disk
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_replay_matches_health_monitor(seed):
+    count = 2000
+    cpu, disk = _series(count, seed)
+    stamps = array("I", range(START, START + count * 60, 60))
+    thresholds = Thresholds(cpu_percent=75.0, disk_percent=86.0, hysteresis_minutes=10)
+    monitor = HealthMonitor(thresholds)
+    fired = {"cpu_high": [], "disk_root": []}
+    for stamp, cpu_value, disk_value in zip(stamps, cpu, disk):
+        triggered, _ = monitor.evaluate(_metrics(stamp, cpu_value, disk_value), [])
+        for alert in triggered:
+            fired.setdefault(alert.code, []).append(stamp)
+
+    rules = {rule.code: rule for rule in build_rules()}
+    _, cpu_alerts = replay(stamps, array("f", cpu), rules["cpu_high"], 75.0, 10)
+    _, disk_alerts = replay(stamps, array("f", disk), rules["disk_root"], 86.0, 10)
+    assert [alert.fired_at for alert in cpu_alerts] == fired["cpu_high"]
+    assert [alert.fired_at for alert in disk_alerts] == fired["disk_root"]
+    assert cpu_alerts and disk_alerts
+
+
+def test_breach_mask_counting_aggregates():
+    rules = {rule.code: rule for rule in build_rules({"cpu_high": "max:3m", "ram_low": "min:2m"})}
+    values = [10.0, 95.0, 10.0, 10.0, 10.0, float("nan")]
+    assert breach_mask(values, rules["cpu_high"], 90.0) == bytes([0, 0, 1, 1, 0, 0])
+    ram = [900.0, 400.0, 300.0, 800.0]
+    assert breach_mask(ram, rules["ram_low"], 500.0) == bytes([0, 1, 1, 1])
+
+
+def test_what_if_reads_store(tmp_path):
+    store = MetricStore(tmp_path / "metrics.tsdb", retention_days=0)
+    store.open()
+    for index in range(30):
+        values = [0.0] * len(store.columns)
+        values[store.columns.index("disk_root_percent")] = 95.0 if 10 <= index < 20 else 50.0
+        store.append(START + index * 60, values)
+    result = what_if(store, "disk", 90.0, START, START + 3600, Thresholds())
+    store.close()
+    assert result.samples == 30
+    assert result.breach_samples == 10
+    assert [(alert.fired_at, alert.recovered_at) for alert in result.alerts] == [
+        (START + 11 * 60, START + 20 * 60)
+    ]
+    with pytest.raises(ValueError):
+        what_if(store, "swap", 50.0, START, START + 60, Thresholds())
+
+
+async def test_what_if_many_matches_what_if(tmp_path):
+    store = MetricStore(tmp_path / "metrics.tsdb", retention_days=0)
+    store.open()
+    for index in range(60):
+        values = [0.0] * len(store.columns)
+        values[store.columns.index("mem_available")] = float((200 if index % 20 < 8 else 900) << 20)
+        store.append(START + index * 60, values)
+    thresholds = Thresholds()
+    many = await what_if_many(store, "ram", [500.0, 100.0], START, START + 3600, thresholds)
+    single = [what_if(store, "ram", value, START, START + 3600, thresholds) for value in (500.0, 100.0)]
+    store.close()
+    assert [(r.threshold, r.breach_samples, r.alerts) for r in many] == [
+        (r.threshold, r.breach_samples, r.alerts) for r in single
+    ]
+    assert many[0].breach_samples > 0 and many[1].breach_samples == 0
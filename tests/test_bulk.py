@@ -0,0 +1,96 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+from telegram.error import RetryAfter
+
+from app.config import _parse_service_groups
+from app.handlers.controls import service_bulk
+from app.services.bulk import expand_targets, predecessors, run_bulk
+from app.services.sysctl import service_dependencies
+from app.utils.shell import CommandResult, ShellCommandError
+
+
+def test_groups_expand_in_order():
+    settings = SimpleNamespace(service_groups=_parse_service_groups("rag=db.service,rag.service; web=nginx"))
+    assert expand_targets(settings, ["rag", "nginx", "db.service"]) == ["db.service", "rag.service", "nginx"]
+
+
+def test_predecessors_follow_dependencies_and_break_cycles():
+    deps = {"api": {"db"}, "worker": {"api", "db", "outside"}, "db": set()}
+    units = ["worker", "api", "db"]
+    assert predecessors(deps, units, "restart") == {"worker": {"api", "db"}, "api": {"db"}, "db": set()}
+    assert predecessors(deps, units, "stop") == {"worker": set(), "api": {"worker"}, "db": {"api", "worker"}}
+    cyclic = predecessors({"a": {"b"}, "b": {"a"}, "c": {"a"}}, ["a", "b", "c"], "start")
+    assert cyclic == {"a": set(), "b": set(), "c": {"a"}}
+
+
+async def test_run_bulk_orders_caps_and_skips(mocker):
+    running = 0
+    peak = 0
+    order = []
+
+    async def fake_control(settings, unit, action):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        order.append(unit)
+        if unit == "bad":
+            raise ShellCommandError(("systemctl",), 1, "", "Job failed")
+
+    mocker.patch("app.services.bulk.control_service", side_effect=fake_control)
+    updates = []
+
+    async def on_update(items):
+        updates.append([item.state for item in items])
+
+    units = ["db", "a", "b", "c", "bad", "after-bad", "api"]
+    preds = {"api": {"db"}, "after-bad": {"bad"}}
+    results = await run_bulk(None, units, "restart", preds, concurrency=2, on_update=on_update)
+
+    assert peak == 2
+    assert order.index("api") > order.index("db")
+    states = {item.name: item.state for item in results}
+    assert states["bad"] == "fail" and states["after-bad"] == "skip"
+    assert all(states[unit] == "ok" for unit in ("db", "a", "b", "c", "api"))
+    assert "after-bad" not in order
+    assert updates[-1].count("pending") == 0
+
+
+async def test_service_dependencies_from_systemctl_show(mocker):
+    output = (
+        "Id=api.service\nAfter=network.target db.service\nRequires=db.service\n\n"
+        "Id=db.service\nAfter=network.target\nRequires=\n"
+    )
+    mocker.patch(
+        "app.services.sysctl.run_cmd",
+        AsyncMock(return_value=CommandResult(("systemctl",), output, "", 0)),
+    )
+    assert await service_dependencies(["api", "db.service"]) == {"api": {"db.service"}, "db.service": set()}
+
+
+async def test_service_bulk_survives_flood_control_and_sends_final_status(mocker):
+    mocker.patch("app.handlers.controls.service_dependencies", AsyncMock(return_value={}))
+    mocker.patch("app.services.bulk.control_service", AsyncMock())
+    log = mocker.patch("app.handlers.controls.log_action")
+    pending = MagicMock(edit_text=AsyncMock(side_effect=[None, RetryAfter(0), None, None, None]))
+    update = MagicMock()
+    update.effective_user.id = 1
+    update.message.reply_text = AsyncMock(return_value=pending)
+    settings = SimpleNamespace(
+        is_admin=lambda user_id: True,
+        services_whitelist=[f"u{index}" for index in range(20)],
+        service_groups={},
+        self_service="bot.service",
+        bulk_concurrency=5,
+    )
+    context = MagicMock(bot_data={"settings": settings}, args=["restart"] + settings.services_whitelist)
+
+    await service_bulk(update, context)
+
+    assert pending.edit_text.await_count <= 3  # one initial, then coalesced, plus the final one
+    final = pending.edit_text.call_args[0][0]
+    assert final.count("✅") == 20
+    assert log.call_args.kwargs["result"] == "ok"
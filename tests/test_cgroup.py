@@ -0,0 +1,94 @@
+import datetime as dt
+from pathlib import Path
+
+from app.config import ServiceLimit, Thresholds, _parse_service_limits
+from app.services.cgroup import CgroupAccounting, cgroup_dir
+from app.services.metrics import HealthMonitor, SystemMetrics
+from app.services.sysctl import ServiceStatus
+
+BASE = dt.datetime(2024, 1, 1, tzinfo=dt.timezone.utc)
+
+
+def _metrics(minute: int) -> SystemMetrics:
+    return SystemMetrics(
+        timestamp=BASE + dt.timedelta(minutes=minute),
+        cpu_percent=10.0,
+        load_avg=(0.0, 0.0, 0.0),
+        mem_total=8 << 30,
+        mem_available=4 << 30,
+        mem_percent=50.0,
+        swap_percent=0.0,
+        disk_root_percent=40.0,
+        disk_root_free=1,
+        disk_root_total=2,
+        disk_hdd_percent=None,
+        disk_hdd_free=None,
+        disk_hdd_total=None,
+        uptime_seconds=100.0,
+    )
+
+
+def _write(directory: Path, memory: int, usage_usec: int, rbytes: int, wbytes: int, pids: int) -> None:
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / "memory.current").write_text(f"{memory}\n")
+    (directory / "cpu.stat").write_text(f"usage_usec {usage_usec}\nuser_usec 1\nsystem_usec 1\n")
+    (directory / "io.stat").write_text(
+        f"8:0 rbytes={rbytes} wbytes={wbytes} rios=1 wios=1 dbytes=0 dios=0\n"
+        "8:16 rbytes=100 wbytes=0 rios=1 wios=0 dbytes=0 dios=0\n"
+    )
+    (directory / "pids.current").write_text(f"{pids}\n")
+
+
+def _status(name: str, control_group: str = "") -> ServiceStatus:
+    return ServiceStatus(name, "active", "running", "", "", control_group)
+
+
+def test_cgroup_dir_for_plain_template_and_reported_units(tmp_path):
+    assert cgroup_dir(_status("nginx"), tmp_path) == tmp_path / "system.slice/nginx.service"
+    assert cgroup_dir(_status("pg-ctl@16-main.service"), tmp_path) == (
+        tmp_path / "system.slice/system-pg\\x2dctl.slice/pg-ctl@16-main.service"
+    )
+    assert cgroup_dir(_status("postgres", "/system.slice/x.service"), tmp_path) == (
+        tmp_path / "system.slice/x.service"
+    )
+
+
+def test_sample_computes_rates_from_deltas(tmp_path):
+    unit = tmp_path / "system.slice/rag.service"
+    accounting = CgroupAccounting(tmp_path, cpu_count=4)
+    statuses = [_status("rag.service"), _status("stopped.service")]
+    _write(unit, 1 << 30, 1_000_000, 0, 0, 7)
+    first = accounting.sample(statuses, now=100.0)
+    assert [item.name for item in first] == ["rag.service"]
+    assert first[0].cpu_percent == 0.0 and first[0].pids == 7
+
+    _write(unit, 2 << 30, 21_000_000, 50_000_000, 10_000_000, 9)
+    usage = accounting.sample(statuses, now=110.0)[0]
+    assert usage.memory_bytes == 2 << 30
+    assert usage.cpu_percent == 50.0  # 20 s of CPU over 10 s on 4 cores
+    assert usage.read_bps == 5_000_000.0
+    assert usage.write_bps == 1_000_000.0
+
+    _write(unit, 2 << 30, 99_000_000, 50_000_000, 10_000_000, 9)
+    assert accounting.sample(statuses, now=110.5)[0].cpu_percent == 50.0  # too close, rates kept
+
+
+def test_service_limits_feed_health_monitor(tmp_path):
+    thresholds = Thresholds(service_limits=_parse_service_limits("rag.service=mem:1G,cpu:40;*=mem:4G"))
+    assert thresholds.limit_for("other") == ServiceLimit(memory_bytes=4 << 30)
+    monitor = HealthMonitor(thresholds)
+    accounting = CgroupAccounting(tmp_path, cpu_count=1)
+    unit = tmp_path / "system.slice/rag.service"
+    _write(unit, 2 << 30, 0, 0, 0, 1)
+    accounting.sample([_status("rag.service")], now=0.0)
+    _write(unit, 2 << 30, 30_000_000, 0, 0, 1)
+    usage = accounting.sample([_status("rag.service")], now=60.0)
+
+    codes = []
+    for minute in range(4):
+        triggered, _recovered = monitor.evaluate(_metrics(minute), [], usage)
+        codes += [alert.code for alert in triggered]
+    assert codes == ["svcmem_rag.service", "svccpu_rag.service"]
+
+    _triggered, recovered = monitor.evaluate(_metrics(4), [], [])
+    assert sorted(recovered) == ["svccpu_rag.service", "svcmem_rag.service"]
@@ -46,10 +46,10 @@ async def test_docker_menu(update, context):
         reply_markup=DOCKER_MENU
     )
 
-@patch("app.handlers.docker.run_cmd")
+@patch("app.handlers.docker.cached_cmd")
 async def test_list_containers_authorized(run_cmd_mock, update, context):
     """Test that an authorized user can list containers."""
-    run_cmd_mock.return_value = MagicMock(returncode=0, stdout="test output", stderr="")
+    run_cmd_mock.return_value = MagicMock(returncode=0, stdout="test output", stderr="", cached_age=None)
     await list_containers(update, context)
     assert update.message.reply_text.call_count == 2
 
@@ -100,12 +100,27 @@ async def test_logs_container_start(update, context):
 @patch("app.handlers.docker.run_cmd")
 async def test_logs_container(run_cmd_mock, update, context):
     """Test getting container logs."""
-    run_cmd_mock.return_value = MagicMock(returncode=0, stdout="test logs", stderr="")
+    run_cmd_mock.return_value = MagicMock(returncode=0, stdout="test logs", stderr="", spill_path=None)
     update.message.text = "test_container"
     result = await logs_container(update, context)
     assert update.message.reply_text.call_count == 2
     assert result == ConversationHandler.END
 
+@patch("app.handlers.docker.run_cmd")
+async def test_logs_container_failure_removes_spill(run_cmd_mock, update, context, tmp_path):
+    """A failed docker logs run still cleans up its spill file."""
+    spill = tmp_path / "docker-1.log"
+    spill.write_text("full output")
+    run_cmd_mock.return_value = MagicMock(
+        returncode=1, stdout="", stderr="boom", spill_path=spill, dropped_bytes=1024
+    )
+    update.message.text = "test_container"
+    update.message.reply_document = AsyncMock()
+    result = await logs_container(update, context)
+    update.message.reply_document.assert_awaited_once()
+    assert not spill.exists()
+    assert result == ConversationHandler.END
+
 async def test_cancel(update, context):
     """Test cancelling the conversation."""
     result = await cancel(update, context)
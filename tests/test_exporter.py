@@ -0,0 +1,88 @@
+import asyncio
+import datetime as dt
+from collections import Counter
+from unittest.mock import MagicMock
+
+import pytest
+from app.config import Thresholds
+from app.services.exporter import MetricsExporter, parse_listen
+from app.services.metrics import DiskIO, HealthMonitor, SystemMetrics, Temperature
+from app.services.sysctl import ServiceStatus
+
+
+def _metrics() -> SystemMetrics:
+    return SystemMetrics(
+        timestamp=dt.datetime(2024, 1, 1, tzinfo=dt.timezone.utc),
+        cpu_percent=12.5,
+        load_avg=(0.5, 0.4, 0.3),
+        mem_total=8 << 30,
+        mem_available=4 << 30,
+        mem_percent=50.0,
+        swap_percent=0.0,
+        disk_root_percent=40.0,
+        disk_root_free=60,
+        disk_root_total=100,
+        disk_hdd_percent=None,
+        disk_hdd_free=None,
+        disk_hdd_total=None,
+        uptime_seconds=100.0,
+        temperatures=[Temperature(label='k10temp "Tctl"', current=55.0)],
+        disk_io=[DiskIO(name="sda", await_ms=3.5)],
+    )
+
+
+@pytest.fixture
+def bot_data():
+    sampler = MagicMock(samples=7, failures=1)
+    sampler.latest.return_value = _metrics()
+    return {
+        "metrics_sampler": sampler,
+        "health_monitor": HealthMonitor(Thresholds()),
+        "service_statuses": [ServiceStatus("rag.service", "failed", "failed", "RAG", "")],
+        "counters": Counter(updates=3),
+    }
+
+
+def test_render_uses_cached_snapshot(bot_data):
+    exporter = MetricsExporter(bot_data, "127.0.0.1", 0)
+    body = exporter.render().decode()
+    assert body.endswith("# EOF\n")
+    assert "potion_cpu_percent 12.5" in body
+    assert 'potion_load_average{window="5m"} 0.4' in body
+    assert 'potion_disk_percent{mount="hdd"}' not in body
+    assert 'potion_temperature_celsius{sensor="k10temp \\"Tctl\\""} 55.0' in body
+    assert 'potion_disk_io_await_ms{disk="sda"} 3.5' in body
+    assert 'potion_service_healthy{service="rag.service"} 0.0' in body
+    assert "potion_bot_updates_total 3.0" in body
+    assert "potion_bot_metrics_samples_total 7.0" in body
+    cached = exporter._system_text
+    exporter.render()
+    assert exporter._system_text is cached
+
+
+async def test_http_endpoint(bot_data):
+    exporter = MetricsExporter(bot_data, "127.0.0.1", 0)
+    await exporter.start()
+    port = exporter._server.sockets[0].getsockname()[1]
+    try:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"GET /metrics HTTP/1.1\r\nHost: x\r\n\r\n")
+        response = await reader.read()
+        writer.close()
+        assert response.startswith(b"HTTP/1.1 200 OK")
+        assert b"application/openmetrics-text" in response
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"GET / HTTP/1.1\r\n\r\n")
+        assert (await reader.read()).startswith(b"HTTP/1.1 404")
+        writer.close()
+    finally:
+        await exporter.stop()
+
+
+def test_parse_listen():
+    assert parse_listen("") is None
+    assert parse_listen("9464") == ("127.0.0.1", 9464)
+    assert parse_listen("0.0.0.0:9100") == ("0.0.0.0", 9100)
+    for bad in ("127.0.0.1:99999", "-1", "host:http"):
+        with pytest.raises(ValueError):
+            parse_listen(bad)
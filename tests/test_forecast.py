@@ -0,0 +1,62 @@
+import datetime as dt
+
+import pytest
+from app.config import Thresholds
+from app.services.forecast import GrowthFit, format_eta
+from app.services.metrics import HealthMonitor, SystemMetrics
+
+GB = 1 << 30
+START = 1_700_000_000
+
+
+def _metrics(stamp: float, hdd_used: float) -> SystemMetrics:
+    return SystemMetrics(
+        timestamp=dt.datetime.fromtimestamp(stamp, dt.timezone.utc),
+        cpu_percent=5.0,
+        load_avg=(0.1, 0.1, 0.1),
+        mem_total=8 * GB,
+        mem_available=4 * GB,
+        mem_percent=50.0,
+        swap_percent=0.0,
+        disk_root_percent=40.0,
+        disk_root_free=60 * GB,
+        disk_root_total=100 * GB,
+        disk_hdd_percent=hdd_used / (500 * GB) * 100,
+        disk_hdd_free=int(500 * GB - hdd_used),
+        disk_hdd_total=500 * GB,
+        uptime_seconds=100.0,
+    )
+
+
+def test_growth_fit_recovers_slope_and_resets_on_cleanup():
+    fit = GrowthFit()
+    for step in range(73):
+        fit.update(START + step * 300, 100 * GB + step * 300 * (GB / 3600), 500 * GB)
+    slope, used = fit.line()
+    assert slope == pytest.approx(GB / 3600, rel=1e-6)
+    assert used == pytest.approx(100 * GB + 72 * 300 * (GB / 3600), rel=1e-9)
+
+    fit.update(START + 73 * 300, 50 * GB, 500 * GB)  # backup rotation freed space
+    assert fit.line() is None
+    assert fit.span() == 0
+
+
+def test_predictive_alert_and_status_forecast():
+    monitor = HealthMonitor(Thresholds(disk_full_hours=72.0))
+    codes = []
+    for step in range(30):
+        # 10 GB/hour with 150 GB free: full in ~15 hours
+        metrics = _metrics(START + step * 300, 350 * GB + step * 300 * (10 * GB / 3600))
+        triggered, _ = monitor.evaluate(metrics, [])
+        codes.extend(alert.code for alert in triggered)
+    assert codes == ["disk_hdd_forecast"]
+    forecasts = {item.mount: item for item in monitor.forecast.forecasts()}
+    assert forecasts["root"].seconds_to_full is None
+    assert forecasts["hdd"].seconds_to_full == pytest.approx(150 * GB / (10 * GB) * 3600 - 29 * 300, rel=1e-3)
+
+
+def test_format_eta():
+    assert format_eta(1800) == "30 menit"
+    assert format_eta(5 * 3600) == "5 jam"
+    assert format_eta(10 * 86400) == "10 hari"
+    assert format_eta(400 * 86400) == "lebih dari setahun"
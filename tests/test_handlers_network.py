@@ -25,13 +25,14 @@ def context():
     }
     return context_mock
 
-@patch("app.handlers.network.run_cmd")
+@patch("app.handlers.network.cached_cmd")
 async def test_speed_command_success(run_cmd_mock, update, context):
     """Test the speed_command success flow."""
     # Mock the return value of speedtest-cli with JSON output
     run_cmd_mock.return_value = MagicMock(
         stdout='{"ping": 10.0, "download": 100000000, "upload": 50000000}',
-        returncode=0
+        returncode=0,
+        cached_age=None,
     )
 
     await speed_command(update, context)
@@ -47,7 +48,7 @@ async def test_speed_command_success(run_cmd_mock, update, context):
     assert "100.00 Mbps" in final_call_args
     assert "50.00 Mbps" in final_call_args
 
-@patch("app.handlers.network.run_cmd")
+@patch("app.handlers.network.cached_cmd")
 async def test_speed_command_failure(run_cmd_mock, update, context):
     """Test the speed_command failure flow."""
     # Mock a failure
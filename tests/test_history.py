@@ -0,0 +1,68 @@
+import datetime as dt
+
+import pytest
+from app.services.history import MetricsHistory, parse_range, sparkline
+from app.services.metrics import SystemMetrics, Temperature
+
+BASE = dt.datetime(2024, 1, 1, tzinfo=dt.timezone.utc)
+
+
+def _metrics(offset: float, cpu: float) -> SystemMetrics:
+    return SystemMetrics(
+        timestamp=BASE + dt.timedelta(seconds=offset),
+        cpu_percent=cpu,
+        load_avg=(0.5, 0.4, 0.3),
+        mem_total=8 * 1024**3,
+        mem_available=4 * 1024**3,
+        mem_percent=50.0,
+        swap_percent=0.0,
+        disk_root_percent=40.0,
+        disk_root_free=100,
+        disk_root_total=200,
+        disk_hdd_percent=None,
+        disk_hdd_free=None,
+        disk_hdd_total=None,
+        uptime_seconds=offset,
+        temperatures=[Temperature(label="coretemp", current=50.0)],
+    )
+
+
+def test_minute_rollups_track_min_avg_max():
+    history = MetricsHistory(raw_hours=1, interval=5)
+    for second in range(0, 180, 5):
+        history.record(_metrics(second, cpu=float(second // 60 * 10)))
+    result = history.query("cpu", 600, now=BASE.timestamp() + 180)
+    assert result.resolution == "1m"
+    assert [point[2] for point in result.points] == [0.0, 10.0, 20.0]
+    assert result.summary() == (0.0, 10.0, 20.0)
+
+
+def test_long_ranges_use_coarser_levels():
+    history = MetricsHistory(raw_hours=1, interval=5)
+    for hour in range(48):
+        history.record(_metrics(hour * 3600, cpu=float(hour)))
+    result = history.query("cpu", 2 * 86400, now=BASE.timestamp() + 48 * 3600)
+    assert result.resolution == "1h"
+    assert len(result.points) == 48
+
+
+def test_buffers_stay_bounded():
+    history = MetricsHistory(raw_hours=0.01, interval=5)
+    for second in range(0, 3 * 86400, 60):
+        history.record(_metrics(second, cpu=1.0))
+    assert history.raw.size == history.raw.capacity == 7
+    assert history.levels[0].ring.size == history.levels[0].ring.capacity
+
+
+def test_missing_fields_are_skipped():
+    history = MetricsHistory(raw_hours=1, interval=5)
+    history.record(_metrics(0, cpu=1.0))
+    assert history.query("hdd", 600, now=BASE.timestamp() + 10).summary() is None
+
+
+def test_parse_range_and_sparkline():
+    assert parse_range("30m") == 1800
+    assert parse_range("2w") == 1209600
+    with pytest.raises(ValueError):
+        parse_range("10x")
+    assert sparkline([0, 1]) == "▁█"
@@ -0,0 +1,38 @@
+from app.services.hwmon import SensorRegistry
+
+
+def _chip(root, index, name, value):
+    chip = root / f"hwmon{index}"
+    chip.mkdir(parents=True)
+    (chip / "name").write_text(f"{name}\n")
+    (chip / "temp1_input").write_text(f"{value}\n")
+    return chip
+
+
+def test_readings_reuse_temperature_objects(tmp_path):
+    chip = _chip(tmp_path, 0, "coretemp", 40000)
+    registry = SensorRegistry(tmp_path)
+    first = registry.read()
+    (chip / "temp1_input").write_text("52000\n")
+    second = registry.read()
+    assert second[0] is first[0]
+    assert second[0].label == "coretemp"
+    assert second[0].current == 52.0
+    registry.close()
+
+
+def test_hotplugged_chip_is_discovered(tmp_path):
+    _chip(tmp_path, 0, "coretemp", 40000)
+    registry = SensorRegistry(tmp_path, hotplug_interval=0)
+    assert len(registry.read()) == 1
+    _chip(tmp_path, 1, "nvme", 35000)
+    labels = sorted(temp.label for temp in registry.read())
+    assert labels == ["coretemp", "nvme"]
+    registry.close()
+
+
+def test_missing_tree_falls_back_to_psutil(tmp_path, mocker):
+    fallback = mocker.patch("app.services.hwmon.read_temperatures", return_value=[])
+    registry = SensorRegistry(tmp_path / "absent")
+    assert registry.read() == []
+    fallback.assert_called_once()
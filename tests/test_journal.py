@@ -0,0 +1,91 @@
+import json
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from app.handlers.logs import _read_tail, log_journal
+from app.services.journal import JournalQuery, journal_command, parse_entries, parse_priority, read_journal
+from app.utils.shell import CommandResult
+
+
+def _line(n: int, message: object = None, priority: str = "6") -> str:
+    return json.dumps(
+        {
+            "__CURSOR": f"s=abc;i={n}",
+            "__REALTIME_TIMESTAMP": str(1_700_000_000_000_000 + n * 1_000_000),
+            "PRIORITY": priority,
+            "MESSAGE": message if message is not None else f"baris {n}",
+        }
+    )
+
+
+def test_filters_are_passed_to_journalctl():
+    query = JournalQuery("nginx", priority=parse_priority("err"), since=1_700_000_000.5)
+    command = journal_command(query, limit=16, after_cursor="s=abc;i=9", older=True)
+    assert command[:3] == ("journalctl", "-u", "nginx")
+    assert "--priority=3" in command
+    assert "--since=@1700000000" in command
+    assert "--after-cursor=s=abc;i=9" in command
+    assert "--reverse" in command
+    with pytest.raises(ValueError):
+        parse_priority("loud")
+
+
+def test_parse_entries_handles_binary_messages_and_garbage():
+    stdout = "\n".join([_line(1, [104, 105, 255]), "not json", _line(2, priority="3")])
+    entries = parse_entries(stdout)
+    assert [entry.cursor for entry in entries] == ["s=abc;i=1", "s=abc;i=2"]
+    assert entries[0].message == "hi�"
+    assert entries[1].priority == 3
+    assert entries[1].timestamp == 1_700_000_002.0
+
+
+async def test_read_journal_older_page_is_oldest_first(mocker):
+    stdout = "\n".join(_line(n) for n in (5, 4, 3))  # --reverse output
+    mocker.patch(
+        "app.services.journal.run_cmd",
+        AsyncMock(return_value=CommandResult(("journalctl",), stdout, "", 0)),
+    )
+    page = await read_journal(JournalQuery("nginx"), older=True, limit=2)
+    assert [entry.message for entry in page.entries] == ["baris 4", "baris 5"]
+    assert page.more
+
+
+async def test_log_journal_resumes_after_last_seen_cursor(mocker):
+    run = mocker.patch(
+        "app.services.journal.run_cmd",
+        AsyncMock(return_value=CommandResult(("journalctl",), _line(2) + "\n" + _line(1), "", 0)),
+    )
+    pending = MagicMock(edit_text=AsyncMock())
+    update = MagicMock()
+    update.effective_chat.id = 42
+    update.message.reply_text = AsyncMock(return_value=pending)
+    context = MagicMock(args=["nginx"], bot_data={})
+
+    await log_journal(update, context)
+    assert "--after-cursor" not in " ".join(run.await_args.args[0])
+    assert context.bot_data["journal_cursors"][(42, "nginx")][0] == "s=abc;i=2"
+    assert "baris 1\n" in pending.edit_text.await_args.args[0]
+
+    run.return_value = CommandResult(("journalctl",), "", "", 0)
+    await log_journal(update, context)
+    assert "--after-cursor=s=abc;i=2" in run.await_args.args[0]
+    assert "Belum ada baris baru" in pending.edit_text.await_args.args[0]
+
+
+def test_read_tail_matches_readlines_across_block_edges(tmp_path):
+    path = tmp_path / "runtime.log"
+    cases = [
+        "",
+        "one line no newline",
+        "a\nb\nc\n",
+        "a\nb\nc",
+        "\n\n\n",
+        "".join(f"line {index} ünïcode {'x' * (index % 13)}\n" for index in range(300)),
+    ]
+    for content in cases:
+        path.write_text(content, encoding="utf-8")
+        for lines in (1, 2, 80, 500):
+            expected = "".join(content.splitlines(keepends=True)[-lines:])
+            for block_size in (1, 7, 64, 8192):
+                assert _read_tail(path, lines, block_size) == expected, (content[:20], lines, block_size)
+    assert _read_tail(tmp_path / "missing.log", 5) == "File belum ada."
@@ -0,0 +1,78 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+from app.services.journaltop import HOUR, JournalTop, SpaceSaving, signature
+
+
+def _entry(unit: str, message: str, ts: float, cursor: str = "c") -> bytes:
+    return json.dumps(
+        {
+            "_SYSTEMD_UNIT": unit,
+            "MESSAGE": message,
+            "__REALTIME_TIMESTAMP": str(int(ts * 1_000_000)),
+            "__CURSOR": cursor,
+        }
+    ).encode()
+
+
+def test_signature_strips_variable_parts():
+    a = signature("upstream timed out (110) while reading from 10.0.0.5:8080, req 3f2a9c1e77b0, file /var/www/a.php")
+    b = signature("upstream timed out (111) while reading from 10.0.0.9:80, req 0000beefcafe, file /srv/x/b.php")
+    assert a == b
+    assert a == "upstream timed out (<n>) while reading from <ip>, req <hex>, file <path>"
+    assert signature("job 6fa459ea-ee8a-3ca4-894e-db77e160355e  done") == "job <id> done"
+
+
+def test_space_saving_is_bounded_and_keeps_heavy_hitters():
+    counter = SpaceSaving(k=3)
+    for key in ["a"] * 50 + ["b"] * 30 + list("cdefgh"):
+        counter.add(key)
+    assert len(counter.counts) == 3
+    assert counter.total == 86
+    assert counter.counts["a"] == 50 and counter.counts["b"] == 30
+
+
+def test_top_merges_hours_and_drops_old_buckets():
+    settings = SimpleNamespace(services_whitelist=["nginx", "rag.service"])
+    tracker = JournalTop(settings, hours=2)
+    tracker._set_units()
+    now = 100 * HOUR + 10
+    tracker.handle_line(_entry("nginx.service", "worker 12 crashed", now - HOUR))
+    tracker.handle_line(_entry("nginx.service", "worker 13 crashed", now))
+    tracker.handle_line(_entry("rag.service", "oom", now))
+    tracker.handle_line(_entry("sshd.service", "ignored", now))
+    tracker.handle_line(b"garbage")
+
+    assert [(item.service, item.total) for item in tracker.top(hours=1, now=now)] == [
+        ("nginx", 1),
+        ("rag.service", 1),
+    ]
+    noisy = tracker.top(hours=2, now=now)
+    assert noisy[0].service == "nginx"
+    assert noisy[0].top == [("worker <n> crashed", 2)]
+
+    tracker.observe("rag.service", "later", now + 2 * HOUR)
+    assert all(hour > 99 for _service, hour in tracker._buckets)
+
+
+async def test_stream_resumes_after_last_cursor():
+    settings = SimpleNamespace(services_whitelist=["nginx"])
+    calls = []
+    lines = [_entry("nginx.service", "boom 1", 1_000_000, cursor="s=1")]
+
+    async def factory(units, after_cursor):
+        calls.append((units, after_cursor))
+
+        async def _lines():
+            while lines:
+                yield lines.pop()
+
+        return _lines()
+
+    tracker = JournalTop(settings, stream_factory=factory, retry_delay=0.01)
+    tracker.start()
+    await asyncio.sleep(0.05)
+    await tracker.stop()
+    assert calls[0] == (("nginx",), None)
+    assert calls[1] == (("nginx",), "s=1")
@@ -0,0 +1,28 @@
+import asyncio
+import time
+from unittest.mock import AsyncMock, MagicMock
+
+from telegram.error import BadRequest
+
+from app.handlers.live import LiveOutput
+
+
+async def test_edits_are_coalesced_and_window_is_bounded():
+    message = MagicMock(edit_text=AsyncMock())
+    start = time.monotonic()
+    async with LiveOutput(message, "apt", lines=3, interval=0.05, heartbeat=10) as live:
+        for index in range(200):
+            live.push(f"line {index}")
+            await asyncio.sleep(0.001)
+        await asyncio.sleep(0.12)
+    assert list(live.window) == ["line 197", "line 198", "line 199"]
+    assert 1 <= message.edit_text.await_count <= (time.monotonic() - start) / 0.05 + 1
+    assert "line 199" in message.edit_text.call_args[0][0]
+
+
+async def test_quiet_command_gets_heartbeat_and_edit_errors_are_ignored():
+    message = MagicMock(edit_text=AsyncMock(side_effect=[BadRequest("Message is not modified"), None, None, None]))
+    async with LiveOutput(message, "speedtest-cli", interval=0.02, heartbeat=0.03):
+        await asyncio.sleep(0.15)
+    assert message.edit_text.await_count >= 2
+    assert "speedtest-cli" in message.edit_text.call_args[0][0]
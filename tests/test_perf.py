@@ -0,0 +1,38 @@
+import asyncio
+
+from app.utils.perf import Histogram, PerfRegistry, instrument, timed
+
+
+def test_histogram_quantiles_use_bucket_bounds_capped_at_max():
+    histogram = Histogram()
+    for ms in [3] * 90 + [40] * 9 + [1500]:
+        histogram.observe(ms)
+    assert histogram.count == 100
+    assert histogram.quantile(0.5) == 5
+    assert histogram.quantile(0.95) == 50
+    assert histogram.quantile(0.99) == 50
+    assert histogram.quantile(1.0) == 1500  # open-ended tail reports the real max
+    assert Histogram().quantile(0.5) == 0.0
+
+
+async def test_timed_and_instrument_record_and_reset():
+    registry = PerfRegistry()
+
+    async def slow_handler(update, context):
+        await asyncio.sleep(0.02)
+        return "done"
+
+    wrapped = instrument("handler:slow", slow_handler, registry)
+    assert await wrapped(None, None) == "done"
+    try:
+        with timed("cmd:false", registry):
+            raise RuntimeError("boom")
+    except RuntimeError:
+        pass
+
+    slowest, fastest = registry.summaries()
+    assert slowest.name == "handler:slow" and slowest.count == 1
+    assert 20 <= slowest.max_ms and slowest.p50_ms == slowest.max_ms
+    assert fastest.name == "cmd:false"
+    registry.reset()
+    assert registry.summaries() == []
@@ -0,0 +1,60 @@
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from app.services.hwmon import SensorRegistry
+from app.services.procfs import ProcCollector
+
+
+@pytest.fixture
+def fake_roots(tmp_path):
+    proc = tmp_path / "proc"
+    proc.mkdir()
+    (proc / "stat").write_text(
+        "cpu  100 0 50 800 50 0 0 0 0 0\ncpu0 100 0 50 800 50 0 0 0 0 0\nbtime 1\n"
+    )
+    (proc / "meminfo").write_text(
+        "MemTotal:        8000000 kB\n"
+        "MemFree:         1000000 kB\n"
+        "MemAvailable:    2000000 kB\n"
+        "SwapTotal:       1000000 kB\n"
+        "SwapFree:         750000 kB\n"
+    )
+    (proc / "loadavg").write_text("0.50 0.25 0.10 1/100 1234\n")
+    chip = tmp_path / "hwmon" / "hwmon0"
+    chip.mkdir(parents=True)
+    (chip / "name").write_text("coretemp\n")
+    (chip / "temp1_input").write_text("45000\n")
+    (chip / "temp1_label").write_text("Package id 0\n")
+    return proc, tmp_path / "hwmon"
+
+
+def test_collect_reads_pinned_files(fake_roots):
+    proc, hwmon = fake_roots
+    settings = SimpleNamespace(hdd_mount=Path("/nonexistent-mount"))
+    collector = ProcCollector(settings, proc_root=proc, sensors=SensorRegistry(hwmon))
+
+    assert collector.cpu_times() == (1000.0, 850.0)
+    metrics = collector.collect(12.5)
+    assert metrics.cpu_percent == 12.5
+    assert metrics.mem_total == 8000000 * 1024
+    assert metrics.mem_available == 2000000 * 1024
+    assert metrics.mem_percent == 75.0
+    assert metrics.swap_percent == 25.0
+    assert metrics.load_avg == (0.5, 0.25, 0.1)
+    assert metrics.disk_hdd_total is None
+    assert [(t.label, t.current) for t in metrics.temperatures] == [("coretemp Package id 0", 45.0)]
+
+    # descriptors are re-read, so new content shows up without reopening
+    (proc / "loadavg").write_text("1.00 0.75 0.50 1/100 1234\n")
+    assert collector.collect(0.0).load_avg == (1.0, 0.75, 0.5)
+    collector.close()
+
+
+def test_missing_files_fall_back_to_psutil(tmp_path, mocker):
+    psutil_mock = mocker.patch("app.services.procfs.psutil")
+    psutil_mock.getloadavg.return_value = (9.0, 9.0, 9.0)
+    mocker.patch("app.services.procfs.read_temperatures", return_value=[])
+    collector = ProcCollector(SimpleNamespace(hdd_mount=Path("/x")), proc_root=tmp_path)
+    assert collector._load() == (9.0, 9.0, 9.0)
+    collector.close()
@@ -0,0 +1,69 @@
+from collections import namedtuple
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+from app.services.rates import IORates
+
+CpuTimes = namedtuple("CpuTimes", "user idle")
+
+
+def _disk(rb, wb, rc, wc, rt, wt):
+    return SimpleNamespace(
+        read_bytes=rb, write_bytes=wb, read_count=rc, write_count=wc, read_time=rt, write_time=wt
+    )
+
+
+def _nic(rx, tx, errs=0):
+    return SimpleNamespace(bytes_recv=rx, bytes_sent=tx, errin=errs, errout=0, dropin=0, dropout=0)
+
+
+@pytest.fixture
+def counters(mocker):
+    psutil_mock = mocker.patch("app.services.rates.psutil")
+    mocker.patch("app.services.rates._whole_disks", side_effect=lambda names: tuple(sorted(names)))
+    clock = mocker.patch("app.services.rates.time")
+    clock.monotonic.side_effect = [100.0, 110.0, 120.0]
+    psutil_mock.cpu_times.side_effect = [
+        [CpuTimes(10.0, 90.0), CpuTimes(50.0, 50.0)],
+        [CpuTimes(15.0, 95.0), CpuTimes(60.0, 50.0)],
+        [CpuTimes(15.0, 95.0), CpuTimes(60.0, 50.0)],
+    ]
+    psutil_mock.disk_io_counters.side_effect = [
+        {"sda": _disk(0, 0, 0, 0, 0, 0)},
+        {"sda": _disk(10240, 20480, 10, 10, 40, 60)},
+        {"sda": _disk(10240, 20480, 10, 10, 40, 60), "sdb": _disk(0, 0, 0, 0, 0, 0)},
+    ]
+    psutil_mock.net_io_counters.side_effect = [
+        {"lo": _nic(0, 0), "eth0": _nic(0, 0)},
+        {"lo": _nic(999, 999), "eth0": _nic(5000, 1000, errs=20)},
+        {"lo": _nic(999, 999), "eth0": _nic(5000, 1000, errs=20)},
+    ]
+    return psutil_mock
+
+
+def test_rates_from_counter_deltas(counters):
+    rates = IORates()
+    first = MagicMock()
+    rates.fill(first)
+    assert first.disk_io[0].read_bps == 0.0
+
+    second = MagicMock()
+    rates.fill(second)
+    assert second.cpu_per_core == [50.0, 100.0]
+    disk = second.disk_io[0]
+    assert (disk.read_bps, disk.write_bps) == (1024.0, 2048.0)
+    assert (disk.read_iops, disk.write_iops) == (1.0, 1.0)
+    assert disk.await_ms == 5.0
+    assert [nic.name for nic in second.net_io] == ["eth0"]
+    assert second.net_io[0].rx_bps == 500.0
+    assert second.net_io[0].errors_per_s == 2.0
+
+    third = MagicMock()
+    rates.fill(third)
+    assert [item.name for item in third.disk_io] == ["sda", "sdb"]
+    assert third.disk_io[0].read_bps == 0.0
+    # earlier snapshots are never rewritten by later ticks
+    assert third.disk_io[0] is not disk
+    assert (disk.read_bps, disk.await_ms) == (1024.0, 5.0)
+    assert second.net_io[0].rx_bps == 500.0
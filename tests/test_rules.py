@@ -0,0 +1,104 @@
+import datetime as dt
+import random
+
+import pytest
+from app.config import Thresholds
+from app.services.metrics import DiskIO, HealthMonitor, SystemMetrics
+from app.services.rules import RollingWindow, RuleEngine, build_rules, parse_rule_spec
+
+BASE = dt.datetime(2024, 1, 1, tzinfo=dt.timezone.utc)
+
+
+def _metrics(offset: float, *, cpu: float = 10.0, hdd: float | None = None, disks=()) -> SystemMetrics:
+    return SystemMetrics(
+        timestamp=BASE + dt.timedelta(seconds=offset),
+        cpu_percent=cpu,
+        load_avg=(0.0, 0.0, 0.0),
+        mem_total=8 << 30,
+        mem_available=4 << 30,
+        mem_percent=50.0,
+        swap_percent=0.0,
+        disk_root_percent=40.0,
+        disk_root_free=1,
+        disk_root_total=2,
+        disk_hdd_percent=hdd,
+        disk_hdd_free=None,
+        disk_hdd_total=None,
+        uptime_seconds=100.0,
+        disk_io=list(disks),
+    )
+
+
+def test_rolling_window_matches_brute_force():
+    rng = random.Random(7)
+    window = RollingWindow(60, upper=100.0)
+    samples = []
+    for step in range(500):
+        value = rng.uniform(0, 100)
+        window.push(step * 5.0, value)
+        samples.append((step * 5.0, value))
+        live = [v for ts, v in samples if ts > step * 5.0 - 60]
+        assert window.aggregate("max") == max(live)
+        assert window.aggregate("min") == min(live)
+        assert window.aggregate("avg") == pytest.approx(sum(live) / len(live))
+        ordered = sorted(live)
+        assert window.aggregate("p95") == pytest.approx(ordered[int(len(ordered) * 0.95)], abs=1.0)
+
+
+def test_parse_rule_spec():
+    assert parse_rule_spec("avg:5m") == ("avg", 300.0)
+    assert parse_rule_spec("last") == ("last", 0.0)
+    with pytest.raises(ValueError):
+        parse_rule_spec("p95")
+    rules = {rule.code: rule for rule in build_rules({"cpu_high": "max:30s", "ram_low": "bogus"})}
+    assert (rules["cpu_high"].aggregate, rules["cpu_high"].window) == ("max", 30.0)
+    assert rules["ram_low"].aggregate == "avg"
+
+
+def test_cpu_alert_uses_window_average():
+    monitor = HealthMonitor(Thresholds())
+    # one spike does not trip the 5 minute average
+    triggered, _ = monitor.evaluate(_metrics(0, cpu=100.0), [])
+    assert not triggered
+    for offset in range(5, 300, 5):
+        triggered, _ = monitor.evaluate(_metrics(offset, cpu=40.0), [])
+        assert not triggered
+    for offset in range(300, 600, 5):
+        monitor.observe(_metrics(offset, cpu=99.0))
+    monitor.evaluate(_metrics(600, cpu=99.0), [])  # breach starts
+    triggered, _ = monitor.evaluate(_metrics(605, cpu=99.0), [])
+    assert [alert.code for alert in triggered] == ["cpu_high"]
+    assert "avg 5m" in triggered[0].message
+    for offset in range(610, 910, 5):
+        monitor.observe(_metrics(offset, cpu=5.0))
+    _, recovered = monitor.evaluate(_metrics(910, cpu=5.0), [])
+    assert recovered == ["cpu_high"]
+
+
+def test_missing_hdd_and_vanished_disk():
+    monitor = HealthMonitor(Thresholds(disk_await_ms=100.0))
+    slow = [DiskIO(name="sda", await_ms=500.0)]
+    for offset in range(0, 185, 5):
+        triggered, _ = monitor.evaluate(_metrics(offset, disks=slow), [])
+        if triggered:
+            break
+    assert [alert.code for alert in triggered] == ["io_await_sda"]
+    _, recovered = monitor.evaluate(_metrics(600), [])
+    assert recovered == ["io_await_sda"]
+
+
+def test_p95_follows_threshold_raised_after_window_exists():
+    window = RollingWindow(60, upper=10.0)
+    for step in range(20):
+        window.push(step, 50.0)
+    assert window.aggregate("p95") == 50.0  # overflow bin returns the exact max
+
+    thresholds = Thresholds(disk_await_ms=200.0)
+    engine = RuleEngine(thresholds, [rule for rule in build_rules() if rule.code == "io_await"])
+    engine.observe(_metrics(0, disks=[DiskIO(name="sda", await_ms=10.0)]))
+    thresholds.disk_await_ms = 600.0
+    for offset in range(5, 185, 5):
+        engine.observe(_metrics(offset, disks=[DiskIO(name="sda", await_ms=5000.0)]))
+    [(breached, code, message, _delay)] = list(engine.evaluate(BASE.timestamp() + 185))
+    assert (breached, code) == (True, "io_await_sda")
+    assert "5000 ms" in message
@@ -0,0 +1,48 @@
+import asyncio
+import datetime as dt
+from unittest.mock import MagicMock
+
+import pytest
+from app.services.sampler import MetricsSampler
+
+
+@pytest.fixture
+def collect(mocker):
+    def _fake(settings, *, cpu_percent=None, temperatures=None):
+        return MagicMock(
+            timestamp=dt.datetime.now(dt.timezone.utc),
+            cpu_percent=cpu_percent,
+            age_seconds=MagicMock(return_value=0.0),
+        )
+
+    return mocker.patch("app.services.sampler.collect_metrics", side_effect=_fake)
+
+
+async def test_concurrent_requests_share_one_sample(collect):
+    sampler = MetricsSampler(MagicMock(), interval=60, fast_path=False)
+    results = await asyncio.gather(*(sampler.sample_now() for _ in range(5)))
+    assert collect.call_count == 1
+    assert all(item is results[0] for item in results)
+    assert sampler.latest() is results[0]
+    await sampler.stop()
+
+
+async def test_get_refreshes_stale_snapshot(collect):
+    sampler = MetricsSampler(MagicMock(), interval=60, fast_path=False)
+    first = await sampler.get()
+    first.age_seconds.return_value = 120.0
+    assert await sampler.get() is first
+    second = await sampler.get(max_age=30)
+    assert second is not first
+    assert collect.call_count == 2
+    await sampler.stop()
+
+
+async def test_listeners_receive_each_sample(collect):
+    sampler = MetricsSampler(MagicMock(), interval=60, fast_path=False)
+    seen = []
+    sampler.add_listener(seen.append)
+    await sampler.sample_now()
+    await sampler.sample_now()
+    assert len(seen) == 2
+    await sampler.stop()
@@ -0,0 +1,69 @@
+import asyncio
+
+import pytest
+
+from app.config import _parse_job_limits
+from app.services.scheduler import (
+    HEAVY_IO,
+    PRIORITY_HIGH,
+    PRIORITY_LOW,
+    CommandScheduler,
+    JobCancelled,
+)
+
+
+def test_job_limits_parse_and_merge_over_defaults():
+    limits = _parse_job_limits("heavy-io=2, cheap-read=0,bogus")
+    assert limits == {"heavy-io": 2, "cheap-read": 1}
+    assert CommandScheduler(limits).limits["network-heavy"] == 1
+
+
+async def test_cap_priority_order_and_queue_position():
+    scheduler = CommandScheduler({HEAVY_IO: 1})
+    gate = asyncio.Event()
+    order, positions = [], []
+
+    async def work(name):
+        order.append(name)
+        if name == "first":
+            await gate.wait()
+        return name
+
+    async def on_queued(job, position):
+        positions.append((job.label, position))
+
+    first = asyncio.create_task(scheduler.run(HEAVY_IO, "first", lambda: work("first")))
+    await asyncio.sleep(0)
+    low = asyncio.create_task(
+        scheduler.run(HEAVY_IO, "low", lambda: work("low"), priority=PRIORITY_LOW, on_queued=on_queued)
+    )
+    await asyncio.sleep(0)
+    high = asyncio.create_task(
+        scheduler.run(HEAVY_IO, "high", lambda: work("high"), priority=PRIORITY_HIGH, on_queued=on_queued)
+    )
+    await asyncio.sleep(0)
+
+    assert positions == [("low", 1), ("high", 1)]
+    assert [job.label for job in scheduler.jobs()] == ["first", "high", "low"]
+    gate.set()
+    assert await asyncio.gather(first, low, high) == ["first", "low", "high"]
+    assert order == ["first", "high", "low"]
+    assert scheduler.jobs() == [] and scheduler.active(HEAVY_IO) == 0
+
+
+async def test_cancel_queued_and_running_jobs():
+    scheduler = CommandScheduler({HEAVY_IO: 1})
+    running = asyncio.create_task(scheduler.run(HEAVY_IO, "slow", lambda: asyncio.sleep(30)))
+    await asyncio.sleep(0)
+    queued = asyncio.create_task(scheduler.run(HEAVY_IO, "waiting", lambda: asyncio.sleep(0)))
+    await asyncio.sleep(0)
+    slow_job, waiting_job = scheduler.jobs()
+
+    assert scheduler.cancel(waiting_job.id) is waiting_job
+    with pytest.raises(JobCancelled):
+        await queued
+    assert scheduler.cancel(slow_job.id) is slow_job
+    with pytest.raises(JobCancelled):
+        await running
+    assert scheduler.cancel(slow_job.id) is None
+    assert await scheduler.run(HEAVY_IO, "next", lambda: asyncio.sleep(0, result="ok")) == "ok"
@@ -0,0 +1,159 @@
+import asyncio
+import os
+import subprocess
+import time
+
+import pytest
+from app.utils.shell import OutputBuffer, ShellCommandError, run_cmd, stream_cmd
+
+
+def _gone(pid: int) -> bool:
+    try:
+        with open(f"/proc/{pid}/stat") as handle:
+            return handle.read().split(") ", 1)[1][0] == "Z"
+    except FileNotFoundError:
+        return True
+
+
+async def test_run_cmd_result_and_errors():
+    result = await run_cmd("sh -c 'echo out; echo err >&2'")
+    assert (result.stdout, result.stderr, result.returncode) == ("out", "err", 0)
+    with pytest.raises(ShellCommandError) as excinfo:
+        await run_cmd(("sh", "-c", "echo nope >&2; exit 3"))
+    assert excinfo.value.returncode == 3 and excinfo.value.stderr == "nope"
+    assert (await run_cmd(("false",), check=False)).returncode == 1
+
+
+async def test_commands_do_not_queue_on_a_thread_pool():
+    start = time.monotonic()
+    await asyncio.gather(*(run_cmd(("sleep", "0.5")) for _ in range(64)))
+    assert time.monotonic() - start < 1.5  # a 32-thread pool needs at least 1.0 s
+
+
+async def test_timeout_kills_grandchildren():
+    with pytest.raises(subprocess.TimeoutExpired) as excinfo:
+        await run_cmd(("sh", "-c", "sleep 30 & echo $!; wait"), timeout=0.5)
+    grandchild = int(excinfo.value.output)
+    for _ in range(50):
+        if _gone(grandchild):
+            break
+        await asyncio.sleep(0.02)
+    assert _gone(grandchild)
+
+
+async def test_stream_cmd_yields_lines_then_checks_exit():
+    lines = []
+    with pytest.raises(ShellCommandError) as excinfo:
+        async for line in stream_cmd(("sh", "-c", "echo a; echo b >&2; exit 2")):
+            lines.append(line)
+    assert lines == ["a", "b"]
+    assert excinfo.value.stderr == "a\nb"
+
+
+async def test_stream_cmd_handles_long_and_carriage_return_lines():
+    script = "head -c 200000 /dev/zero | tr '\\0' x; echo; printf '10%%\\r50%%\\r100%%\\n'"
+    lines = [line async for line in stream_cmd(("sh", "-c", script))]
+    assert "".join(lines[:-3]) == "x" * 200000
+    assert lines[-3:] == ["10%", "50%", "100%"]
+
+
+async def test_stream_cmd_break_kills_process():
+    stream = stream_cmd(("sh", "-c", "echo $$; sleep 30"))
+    pid = int(await stream.__anext__())
+    await stream.aclose()
+    assert _gone(pid) or not os.path.exists(f"/proc/{pid}")
+
+
+def test_output_buffer_keeps_head_and_tail_in_fixed_memory():
+    buffer = OutputBuffer(limit=8)
+    for chunk in (b"abc", b"defgh", b"ijk", b"lmnopqrstuvwxyz", b"12"):
+        buffer.feed(chunk)
+    assert len(buffer.ring) == 4
+    assert buffer.dropped == 26 + 2 - 8
+    assert buffer.text() == "abcd\n… 20 byte dipotong …\nyz12"
+    small = OutputBuffer(limit=8)
+    small.feed(b"hello")
+    assert (small.text(), small.dropped) == ("hello", 0)
+
+
+async def test_run_cmd_budget_spills_full_output(tmp_path):
+    command = ("sh", "-c", "seq 1 100000")
+    result = await run_cmd(command, max_output=100, spill_dir=tmp_path)
+    assert result.stdout.startswith("1\n2\n3\n")
+    assert result.stdout.endswith("99999\n100000")
+    assert result.dropped_bytes == len(result.spill_path.read_bytes()) - 100
+    assert result.spill_path.read_text().splitlines()[-1] == "100000"
+
+    quiet = await run_cmd(("echo", "hi"), max_output=100, spill_dir=tmp_path)
+    assert quiet.spill_path is None and quiet.dropped_bytes == 0
+    assert list(tmp_path.iterdir()) == [result.spill_path]
+
+
+async def test_run_cmd_passes_lines_while_capturing():
+    lines = []
+    result = await run_cmd(("sh", "-c", "printf 'a\\nb\\rc\\n'; echo err >&2; printf tail"), on_line=lines.append)
+    assert sorted(lines) == ["a", "b", "c", "err", "tail"]
+    assert result.stdout == "a\nb\rc\ntail"
+
+
+async def test_cached_cmd_single_flight_ttl_and_lru(mocker):
+    from app.utils import shell
+
+    clock = [100.0]
+    cache = shell.CommandCache(max_entries=2, clock=lambda: clock[0])
+    mocker.patch.object(shell, "_COMMAND_CACHE", cache)
+    calls = []
+
+    async def fake_run(args, **kwargs):
+        calls.append(args)
+        await asyncio.sleep(0.01)
+        return shell.CommandResult(args, f"out {len(calls)}", "", 0)
+
+    mocker.patch.object(shell, "run_cmd", side_effect=fake_run)
+    first, second = await asyncio.gather(
+        shell.cached_cmd("docker ps", ttl=5), shell.cached_cmd(("docker", "ps"), ttl=5)
+    )
+    assert len(calls) == 1 and first.stdout == second.stdout == "out 1"
+    assert first.cached_age is None
+
+    clock[0] += 3
+    hit = await shell.cached_cmd("docker ps", ttl=5)
+    assert (hit.stdout, hit.cached_age, hit.cache_note()) == ("out 1", 3.0, "(cache 3 dtk lalu)")
+    assert (await shell.cached_cmd("docker ps", ttl=5, fresh=True)).stdout == "out 2"
+
+    await shell.cached_cmd("tailscale status", ttl=5)
+    await shell.cached_cmd("ip addr", ttl=5)
+    assert len(cache) == 2
+    assert (await shell.cached_cmd("docker ps", ttl=5)).stdout == "out 5"  # evicted as least recent
+
+    clock[0] += 10
+    assert (await shell.cached_cmd("ip addr", ttl=5)).cached_age is None
+    shell.invalidate_cached(("docker",))
+    assert (await shell.cached_cmd("docker ps", ttl=5)).stdout == "out 7"
+
+
+async def test_cached_cmd_cancels_run_when_last_caller_cancelled(mocker, tmp_path):
+    from app.utils import shell
+
+    mocker.patch.object(shell, "_COMMAND_CACHE", shell.CommandCache())
+    pidfile = tmp_path / "pid"
+    command = ("sh", "-c", f"echo $$ > {pidfile}; exec sleep 30")
+    first = asyncio.ensure_future(shell.cached_cmd(command, ttl=5))
+    second = asyncio.ensure_future(shell.cached_cmd(command, ttl=5))
+    for _ in range(100):
+        if pidfile.exists() and pidfile.read_text().strip():
+            break
+        await asyncio.sleep(0.02)
+    pid = int(pidfile.read_text())
+
+    first.cancel()
+    await asyncio.sleep(0.1)
+    assert not _gone(pid)  # the other caller still waits on the run
+
+    second.cancel()
+    for _ in range(50):
+        if _gone(pid):
+            break
+        await asyncio.sleep(0.02)
+    assert _gone(pid)
+    assert first.cancelled() and second.cancelled()
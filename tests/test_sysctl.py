@@ -0,0 +1,84 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+from app.services.sysctl import control_service, invalidate_status_cache, list_services
+from app.utils.shell import CommandResult
+
+SHOW_OUTPUT = """Id=nginx.service
+ActiveState=active
+SubState=running
+Description=A high performance web server
+ActiveEnterTimestamp=Mon 2024-01-01 10:00:00 UTC
+
+Id=rag-worker.service
+ActiveState=failed
+SubState=failed
+Description=RAG worker
+ActiveEnterTimestamp=
+
+Id=postgresql@16-main.service
+ActiveState=active
+SubState=running
+Description=PostgreSQL Cluster 16-main
+ActiveEnterTimestamp=Mon 2024-01-01 09:00:00 UTC
+"""
+
+
+@pytest.fixture
+def settings():
+    return SimpleNamespace(
+        services_whitelist=["nginx.service", "rag-worker", "postgres"], status_cache_ttl=0.0
+    )
+
+
+async def test_list_services_single_batched_call(mocker, settings):
+    run = mocker.patch(
+        "app.services.sysctl.run_cmd",
+        AsyncMock(return_value=CommandResult(("systemctl",), SHOW_OUTPUT, "", 0)),
+    )
+    statuses = await list_services(settings)
+    assert run.await_count == 1
+    command = run.await_args.args[0]
+    assert command[:4] == ("systemctl", "show", "nginx.service", "rag-worker")
+    assert [status.name for status in statuses] == ["nginx.service", "rag-worker", "postgres"]
+    assert [status.is_healthy() for status in statuses] == [True, False, True]
+    # "postgres" is an alias whose Id is the target unit; matched by position
+    assert statuses[2].description == "PostgreSQL Cluster 16-main"
+
+
+async def test_batch_failure_falls_back_per_unit(mocker, settings):
+    single = "Id=nginx.service\nActiveState=active\nSubState=running\nDescription=web\n"
+
+    async def fake_run(command, check=False):
+        units = command[2:-2]
+        if len(units) > 1 or units[0] == "postgres":
+            return CommandResult(command, "", "Invalid unit name", 1)
+        return CommandResult(command, single, "", 0)
+
+    mocker.patch("app.services.sysctl.run_cmd", side_effect=fake_run)
+    statuses = await list_services(settings)
+    assert [status.active_state for status in statuses] == ["active", "active", "unknown"]
+
+
+async def test_status_cache_single_flight_and_invalidation(mocker, settings):
+    invalidate_status_cache()
+    settings.status_cache_ttl = 60.0
+
+    async def slow_show(command, check=False):
+        await asyncio.sleep(0.01)
+        return CommandResult(command, SHOW_OUTPUT, "", 0)
+
+    run = mocker.patch("app.services.sysctl.run_cmd", side_effect=slow_show)
+    first, second = await asyncio.gather(list_services(settings), list_services(settings))
+    assert first == second
+    assert run.await_count == 1
+    await list_services(settings)
+    assert run.await_count == 1
+
+    await control_service(settings, "nginx.service", "restart")
+    assert run.await_count == 2  # the restart itself
+    await list_services(settings)
+    assert run.await_count == 3
+    invalidate_status_cache()
@@ -8,7 +8,7 @@ def update():
     """Fixture for a mock Telegram Update."""
     update_mock = MagicMock()
     update_mock.effective_user.id = 123
-    update_mock.message.reply_text = AsyncMock()
+    update_mock.message.reply_text = AsyncMock(return_value=MagicMock(edit_text=AsyncMock()))
     return update_mock
 
 @pytest.fixture
@@ -24,13 +24,13 @@ def context():
 async def test_run_command_authorized(run_cmd_mock, update, context):
     """Test that an authorized user can run a command."""
     context.bot_data["settings"].is_admin.return_value = True
-    run_cmd_mock.return_value = MagicMock(returncode=0, stdout="test output", stderr="")
+    run_cmd_mock.return_value = MagicMock(returncode=0, stdout="test output", stderr="", spill_path=None)
     context.args = ["ls", "-l"]
 
     await run_command(update, context)
 
     update.message.reply_text.assert_called_once()
-    call_args = update.message.reply_text.call_args[0][0]
+    call_args = update.message.reply_text.return_value.edit_text.call_args[0][0]
     assert "test output" in call_args
     assert "✅" in call_args
 
@@ -57,12 +57,12 @@ async def test_run_command_no_args(run_cmd_mock, update, context):
 @patch("app.handlers.system.run_cmd")
 async def test_run_command_failure(run_cmd_mock, update, context):
     """Test that a failing command returns an error."""
-    run_cmd_mock.return_value = MagicMock(returncode=1, stdout="", stderr="test error")
+    run_cmd_mock.return_value = MagicMock(returncode=1, stdout="", stderr="test error", spill_path=None)
     context.args = ["invalid-command"]
 
     await run_command(update, context)
 
     update.message.reply_text.assert_called_once()
-    call_args = update.message.reply_text.call_args[0][0]
+    call_args = update.message.reply_text.return_value.edit_text.call_args[0][0]
     assert "test error" in call_args
     assert "❌" in call_args
@@ -0,0 +1,66 @@
+import math
+import time
+
+from app.services.history import METRIC_NAMES, MetricsHistory
+from app.services.tsdb import MetricStore, seed_history
+
+
+def _row(value: float) -> tuple:
+    return tuple(value for _ in METRIC_NAMES)
+
+
+def test_append_and_range_query(tmp_path):
+    store = MetricStore(tmp_path / "metrics.tsdb", retention_days=0)
+    store.open()
+    for minute in range(3000):
+        assert store.append(1_000_000 + minute * 60, _row(float(minute)))
+    assert not store.append(1_000_000, _row(0.0))
+
+    stamps, values = store.column("cpu_percent", 1_000_000 + 60 * 10, 1_000_000 + 60 * 12)
+    assert list(stamps) == [1_000_600, 1_000_660, 1_000_720]
+    assert list(values) == [10.0, 11.0, 12.0]
+    store.close()
+
+
+def test_reopen_keeps_records(tmp_path):
+    path = tmp_path / "metrics.tsdb"
+    store = MetricStore(path, retention_days=0)
+    store.open()
+    store.append(100, _row(1.5))
+    store.close()
+
+    reopened = MetricStore(path, retention_days=0)
+    reopened.open()
+    assert len(reopened) == 1
+    assert list(reopened.records(0, 200)) == [(100, _row(1.5))]
+    reopened.close()
+
+
+def test_retention_drops_old_records(tmp_path):
+    path = tmp_path / "metrics.tsdb"
+    store = MetricStore(path, retention_days=0)
+    store.open()
+    now = int(time.time())
+    store.append(now - 10 * 86400, _row(1.0))
+    store.append(now - 60, _row(2.0))
+    store.close()
+
+    trimmed = MetricStore(path, retention_days=1)
+    trimmed.open()
+    assert len(trimmed) == 1
+    assert trimmed.timestamp_at(0) == now - 60
+    trimmed.close()
+
+
+def test_seed_history_replays_rollups(tmp_path):
+    store = MetricStore(tmp_path / "metrics.tsdb")
+    store.open()
+    now = int(time.time()) // 60 * 60
+    for minute in range(5):
+        store.append(now - 600 + minute * 60, _row(float(minute)))
+    history = MetricsHistory(raw_hours=1)
+    assert seed_history(history, store) == 5
+    result = history.query("cpu", 3600, now=now)
+    assert [point[2] for point in result.points] == [0.0, 1.0, 2.0, 3.0, 4.0]
+    assert math.isclose(result.summary()[1], 2.0)
+    store.close()
@@ -0,0 +1,119 @@
+import asyncio
+import datetime as dt
+import json
+from types import SimpleNamespace
+
+import pytest
+from app.config import Thresholds
+from app.services.metrics import HealthMonitor
+from app.services.sysctl import ServiceStatus
+from app.services.unitwatch import UnitWatcher
+
+STARTED = "39f53479d3a045ac8e11786248231fbf"
+STOPPING = "de5b426a63be47a7b6ac3eaac82e2f6f"
+FAILED = "d9b373ed55a64feb8242e02dbe79a49c"
+SUCCEEDED = "7ad2d189f7e94e70a38c781354912448"
+
+
+def _event(unit: str, message_id: str) -> bytes:
+    return json.dumps({"UNIT": unit, "MESSAGE_ID": message_id, "_PID": "1"}).encode() + b"\n"
+
+
+class FakeJournal:
+    """Async line stream fed by the test, standing in for ``journalctl -f``."""
+
+    def __init__(self):
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.units = None
+
+    async def __call__(self, units):
+        self.units = units
+        return self._lines()
+
+    async def _lines(self):
+        while True:
+            line = await self.queue.get()
+            if line is None:
+                return
+            yield line
+
+
+@pytest.fixture
+def healthy(mocker):
+    statuses = [
+        ServiceStatus("nginx", "active", "running", "web", ""),
+        ServiceStatus("rag-worker.service", "active", "running", "RAG", ""),
+    ]
+    return mocker.patch("app.services.unitwatch.list_services", return_value=statuses)
+
+
+async def test_failure_event_raises_svc_alert_immediately(healthy):
+    settings = SimpleNamespace(services_whitelist=["nginx", "rag-worker.service"])
+    monitor = HealthMonitor(Thresholds())
+    fired = []
+
+    async def on_change(status, old):
+        healthy_now = status.is_healthy()
+        if status.active_state == "failed" or healthy_now:
+            now = dt.datetime.now(dt.timezone.utc)
+            fired.append(monitor.service_changed(status.name, healthy_now, now))
+
+    journal = FakeJournal()
+    watcher = UnitWatcher(settings, on_change, stream_factory=journal)
+    watcher.start()
+    try:
+        for _ in range(20):
+            if watcher.running:
+                break
+            await asyncio.sleep(0)
+        assert journal.units == ("nginx", "rag-worker.service")
+
+        await journal.queue.put(_event("rag-worker.service", STOPPING))
+        await journal.queue.put(_event("rag-worker.service", SUCCEEDED))
+        await asyncio.sleep(0.01)
+        assert fired == []  # a clean stop is not a failure
+
+        await journal.queue.put(_event("nginx.service", STOPPING))
+        await journal.queue.put(_event("other.service", FAILED))
+        await journal.queue.put(_event("nginx.service", FAILED))
+        await asyncio.sleep(0.01)
+        assert len(fired) == 1
+        triggered, recovered = fired[0]
+        assert [alert.code for alert in triggered] == ["svc_nginx"]
+        assert recovered == []
+        assert [s.active_state for s in await watcher.current()] == ["failed", "inactive"]
+        assert healthy.call_count == 1  # live table served, no poll
+
+        await journal.queue.put(_event("nginx.service", STARTED))
+        await asyncio.sleep(0.01)
+        assert fired[1] == ([], ["svc_nginx"])
+    finally:
+        await watcher.stop()
+    assert not watcher.running
+
+
+async def test_duplicate_and_garbage_lines_ignored(healthy):
+    settings = SimpleNamespace(services_whitelist=["nginx"])
+    changes = []
+
+    async def on_change(status, old):
+        changes.append((old.active_state, status.active_state))
+
+    watcher = UnitWatcher(settings, on_change, stream_factory=FakeJournal())
+    await watcher.resync()
+    assert await watcher.handle_line(b"not json") is None
+    assert await watcher.handle_line(_event("nginx.service", STARTED)) is None
+    assert await watcher.handle_line(_event("nginx.service", FAILED)) is not None
+    assert changes == [("active", "failed")]
+
+
+async def test_current_polls_when_stream_is_down(healthy):
+    settings = SimpleNamespace(services_whitelist=["nginx"])
+
+    async def on_change(status, old):
+        pass
+
+    watcher = UnitWatcher(settings, on_change, stream_factory=FakeJournal())
+    await watcher.current()
+    await watcher.current()
+    assert healthy.call_count == 2